@@ -0,0 +1,8 @@
+from columnar.backend import ColumnarBackend
+from columnar.store import ColumnarStore, load
+
+__all__ = [
+    "ColumnarBackend",
+    "ColumnarStore",
+    "load",
+]
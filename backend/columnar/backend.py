@@ -0,0 +1,44 @@
+# columnar/backend.py
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from columnar.store import ColumnarStore, load
+from core.metrics import record_query
+
+
+class ColumnarBackend:
+    """Backend del router que responde desde memoria (ANALYTICS_BACKEND=memoria).
+
+    Misma interfaz que el backend Neo4j de router/analytics.py: filas por nombre de
+    endpoint con los mismos parámetros que las consultas Cypher.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.store: Optional[ColumnarStore] = None
+
+    async def open(self):
+        # La carga parsea el archivo completo: fuera del event loop
+        self.store = await asyncio.to_thread(load, self.path)
+
+    async def close(self):
+        self.store = None
+
+    def _store(self) -> ColumnarStore:
+        if self.store is None:
+            raise RuntimeError("Backend columnar no cargado (ver lifespan en main.py)")
+        return self.store
+
+    async def version(self) -> int:
+        return self._store().version
+
+    async def rows(self, name: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        t0 = time.perf_counter()
+        rows = getattr(self._store(), name)(params)
+        record_query(name, time.perf_counter() - t0, len(rows), "memoria", params=params)
+        return rows
+
+    async def stream(self, name: str, params: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        for row in await self.rows(name, params):
+            yield row
@@ -0,0 +1,508 @@
+# columnar/store.py
+import math
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from ingest import cumplimiento, iter_records
+from ingest.batch import cliente_row, interaccion_row, to_datetime
+from ingest.rollups import CAMPOS_DIARIO, EXITOS, inicio_periodo
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+DIA_US = 86_400_000_000
+# Nulos en columnas numéricas: SIN_TS ordena al final como null en ORDER BY ASC
+SIN_TS = 2**63 - 1
+NULO = -(2**63)
+NAN = float("nan")
+
+
+def to_us(value: Any) -> int:
+    # Microsegundos desde epoch (enteros: sin error de redondeo al comparar)
+    dt = to_datetime(value)
+    if not isinstance(dt, datetime):
+        return SIN_TS
+    return (dt - EPOCH) // timedelta(microseconds=1)
+
+
+def from_us(us: int) -> Optional[datetime]:
+    return None if us == SIN_TS else EPOCH + timedelta(microseconds=us)
+
+
+def num(x: float) -> Any:
+    # Columnas 'd' -> valor JSON: NaN es null y los enteros vuelven a ser enteros
+    if math.isnan(x):
+        return None
+    return int(x) if x.is_integer() else x
+
+
+def entero(x: int) -> Optional[int]:
+    return None if x == NULO else x
+
+
+class Categorias:
+    """Diccionario valor <-> código para columnas categóricas (código 0 = null)."""
+
+    def __init__(self):
+        self.valores: List[Any] = [None]
+        self.codigos: Dict[Hashable, int] = {None: 0}
+
+    def codigo(self, valor: Hashable) -> int:
+        c = self.codigos.get(valor)
+        if c is None:
+            c = self.codigos[valor] = len(self.valores)
+            self.valores.append(valor)
+        return c
+
+    def __getitem__(self, codigo: int) -> Any:
+        return self.valores[codigo]
+
+
+class ColumnarStore:
+    """Dataset en columnas (array) con índices por cliente y por agente.
+
+    Las interacciones se ordenan por (cliente_id, timestamp, id): las de un cliente
+    son un tramo contiguo [inicio, fin) ordenado por tiempo, así el timeline es un
+    slice y la ventana de pagos de una promesa, dos bisect. `por_agente` guarda las
+    filas agrupadas por agente con su tramo en `rango_agente`.
+
+    Reproduce la semántica del grafo que arma la ingesta (ingest/batch.py), incluidos
+    los derivados CUMPLIDA_POR (ingest/cumplimiento.py) y KpiHorario, para responder
+    los endpoints de router/analytics.py con las mismas filas.
+    """
+
+    def __init__(
+        self,
+        clientes: Iterable[Dict[str, Any]],
+        interacciones: Iterable[Dict[str, Any]],
+        version: int = 0,
+        ventana_dias: int = cumplimiento.VENTANA_DIAS,
+    ):
+        self.version = version
+        self.ventana_dias = ventana_dias
+
+        # MERGE por id: el último registro gana, como en el grafo
+        self.deudas: Dict[str, Dict[str, Any]] = {}
+        self.deuda_monto: Dict[str, float] = {}
+        for c in clientes:
+            row = cliente_row(c)
+            self.deudas[row["id"]] = {"id": row["deuda"]["id"], "tipo": row["deuda"]["tipo"]}
+            self.deuda_monto[row["id"]] = float(row["deuda"]["monto_inicial"] or 0)
+        filas = {}
+        for i in interacciones:
+            row = interaccion_row(i, None)
+            filas[row["id"]] = row
+        orden = sorted(
+            filas.values(),
+            key=lambda r: (r["cliente_id"], to_us(r["props"]["timestamp"]), r["id"]),
+        )
+        n = len(orden)
+
+        self.ids: List[str] = [r["id"] for r in orden]
+        self.clientes = Categorias()
+        self.agentes = Categorias()
+        self.tipos = Categorias()
+        self.resultados = Categorias()
+        self.sentimientos = Categorias()
+        self.metodos = Categorias()
+        self.cliente = array("l")
+        self.agente = array("l")
+        self.tipo = array("h")
+        self.resultado = array("h")
+        self.sentimiento = array("h")
+        self.metodo_pago = array("h")
+        self.ts = array("q")
+        self.dia = array("b")
+        self.hora = array("b")
+        self.duracion = array("q")
+        self.monto = array("d")
+        self.es_contacto = array("b")
+        self.pago_completo = array("b")
+
+        # Promesas y planes (RESULTA_EN): tabla propia + puntero desde la fila
+        self.fila_promesa = array("l", [-1]) * n
+        self.prom_id: List[str] = []
+        self.prom_fila = array("l")
+        self.prom_fecha = array("q")
+        self.prom_monto = array("d")
+        self.fila_plan = array("l", [-1]) * n
+        self.plan_id: List[str] = []
+        self.plan_cuotas = array("q")
+        self.plan_monto = array("d")
+
+        for k, r in enumerate(orden):
+            p = r["props"]
+            self.cliente.append(self.clientes.codigo(r["cliente_id"]))
+            self.agente.append(self.agentes.codigo(r.get("agente_id")))
+            self.tipo.append(self.tipos.codigo(p["tipo"]))
+            self.resultado.append(self.resultados.codigo(p.get("resultado")))
+            self.sentimiento.append(self.sentimientos.codigo(p.get("sentimiento")))
+            self.metodo_pago.append(self.metodos.codigo(p.get("metodo_pago")))
+            self.ts.append(to_us(p["timestamp"]))
+            self.dia.append(-1 if p.get("dia_semana") is None else p["dia_semana"])
+            self.hora.append(-1 if p.get("hora_del_dia") is None else p["hora_del_dia"])
+            self.duracion.append(NULO if p.get("duracion_segundos") is None else p["duracion_segundos"])
+            self.monto.append(NAN if p.get("monto") is None else float(p["monto"]))
+            self.es_contacto.append(-1 if p.get("es_contacto") is None else int(bool(p["es_contacto"])))
+            self.pago_completo.append(-1 if p.get("pago_completo") is None else int(bool(p["pago_completo"])))
+            if "promesa" in r:
+                pr = r["promesa"]
+                self.fila_promesa[k] = len(self.prom_id)
+                self.prom_id.append(pr["id"])
+                self.prom_fila.append(k)
+                self.prom_fecha.append(to_us(pr["fecha_promesa"]))
+                self.prom_monto.append(NAN if pr["monto_prometido"] is None else float(pr["monto_prometido"]))
+            if "plan" in r:
+                pl = r["plan"]
+                self.fila_plan[k] = len(self.plan_id)
+                self.plan_id.append(pl["id"])
+                self.plan_cuotas.append(NULO if pl["cuotas"] is None else pl["cuotas"])
+                self.plan_monto.append(NAN if pl["monto_mensual"] is None else float(pl["monto_mensual"]))
+
+        # Índice por cliente (sólo clientes existentes: TUVO requiere el nodo Cliente)
+        self.rango_cliente: Dict[str, Tuple[int, int]] = {}
+        inicio = 0
+        for k in range(1, n + 1):
+            if k == n or self.cliente[k] != self.cliente[inicio]:
+                cid = self.clientes[self.cliente[inicio]]
+                if cid in self.deudas:
+                    self.rango_cliente[cid] = (inicio, k)
+                inicio = k
+
+        # Índice por agente (ATENDIDA_POR)
+        con_agente = sorted((k for k in range(n) if self.agente[k]), key=lambda k: self.agente[k])
+        self.por_agente = array("l", con_agente)
+        self.rango_agente: Dict[str, Tuple[int, int]] = {}
+        inicio = 0
+        for j in range(1, len(con_agente) + 1):
+            if j == len(con_agente) or self.agente[con_agente[j]] != self.agente[con_agente[inicio]]:
+                self.rango_agente[self.agentes[self.agente[con_agente[inicio]]]] = (inicio, j)
+                inicio = j
+
+        # CUMPLIDA_POR con la ventana materializada: hay arista si la promesa se
+        # cumple en modo acumulado y tiene al menos un pago en la ventana
+        self._pago = self.tipos.codigos.get("pago_recibido", -1)
+        self.prom_cumplida = array("b", [0]) * len(self.prom_id)
+        for p in range(len(self.prom_id)):
+            pagos = self.pagos_en_ventana(p, ventana_dias)
+            if pagos and self.montos(pagos)[0] >= self.objetivo(p):
+                self.prom_cumplida[p] = 1
+
+        # Rollup KpiHorario: (dia, hora) -> [llamadas, contactos, exitos]
+        self.kpi_horario: Dict[Tuple[int, int], List[int]] = {}
+        exitos = {self.resultados.codigos[r] for r in EXITOS if r in self.resultados.codigos}
+        for k in range(n):
+            if not str(self.tipos[self.tipo[k]] or "").startswith("llamada"):
+                continue
+            if self.dia[k] < 0 or self.hora[k] < 0:
+                continue
+            c = self.kpi_horario.setdefault((self.dia[k], self.hora[k]), [0, 0, 0])
+            c[0] += 1
+            c[1] += self.es_contacto[k] == 1
+            c[2] += self.resultado[k] in exitos
+
+        # Rollup KpiDiario: día UTC -> [llamadas, contactos, promesas, pagos, monto_pagado]
+        self.kpi_diario: Dict[date, List[float]] = {}
+        promesa = self.resultados.codigos.get("promesa_pago", -1)
+        for k in range(n):
+            if self.ts[k] == SIN_TS:
+                continue
+            tipo = str(self.tipos[self.tipo[k]] or "")
+            llamada = tipo.startswith("llamada")
+            if not llamada and self.tipo[k] != self._pago:
+                continue
+            dia = EPOCH.date() + timedelta(days=self.ts[k] // DIA_US)
+            c = self.kpi_diario.setdefault(dia, [0, 0, 0, 0, 0.0])
+            if llamada:
+                c[0] += 1
+                c[1] += self.es_contacto[k] == 1
+                c[2] += self.resultado[k] == promesa
+            else:
+                c[3] += 1
+                c[4] += 0.0 if math.isnan(self.monto[k]) else self.monto[k]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---- Promesas ----
+    def objetivo(self, p: int) -> float:
+        m = self.prom_monto[p]
+        return 0.0 if math.isnan(m) else m
+
+    def pagos_en_ventana(self, p: int, dias: int) -> Optional[List[int]]:
+        # Pagos del cliente en [fecha_promesa, fecha_promesa + dias]; None si la
+        # promesa no tiene fecha o su cliente no existe (no la ve el grafo)
+        f = self.prom_fecha[p]
+        rango = self.rango_cliente.get(self.clientes[self.cliente[self.prom_fila[p]]])
+        if f == SIN_TS or rango is None:
+            return None
+        s, e = rango
+        lo = bisect_left(self.ts, f, s, e)
+        hi = bisect_right(self.ts, f + dias * DIA_US, lo, e)
+        return [k for k in range(lo, hi) if self.tipo[k] == self._pago]
+
+    def montos(self, pagos: List[int]) -> Tuple[float, float]:
+        # (suma, máximo) de los montos de los pagos; nulos cuentan como 0
+        valores = [0.0 if math.isnan(self.monto[k]) else self.monto[k] for k in pagos]
+        return float(sum(valores)), float(max(valores, default=0.0))
+
+    # ---- Endpoints (mismos parámetros y filas que las consultas Cypher) ----
+    def evento(self, k: int) -> Dict[str, Any]:
+        es_pago = self.tipo[k] == self._pago
+        cid = self.clientes[self.cliente[k]]
+        p, pl = self.fila_promesa[k], self.fila_plan[k]
+        promesa = plan = None
+        pagos_que_cumplen: List[Dict[str, Any]] = []
+        if p >= 0:
+            promesa = {
+                "id": self.prom_id[p],
+                "monto_prometido": num(self.prom_monto[p]),
+                "fecha_promesa": from_us(self.prom_fecha[p]),
+            }
+            if self.prom_cumplida[p]:
+                pagos_que_cumplen = [
+                    {"id": self.ids[j], "timestamp": from_us(self.ts[j]), "monto": num(self.monto[j])}
+                    for j in self.pagos_en_ventana(p, self.ventana_dias)
+                ]
+        if pl >= 0:
+            plan = {
+                "id": self.plan_id[pl],
+                "cuotas": entero(self.plan_cuotas[pl]),
+                "monto_mensual": num(self.plan_monto[pl]),
+            }
+        return {
+            "interaccion_id": self.ids[k],
+            "tipo": self.tipos[self.tipo[k]],
+            "timestamp": from_us(self.ts[k]),
+            "resultado": self.resultados[self.resultado[k]],
+            "sentimiento": self.sentimientos[self.sentimiento[k]],
+            "duracion_segundos": entero(self.duracion[k]),
+            "agente_id": self.agentes[self.agente[k]],
+            "monto_pago": num(self.monto[k]) if es_pago else None,
+            "metodo_pago": self.metodos[self.metodo_pago[k]] if es_pago else None,
+            "pago_completo": (None if self.pago_completo[k] < 0 else bool(self.pago_completo[k])) if es_pago else None,
+            "deuda": self.deudas.get(cid) if es_pago else None,
+            "promesa": promesa,
+            "plan": plan,
+            "pagos_que_cumplen": pagos_que_cumplen,
+        }
+
+    def cliente_timeline(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rango = self.rango_cliente.get(params["id"])
+        if rango is None:
+            return []
+        s, e = rango
+        limit = params.get("limit")
+        after = params.get("after_ts")
+        if after is not None:
+            after, after_id = to_us(after), params["after_id"]
+            s = bisect_left(self.ts, after, s, e)
+        rows = []
+        for k in range(s, e):
+            if after is not None and (
+                self.ts[k] == SIN_TS or (self.ts[k] == after and self.ids[k] <= after_id)
+            ):
+                continue
+            rows.append(self.evento(k))
+            if limit and len(rows) == limit:
+                break
+        return rows
+
+    def agentes_efectividad(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        ids = sorted(set(params["ids"])) if params.get("ids") else sorted(self.rango_agente)
+        exitos = {self.resultados.codigos[r] for r in EXITOS if r in self.resultados.codigos}
+        promesa_pago = self.resultados.codigos.get("promesa_pago", -1)
+        pago_inmediato = self.resultados.codigos.get("pago_inmediato", -1)
+        renegociacion = self.resultados.codigos.get("renegociacion", -1)
+        out = []
+        for aid in ids:
+            rango = self.rango_agente.get(aid)
+            if rango is None:
+                continue
+            total = contactos = promesas = pagos_inmediatos = reneg = duracion = cumplidas = 0
+            grupos: Dict[Tuple[Any, Any], List[int]] = {}
+            for j in range(*rango):
+                k = self.por_agente[j]
+                res = self.resultado[k]
+                contacto = self.es_contacto[k] == 1
+                exito = res in exitos
+                g = grupos.setdefault((self.dia[k], self.hora[k]), [0, 0, 0])
+                g[0] += 1
+                g[1] += contacto
+                g[2] += exito
+                total += 1
+                contactos += contacto
+                promesas += res == promesa_pago
+                pagos_inmediatos += res == pago_inmediato
+                reneg += res == renegociacion
+                if self.duracion[k] != NULO:
+                    duracion += self.duracion[k]
+                p = self.fila_promesa[k]
+                cumplidas += p >= 0 and self.prom_cumplida[p] == 1
+            if total < params["min_llamadas"]:
+                continue
+            resumen = {
+                "total_llamadas": total,
+                "tasa_contacto": contactos / total,
+                "promesas": promesas,
+                "tasa_promesa_sobre_llamadas": promesas / total,
+                "promesas_cumplidas": cumplidas,
+                "tasa_cumplimiento_sobre_promesas": cumplidas / promesas if promesas else 0.0,
+                "pagos_inmediatos": pagos_inmediatos,
+                "tasa_pago_inmediato": pagos_inmediatos / total,
+                "renegociaciones": reneg,
+                "duracion_media_seg": duracion / total,
+            }
+            por_horario = [
+                {
+                    "dia_semana": None if dia < 0 else dia,
+                    "hora_del_dia": None if hora < 0 else hora,
+                    "llamadas": g[0],
+                    "tasa_contacto": g[1] / g[0],
+                    "tasa_exito": g[2] / g[0],
+                }
+                for (dia, hora), g in grupos.items()
+            ]
+            out.append({"agente_id": aid, "resumen": resumen, "por_horario": por_horario})
+        orden = params["orden"]
+        out.sort(key=lambda r: r["resumen"][orden], reverse=True)
+        return out[: params["top_k"]]
+
+    def promesas_incumplidas(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        hasta = to_us(params["hasta"])
+        dias_ventana = params["ventanaDias"]
+        estricto = params.get("modo") == "estricto"
+        after_dias, after_id = params.get("after_dias"), params.get("after_id")
+        rows = []
+        for p in range(len(self.prom_id)):
+            f = self.prom_fecha[p]
+            if f == SIN_TS or f >= hasta:
+                continue
+            dias = (hasta - f) // DIA_US
+            pid = self.prom_id[p]
+            if after_dias is not None and not (
+                dias < after_dias or (dias == after_dias and pid > after_id)
+            ):
+                continue
+            pagos = self.pagos_en_ventana(p, dias_ventana)
+            if pagos is None:
+                continue
+            total, maximo = self.montos(pagos)
+            monto = maximo if estricto else total
+            if not monto < self.objetivo(p):
+                continue
+            rows.append(
+                {
+                    "cliente_id": self.clientes[self.cliente[self.prom_fila[p]]],
+                    "promesa_id": pid,
+                    "fecha_promesa": from_us(f),
+                    "monto_prometido": num(self.prom_monto[p]),
+                    "monto_pagado_en_ventana": monto,
+                    "dias_vencida": dias,
+                }
+            )
+        rows.sort(key=lambda r: (-r["dias_vencida"], r["promesa_id"]))
+        limit = params.get("limit")
+        return rows[:limit] if limit else rows
+
+    def mejores_horarios(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        a = float(params["alpha"])
+        rows = []
+        for (dia, hora), (llamadas, contactos, exitos) in self.kpi_horario.items():
+            if llamadas < params["min_llamadas"]:
+                continue
+            tc, te = contactos / llamadas, exitos / llamadas
+            rows.append(
+                {
+                    "dia": dia,
+                    "hora": hora,
+                    "llamadas": llamadas,
+                    "tasa_contacto": tc,
+                    "tasa_exito": te,
+                    "score": a * te + (1.0 - a) * tc,
+                }
+            )
+        rows.sort(key=lambda r: (-r["score"], -r["llamadas"]))
+        return rows[: params["top_k"]]
+
+    def kpis(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        hasta = to_us(params["hasta"])
+        desde, desde_anterior = to_us(params["desde"]), to_us(params["desde_anterior"])
+        estricto = params.get("modo") == "estricto"
+
+        # Recuperación por tipo de deuda: pagos de cada cliente (APLICADO_A) antes de `hasta`
+        por_tipo: Dict[str, List[float]] = {}
+        for cid, deuda in self.deudas.items():
+            t = por_tipo.setdefault(deuda["tipo"], [0, 0.0, 0.0])
+            t[0] += 1
+            t[1] += self.deuda_monto[cid]
+            rango = self.rango_cliente.get(cid)
+            if rango is not None:
+                s, e = rango
+                fin = bisect_left(self.ts, hasta, s, e)
+                pagos = [k for k in range(s, fin) if self.tipo[k] == self._pago]
+                t[2] += self.montos(pagos)[0]
+        deuda_por_tipo = [
+            {
+                "tipo": tipo,
+                "deudas": n,
+                "deuda_inicial": inicial,
+                "recuperado": recuperado,
+                "tasa_recuperacion": recuperado / inicial if inicial else 0.0,
+            }
+            for tipo, (n, inicial, recuperado) in sorted(por_tipo.items())
+        ]
+
+        # Actividad de pagos: período [desde, hasta) y el anterior, de todos los pagos
+        a = {"pagos": 0, "monto": 0.0, "pagos_completos": 0, "pagos_anterior": 0, "monto_anterior": 0.0}
+        for k in range(len(self.ids)):
+            ts = self.ts[k]
+            if self.tipo[k] != self._pago or ts == SIN_TS or not desde_anterior <= ts < hasta:
+                continue
+            monto = 0.0 if math.isnan(self.monto[k]) else self.monto[k]
+            if ts >= desde:
+                a["pagos"] += 1
+                a["monto"] += monto
+                a["pagos_completos"] += self.pago_completo[k] == 1
+            else:
+                a["pagos_anterior"] += 1
+                a["monto_anterior"] += monto
+
+        # Promesas vencidas a `hasta` y cumplidas en la ventana
+        p = {"vencidas": 0, "cumplidas": 0, "monto_prometido": 0.0, "monto_cumplido": 0.0}
+        for j in range(len(self.prom_id)):
+            if self.prom_fecha[j] >= hasta:
+                continue
+            pagos = self.pagos_en_ventana(j, params["ventanaDias"])
+            if pagos is None:
+                continue
+            total, maximo = self.montos(pagos)
+            objetivo = self.objetivo(j)
+            p["vencidas"] += 1
+            p["monto_prometido"] += objetivo
+            if (maximo if estricto else total) >= objetivo:
+                p["cumplidas"] += 1
+                p["monto_cumplido"] += objetivo
+        return [{"deuda_por_tipo": deuda_por_tipo, "actividad_pagos": a, "promesas": p}]
+
+    def series(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        desde, hasta = date.fromisoformat(params["desde"]), date.fromisoformat(params["hasta"])
+        acc: Dict[date, List[float]] = {}
+        for dia, c in self.kpi_diario.items():
+            if desde <= dia <= hasta:
+                t = acc.setdefault(inicio_periodo(dia, params["bucket"]), [0, 0, 0, 0, 0.0])
+                for j, v in enumerate(c):
+                    t[j] += v
+        return [
+            dict(zip(("periodo",) + CAMPOS_DIARIO, [periodo.isoformat()] + t))
+            for periodo, t in sorted(acc.items())
+        ]
+
+
+def load(path: str) -> ColumnarStore:
+    # Mismo lector que la ingesta: JSON del export, NDJSON y .gz
+    clientes, interacciones = [], []
+    for key, rec in iter_records(path):
+        (clientes if key == "clientes" else interacciones).append(rec)
+    return ColumnarStore(clientes, interacciones, version=int(os.stat(path).st_mtime))
@@ -0,0 +1,99 @@
+# core/cache.py
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", 256))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", 300))
+# Cada cuánto se vuelve a leer la versión del dataset en Neo4j (segundos)
+DATASET_VERSION_TTL = float(os.getenv("DATASET_VERSION_TTL", 2))
+
+# Nodo contador que incrementa la ingesta al terminar cada corrida
+Q_DATASET_VERSION = """
+OPTIONAL MATCH (v:DatasetVersion {id:'grafo'})
+RETURN coalesce(v.version, 0) AS version
+"""
+
+Q_BUMP_DATASET_VERSION = """
+MERGE (v:DatasetVersion {id:'grafo'})
+SET v.version = coalesce(v.version, 0) + 1, v.actualizado = datetime()
+RETURN v.version AS version
+"""
+
+
+class LRUCache:
+    # LRU acotado por tamaño con expiración por TTL; seguro entre hilos
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < now:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, item[1]
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DatasetVersion:
+    # Versión del dataset leída como mucho una vez cada `ttl` segundos
+    def __init__(self, fetch: Callable[[], Awaitable[int]], ttl: float = DATASET_VERSION_TTL):
+        self.fetch = fetch
+        self.ttl = ttl
+        self._value: Optional[int] = None
+        self._expires = 0.0
+
+    async def current(self) -> int:
+        if self._value is not None and time.monotonic() < self._expires:
+            return self._value
+        self._value = int(await self.fetch())
+        self._expires = time.monotonic() + self.ttl
+        return self._value
+
+    def invalidate(self):
+        self._expires = 0.0
+
+
+def normalize(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+
+
+def etag(endpoint: str, params: Dict[str, Any], version: int) -> str:
+    # Depende sólo de la consulta y de la versión: se calcula sin ir a la base
+    raw = f"{endpoint}|{normalize(params)}|v{version}".encode("utf-8")
+    return '"' + hashlib.sha1(raw).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], tag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    return "*" in candidates or tag in candidates or f"W/{tag}" in candidates
@@ -0,0 +1,64 @@
+# core/db.py
+import asyncio
+import os
+import time
+from typing import Optional
+
+from neo4j import AsyncDriver, AsyncGraphDatabase, basic_auth
+from neo4j.exceptions import ServiceUnavailable
+
+# ---- Neo4j driver (variables de entorno) ----
+NEO4J_URI = os.getenv("NEO4J_URI", "bolt://neo4j:7687")
+NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
+NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password123")
+NEO4J_DB = os.getenv("NEO4J_DATABASE", "neo4j")
+
+# Pool de conexiones: cada request concurrente ocupa una conexión sólo mientras
+# espera a la base, así que el tamaño del pool es el techo de concurrencia real
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", 100))
+NEO4J_POOL_ACQUIRE_TIMEOUT = float(os.getenv("NEO4J_POOL_ACQUIRE_TIMEOUT", 30))
+NEO4J_MAX_CONN_LIFETIME = float(os.getenv("NEO4J_MAX_CONN_LIFETIME", 3600))
+# Espera máxima a que Neo4j acepte conexiones al arrancar (en compose puede
+# levantar después que el API); vencida, el arranque falla
+NEO4J_STARTUP_TIMEOUT = float(os.getenv("NEO4J_STARTUP_TIMEOUT", 60))
+
+_driver: Optional[AsyncDriver] = None
+
+
+async def init_driver() -> AsyncDriver:
+    global _driver
+    if _driver is None:
+        _driver = AsyncGraphDatabase.driver(
+            NEO4J_URI,
+            auth=basic_auth(NEO4J_USER, NEO4J_PASSWORD),
+            max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+            connection_acquisition_timeout=NEO4J_POOL_ACQUIRE_TIMEOUT,
+            max_connection_lifetime=NEO4J_MAX_CONN_LIFETIME,
+        )
+    return _driver
+
+
+async def close_driver():
+    global _driver
+    if _driver is not None:
+        await _driver.close()
+        _driver = None
+
+
+async def verify_connectivity(timeout: float = NEO4J_STARTUP_TIMEOUT):
+    # Sólo se reintenta "no disponible"; credenciales inválidas fallan de inmediato
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            await get_driver().verify_connectivity()
+            return
+        except ServiceUnavailable:
+            if time.monotonic() >= deadline:
+                raise
+            await asyncio.sleep(1)
+
+
+def get_driver() -> AsyncDriver:
+    if _driver is None:
+        raise RuntimeError("Driver de Neo4j no inicializado (ver lifespan en main.py)")
+    return _driver
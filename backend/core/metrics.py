@@ -0,0 +1,229 @@
+# core/metrics.py
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+# Consultas más lentas que esto (ms) van al log `analytics.slow`
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 500))
+# PROFILE en cada consulta para contar db hits (caro: sólo para diagnóstico)
+QUERY_PROFILE = os.getenv("QUERY_PROFILE", "0") == "1"
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+slow_log = logging.getLogger("analytics.slow")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt(labels: Labels, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{v}"' for k, v in items)
+    return "{" + body + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any):
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            for labels, v in sorted(self._values.items()):
+                yield f"{self.name}{_fmt(labels)} {v:g}"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        # labels -> (conteo por bucket, suma, total)
+        self._values: Dict[Labels, Tuple[List[int], float, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any):
+        key = _labels(labels)
+        with self._lock:
+            counts, total, n = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, n + 1)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            for labels, (counts, total, n) in sorted(self._values.items()):
+                for b, c in zip(self.buckets, counts):
+                    yield f"{self.name}_bucket{_fmt(labels, [('le', f'{b:g}')])} {c}"
+                yield f"{self.name}_bucket{_fmt(labels, [('le', '+Inf')])} {n}"
+                yield f"{self.name}_sum{_fmt(labels)} {total:g}"
+                yield f"{self.name}_count{_fmt(labels)} {n}"
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Latencia de los requests por ruta"
+)
+QUERY_LATENCY = Histogram(
+    "analytics_query_duration_seconds", "Latencia de cada consulta vista por la API"
+)
+QUERY_SERVER_SECONDS = Counter(
+    "analytics_query_server_seconds_total",
+    "Tiempo reportado por Neo4j: result_available_after / result_consumed_after",
+)
+QUERY_ROWS = Counter("analytics_query_rows_total", "Filas devueltas por consulta")
+QUERY_DB_HITS = Counter("analytics_query_db_hits_total", "db hits (con QUERY_PROFILE=1)")
+QUERY_ERRORS = Counter("analytics_query_errors_total", "Consultas fallidas por código de error")
+
+REGISTRY = [REQUEST_LATENCY, QUERY_LATENCY, QUERY_SERVER_SECONDS, QUERY_ROWS, QUERY_DB_HITS, QUERY_ERRORS]
+
+
+def render() -> str:
+    # Formato de exposición de texto de Prometheus
+    return "\n".join(line for m in REGISTRY for line in m.render()) + "\n"
+
+
+# ---- Traza por request (X-Request-Id + Server-Timing) ----
+class Trace:
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.queries: List[Tuple[str, float]] = []
+        self.cache: Optional[str] = None
+
+    def server_timing(self, total: float) -> str:
+        parts = [f"app;dur={total * 1000:.1f}"]
+        if self.cache:
+            parts.append(f'cache;desc="{self.cache}"')
+        for i, (name, seconds) in enumerate(self.queries):
+            parts.append(f'q{i};desc="{name}";dur={seconds * 1000:.1f}')
+        return ", ".join(parts)
+
+
+_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+def operators(plan: Dict[str, Any], depth: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    # Recorre el árbol de operadores de un PROFILE / EXPLAIN
+    yield depth, plan
+    for child in plan.get("children", []):
+        yield from operators(child, depth + 1)
+
+
+def record_query(
+    name: str,
+    seconds: float,
+    rows: int,
+    backend: str,
+    summary: Any = None,
+    params: Optional[Dict[str, Any]] = None,
+):
+    available = consumed = db_hits = None
+    if summary is not None:
+        available = summary.result_available_after
+        consumed = summary.result_consumed_after
+        if available is not None:
+            QUERY_SERVER_SECONDS.inc(available / 1000, query=name, phase="available")
+        if consumed is not None:
+            QUERY_SERVER_SECONDS.inc(consumed / 1000, query=name, phase="consumed")
+        if summary.profile:
+            db_hits = sum(op.get("dbHits", 0) for _, op in operators(summary.profile))
+            QUERY_DB_HITS.inc(db_hits, query=name)
+    QUERY_LATENCY.observe(seconds, query=name, backend=backend)
+    QUERY_ROWS.inc(rows, query=name, backend=backend)
+
+    trace = current_trace()
+    if trace is not None:
+        trace.queries.append((name, seconds))
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        slow_log.warning(
+            json.dumps(
+                {
+                    "request_id": trace.request_id if trace else None,
+                    "query": name,
+                    "backend": backend,
+                    "ms": round(seconds * 1000, 1),
+                    "available_after_ms": available,
+                    "consumed_after_ms": consumed,
+                    "rows": rows,
+                    "db_hits": db_hits,
+                    "params": params,
+                },
+                default=str,
+            )
+        )
+
+
+def record_error(name: str, code: str):
+    QUERY_ERRORS.inc(query=name, code=code)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI: latencia por ruta, X-Request-Id y Server-Timing.
+
+    Toma el X-Request-Id que manda el frontend (o genera uno) para correlacionar
+    el log de consultas lentas con el request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1") or uuid.uuid4().hex
+        trace = Trace(request_id)
+        token = _trace.set(trace)
+        t0 = time.perf_counter()
+        status = 500
+
+        async def send_with_headers(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                h = MutableHeaders(scope=message)
+                h.append("X-Request-Id", request_id)
+                h.append("Server-Timing", trace.server_timing(time.perf_counter() - t0))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            # Plantilla de la ruta (/clientes/{id}/timeline), no el path concreto
+            route = scope.get("route")
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - t0,
+                method=scope["method"],
+                route=getattr(route, "path", "sin_ruta"),
+                status=status,
+            )
+            _trace.reset(token)
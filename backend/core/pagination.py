@@ -0,0 +1,49 @@
+# core/pagination.py
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Request
+
+from core.serialization import dumps
+
+NDJSON = "application/x-ndjson"
+
+
+# Cursor opaco de keyset: la clave de orden de la última fila de la página,
+# serializada como JSON en base64 url-safe
+def encode_cursor(*key: Any) -> str:
+    raw = dumps(list(key))
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Tuple[type, ...]) -> List[Any]:
+    # ValueError si el cursor no es una clave emitida por encode_cursor con esos tipos
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"cursor inválido: {cursor}") from e
+    if (
+        not isinstance(key, list)
+        or len(key) != len(types)
+        or not all(isinstance(k, t) for k, t in zip(key, types))
+    ):
+        raise ValueError(f"cursor inválido: {cursor}")
+    return key
+
+
+def next_cursor_headers(request: Request, cursor: Optional[str]) -> Dict[str, str]:
+    # La página siguiente se anuncia en cabeceras para no cambiar el cuerpo (lista)
+    if cursor is None:
+        return {}
+    url = request.url.include_query_params(cursor=cursor)
+    return {"X-Next-Cursor": cursor, "Link": f'<{url}>; rel="next"'}
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON in request.headers.get("accept", "")
+
+
+def ndjson_line(row: Dict[str, Any]) -> bytes:
+    return dumps(row) + b"\n"
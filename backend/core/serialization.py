@@ -0,0 +1,100 @@
+# core/serialization.py
+import gzip
+import os
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+from neo4j.time import Date, DateTime, Duration, Time
+
+try:
+    import brotli
+except ImportError:  # opcional: sin el paquete sólo se negocia gzip
+    brotli = None
+
+# Cuerpos más chicos no se comprimen: el costo de CPU no compensa los bytes
+COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", 1024))
+GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", 6))
+# Calidad 4-5: buena relación tamaño / CPU para respuestas dinámicas (11 es para estáticos)
+BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", 5))
+
+# Preferencia del servidor ante q iguales
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _default(value: Any) -> Any:
+    # Tipos del driver que orjson no conoce; datetime/date/time de Python los
+    # serializa orjson en ISO 8601 (mismo formato que isoformat)
+    if isinstance(value, (Date, DateTime, Time)):
+        return value.to_native()
+    if isinstance(value, Duration):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} no es serializable a JSON")
+
+
+def dumps(data: Any) -> bytes:
+    # Las filas de Neo4j se serializan tal como llegan del driver, sin recorrerlas
+    # antes en Python (jsonable_encoder / to_native); NaN -> null
+    return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    # Codificación aceptada con mayor q (q=0 la excluye); ante empate, br sobre gzip
+    if not accept_encoding:
+        return None
+    q: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        value = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                value = float(params[2:])
+            except ValueError:
+                value = 0.0
+        q[name.strip().lower()] = value
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        value = q.get(encoding, q.get("*", 0.0))
+        if value > best_q:
+            best, best_q = encoding, value
+    return best
+
+
+class Payload:
+    """Respuesta JSON ya serializada, con las variantes comprimidas que se pidieron.
+
+    Es lo que guarda el cache de respuestas: un hit no vuelve a serializar ni a
+    comprimir. `cursor` es el de la página siguiente, si la hay.
+    """
+
+    __slots__ = ("body", "cursor", "_encoded")
+
+    def __init__(self, body: bytes, cursor: Optional[str] = None):
+        self.body = body
+        self.cursor = cursor
+        self._encoded: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        out = self._encoded.get(encoding)
+        if out is None:
+            out = self._encoded[encoding] = compress(self.body, encoding)
+        return out
+
+
+def json_response(request: Request, payload: Payload, headers: Dict[str, str]) -> Response:
+    headers = dict(headers, Vary="Accept-Encoding")
+    body = payload.body
+    if len(body) >= COMPRESS_MIN_BYTES:
+        encoding = negotiate(request.headers.get("accept-encoding"))
+        if encoding is not None:
+            body = payload.encoded(encoding)
+            headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
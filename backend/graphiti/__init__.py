@@ -0,0 +1,15 @@
+from graphiti.graph_builder import BuildStats, Checkpoint, GraphBuilder
+from graphiti.graphiti_client import AsyncGraphitiClient, GraphitiClient, GraphitiError, RateLimiter
+from graphiti.graphiti_mapping import episodio, episodio_uuid
+
+__all__ = [
+    "AsyncGraphitiClient",
+    "BuildStats",
+    "Checkpoint",
+    "GraphBuilder",
+    "GraphitiClient",
+    "GraphitiError",
+    "RateLimiter",
+    "episodio",
+    "episodio_uuid",
+]
@@ -0,0 +1,208 @@
+# graphiti/graph_builder.py
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import IO, Any, Dict, Iterable, List, Optional, Tuple
+
+from graphiti.graphiti_client import AsyncGraphitiClient, GraphitiError
+from graphiti.graphiti_mapping import episodio
+from ingest.batch import chunked, huella, to_datetime
+
+GRAPHITI_GROUP_ID = os.getenv("GRAPHITI_GROUP_ID", "cobranza")
+# Clientes en vuelo a la vez; cada uno envía sus episodios en orden
+GRAPHITI_CONCURRENCY = int(os.getenv("GRAPHITI_CONCURRENCY", 8))
+# Episodios por POST /messages
+GRAPHITI_BATCH_SIZE = int(os.getenv("GRAPHITI_BATCH_SIZE", 10))
+
+Record = Tuple[str, Dict[str, Any]]
+# (interaccion_id, huella del episodio, mensaje)
+Episodio = Tuple[str, str, Dict[str, Any]]
+
+
+class Checkpoint:
+    """NDJSON de episodios aceptados por el servidor: {"id", "huella"} por línea.
+
+    Se lee al arrancar para reanudar una corrida cortada y se escribe (con flush)
+    después de cada lote aceptado. Un episodio cuyo contenido cambió (otra huella)
+    se vuelve a enviar; su uuid es el mismo, así que Graphiti lo reemplaza.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.hechos: Dict[str, str] = {}
+        self._f: Optional[IO[str]] = None
+        if path is not None and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        d = json.loads(line)
+                    except ValueError:
+                        continue  # última línea cortada por una caída
+                    self.hechos[d["id"]] = d["huella"]
+
+    def pendiente(self, iid: str, h: str) -> bool:
+        return self.hechos.get(iid) != h
+
+    def marcar(self, episodios: List[Episodio]):
+        for iid, h, _ in episodios:
+            self.hechos[iid] = h
+        if self.path is None:
+            return
+        if self._f is None:
+            self._f = open(self.path, "a", encoding="utf-8")
+        self._f.write("".join(json.dumps({"id": iid, "huella": h}) + "\n" for iid, h, _ in episodios))
+        self._f.flush()
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class BuildStats:
+    def __init__(self):
+        self.clientes = 0
+        self.episodios = 0
+        self.enviados = 0
+        self.omitidos = 0
+        self.fallidos = 0
+        self.requests = 0
+        self.retries = 0
+        self.seconds = 0.0
+        # Primeros errores (uno por cliente que falló), para el reporte
+        self.errores: List[str] = []
+
+    @property
+    def episodios_por_seg(self) -> float:
+        return self.enviados / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.enviados} episodios enviados en {self.seconds:.2f}s "
+            f"({self.episodios_por_seg:.1f}/s, {self.requests} requests, {self.retries} reintentos); "
+            f"{self.omitidos} ya en el checkpoint, {self.fallidos} fallidos"
+        )
+
+
+def _orden(i: Dict[str, Any]) -> Tuple:
+    # Cronológico por cliente; sin timestamp (o no ISO) al final, por id
+    ts = to_datetime(i.get("timestamp"))
+    return (0, ts.timestamp(), i["id"]) if isinstance(ts, datetime) else (1, 0.0, i["id"])
+
+
+def carriles(records: Iterable[Record], checkpoint: Checkpoint, stats: BuildStats) -> List[List[Episodio]]:
+    # Un carril por cliente con sus episodios pendientes en orden cronológico:
+    # Graphiti resuelve hechos en el tiempo, así que dentro de un cliente el orden
+    # importa; entre clientes se envía en paralelo
+    clientes: Dict[str, Dict[str, Any]] = {}
+    por_cliente: Dict[str, List[Dict[str, Any]]] = {}
+    for key, rec in records:
+        if key == "clientes":
+            clientes[rec["id"]] = rec
+        else:
+            por_cliente.setdefault(rec.get("cliente_id"), []).append(rec)
+
+    out = []
+    for cid, interacciones in por_cliente.items():
+        interacciones.sort(key=_orden)
+        carril = []
+        for i in interacciones:
+            msg = episodio(i, clientes.get(cid))
+            h = huella(msg)
+            stats.episodios += 1
+            if checkpoint.pendiente(i["id"], h):
+                carril.append((i["id"], h, msg))
+            else:
+                stats.omitidos += 1
+        if carril:
+            out.append(carril)
+    stats.clientes = len(por_cliente)
+    return out
+
+
+class GraphBuilder:
+    """Pipeline asyncio que envía las interacciones a Graphiti como episodios.
+
+    Un productor encola un carril por cliente en una cola acotada y `concurrency`
+    workers los consumen: cada worker envía los episodios de su cliente en lotes,
+    uno después del otro, mientras los demás workers tienen sus requests en
+    vuelo. El throughput sale de solapar requests (la extracción con el LLM es
+    lenta por llamada), no de hacerlas más rápidas.
+
+    Si un lote falla después de los reintentos del cliente, el resto del carril
+    no se envía (para no romper el orden) y queda pendiente para la próxima corrida.
+    """
+
+    def __init__(
+        self,
+        client: AsyncGraphitiClient,
+        group_id: str = GRAPHITI_GROUP_ID,
+        concurrency: int = GRAPHITI_CONCURRENCY,
+        batch_size: int = GRAPHITI_BATCH_SIZE,
+        checkpoint: Optional[Checkpoint] = None,
+    ):
+        self.client = client
+        self.group_id = group_id
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.checkpoint = checkpoint or Checkpoint(None)
+        self.stats = BuildStats()
+
+    async def _enviar(self, carril: List[Episodio]):
+        for n, lote in enumerate(chunked(carril, self.batch_size)):
+            try:
+                await self.client.add_messages(self.group_id, [msg for _, _, msg in lote])
+            except GraphitiError as e:
+                self.stats.fallidos += len(carril) - n * self.batch_size
+                if len(self.stats.errores) < 10:
+                    self.stats.errores.append(f"{lote[0][0]}: {e}")
+                return
+            self.checkpoint.marcar(lote)
+            self.stats.enviados += len(lote)
+
+    async def _worker(self, cola: "asyncio.Queue[Optional[List[Episodio]]]"):
+        while True:
+            carril = await cola.get()
+            try:
+                if carril is None:
+                    return
+                await self._enviar(carril)
+            finally:
+                cola.task_done()
+
+    async def run(self, records: Iterable[Record]) -> BuildStats:
+        t0 = time.perf_counter()
+        requests0, retries0 = self.client.requests, self.client.retries
+        pendientes = carriles(records, self.checkpoint, self.stats)
+
+        # Cola acotada: cada worker toma el siguiente carril cuando termina el suyo
+        cola: "asyncio.Queue[Optional[List[Episodio]]]" = asyncio.Queue(maxsize=2 * self.concurrency)
+
+        async def producir():
+            for carril in pendientes:
+                await cola.put(carril)
+            for _ in range(self.concurrency):
+                await cola.put(None)
+
+        # Un error inesperado en un worker corta todo (el productor no queda
+        # esperando lugar en la cola); lo ya aceptado quedó en el checkpoint
+        tareas = [asyncio.create_task(producir())]
+        tareas += [asyncio.create_task(self._worker(cola)) for _ in range(self.concurrency)]
+        try:
+            await asyncio.gather(*tareas)
+        finally:
+            for t in tareas:
+                t.cancel()
+            self.stats.seconds += time.perf_counter() - t0
+            self.stats.requests += self.client.requests - requests0
+            self.stats.retries += self.client.retries - retries0
+        return self.stats
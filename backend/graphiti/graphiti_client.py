@@ -0,0 +1,162 @@
+# graphiti/graphiti_client.py
+import asyncio
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# ---- Servidor REST de Graphiti (zepai/graphiti, variables de entorno) ----
+GRAPHITI_BASE_URL = os.getenv("GRAPHITI_BASE_URL", "http://localhost:8000")
+GRAPHITI_TIMEOUT = float(os.getenv("GRAPHITI_TIMEOUT", 60))
+# Conexiones keep-alive del pool: techo de requests en vuelo hacia el servidor
+GRAPHITI_MAX_CONNECTIONS = int(os.getenv("GRAPHITI_MAX_CONNECTIONS", 16))
+# Requests/s hacia el servidor (0 = sin límite); cada request lleva un lote de episodios
+GRAPHITI_RATE = float(os.getenv("GRAPHITI_RATE", 0))
+GRAPHITI_MAX_RETRIES = int(os.getenv("GRAPHITI_MAX_RETRIES", 5))
+GRAPHITI_BACKOFF = float(os.getenv("GRAPHITI_BACKOFF", 0.5))
+GRAPHITI_BACKOFF_MAX = float(os.getenv("GRAPHITI_BACKOFF_MAX", 30))
+
+# Sobrecarga o caída pasajera del servidor / del LLM detrás: se reintenta
+REINTENTABLES = {408, 429, 500, 502, 503, 504}
+
+
+class GraphitiError(Exception):
+    def __init__(self, status: Optional[int], detail: str):
+        super().__init__(f"Graphiti {status}: {detail}" if status else f"Graphiti: {detail}")
+        self.status = status
+
+
+def _check(r: httpx.Response) -> Any:
+    if r.status_code >= 400:
+        raise GraphitiError(r.status_code, r.text[:500])
+    return r.json() if r.content else None
+
+
+class GraphitiClient:
+    """Cliente síncrono para scripts de mantenimiento (healthcheck, borrar grupos)."""
+
+    def __init__(self, base_url: str = GRAPHITI_BASE_URL, timeout: float = GRAPHITI_TIMEOUT,
+                 transport: Optional[httpx.BaseTransport] = None):
+        self._http = httpx.Client(base_url=base_url, timeout=timeout, transport=transport)
+
+    def healthcheck(self) -> Dict[str, Any]:
+        return _check(self._http.get("/healthcheck"))
+
+    def add_messages(self, group_id: str, messages: List[Dict[str, Any]]) -> Any:
+        return _check(self._http.post("/messages", json={"group_id": group_id, "messages": messages}))
+
+    def clear_group(self, group_id: str) -> Any:
+        return _check(self._http.delete(f"/group/{group_id}"))
+
+    def close(self):
+        self._http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class RateLimiter:
+    """Token bucket async: `rate` requests/s con ráfagas de hasta `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = float(burst or max(1, int(rate)))
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def backoff(intento: int, retry_after: Optional[str] = None) -> float:
+    # Exponencial con jitter completo; nunca menos que el Retry-After del servidor
+    # (el jitter evita que todos los workers rechazados vuelvan a la vez)
+    espera = random.uniform(0, min(GRAPHITI_BACKOFF_MAX, GRAPHITI_BACKOFF * 2**intento))
+    if retry_after:
+        try:
+            espera = max(espera, min(GRAPHITI_BACKOFF_MAX, float(retry_after)))
+        except ValueError:
+            pass
+    return espera
+
+
+class AsyncGraphitiClient:
+    """Cliente async para la ingesta concurrente de episodios.
+
+    Un solo httpx.AsyncClient (pool keep-alive de `max_connections`) compartido
+    por todos los workers; cada request pasa por el rate limiter y se reintenta
+    ante errores de red y 408/429/5xx con backoff exponencial.
+    """
+
+    def __init__(
+        self,
+        base_url: str = GRAPHITI_BASE_URL,
+        max_connections: int = GRAPHITI_MAX_CONNECTIONS,
+        rate: float = GRAPHITI_RATE,
+        max_retries: int = GRAPHITI_MAX_RETRIES,
+        timeout: float = GRAPHITI_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._http = httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits, transport=transport)
+        self.limiter = RateLimiter(rate)
+        self.max_retries = max_retries
+        self.requests = 0
+        self.retries = 0
+
+    async def _request(self, method: str, url: str, **kwargs) -> Any:
+        intento = 0
+        while True:
+            await self.limiter.acquire()
+            self.requests += 1
+            try:
+                r = await self._http.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if intento >= self.max_retries:
+                    raise GraphitiError(None, f"{type(e).__name__}: {e}") from e
+                espera = backoff(intento)
+            else:
+                if r.status_code not in REINTENTABLES or intento >= self.max_retries:
+                    return _check(r)
+                espera = backoff(intento, r.headers.get("retry-after"))
+            intento += 1
+            self.retries += 1
+            await asyncio.sleep(espera)
+
+    async def healthcheck(self) -> Dict[str, Any]:
+        return await self._request("GET", "/healthcheck")
+
+    async def add_messages(self, group_id: str, messages: List[Dict[str, Any]]) -> Any:
+        # El servidor encola los mensajes y responde 202; la extracción con el LLM
+        # ocurre después, del lado de Graphiti
+        return await self._request("POST", "/messages", json={"group_id": group_id, "messages": messages})
+
+    async def clear_group(self, group_id: str) -> Any:
+        return await self._request("DELETE", f"/group/{group_id}")
+
+    async def close(self):
+        await self._http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+        return False
@@ -0,0 +1,76 @@
+# graphiti/graphiti_mapping.py
+import uuid
+from typing import Any, Dict, Optional
+
+from ingest.batch import iso, to_datetime
+
+# uuid del episodio derivado del id de la interacción: reenviar la misma
+# interacción no crea un episodio nuevo
+EPISODIOS_NS = uuid.UUID("6f1c1a52-3b8e-4c61-9a57-1d0c6c1b7e21")
+
+TIPOS = {
+    "llamada_saliente": "Llamada saliente",
+    "llamada_entrante": "Llamada entrante",
+    "pago_recibido": "Pago recibido",
+    "email": "Email",
+    "sms": "SMS",
+}
+
+
+def episodio_uuid(interaccion_id: str) -> str:
+    return str(uuid.uuid5(EPISODIOS_NS, interaccion_id))
+
+
+def _cliente(cid: str, cliente: Optional[Dict[str, Any]]) -> str:
+    if not cliente:
+        return f"cliente {cid}"
+    return (
+        f"cliente {cid} ({cliente.get('nombre')}, deuda {cliente.get('tipo_deuda')} "
+        f"de {cliente.get('monto_deuda_inicial')})"
+    )
+
+
+def contenido(i: Dict[str, Any], cliente: Optional[Dict[str, Any]] = None) -> str:
+    # Texto en lenguaje natural del que Graphiti extrae entidades y hechos
+    tipo = i.get("tipo")
+    quien = _cliente(i.get("cliente_id"), cliente)
+    if tipo == "pago_recibido":
+        partes = [f"Pago recibido del {quien}: {i.get('monto')}"]
+        if i.get("metodo_pago"):
+            partes.append(f"por {i['metodo_pago']}")
+        if i.get("pago_completo"):
+            partes.append("(pago completo)")
+        return " ".join(partes) + "."
+    if str(tipo).startswith("llamada"):
+        agente = i.get("agente_id") or "sin agente"
+        frases = [f"{TIPOS.get(tipo, tipo)} entre el agente {agente} y el {quien}."]
+        if i.get("duracion_segundos") is not None:
+            frases.append(f"Duración: {i['duracion_segundos']} segundos.")
+        if i.get("resultado"):
+            frases.append(f"Resultado: {i['resultado']}.")
+        if i.get("sentimiento") and i["sentimiento"] != "n/a":
+            frases.append(f"Sentimiento del cliente: {i['sentimiento']}.")
+        if i.get("monto_prometido") is not None:
+            frases.append(f"Promete pagar {i['monto_prometido']} el {i.get('fecha_promesa')}.")
+        plan = i.get("nuevo_plan_pago")
+        if plan:
+            frases.append(f"Nuevo plan de pago: {plan.get('cuotas')} cuotas de {plan.get('monto_mensual')}.")
+        return " ".join(frases)
+    return f"{TIPOS.get(tipo, tipo)} enviado al {quien}."
+
+
+def episodio(i: Dict[str, Any], cliente: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    # Mensaje de POST /messages del servidor de Graphiti (sin timestamp el
+    # servidor usa la hora de recepción)
+    msg = {
+        "uuid": episodio_uuid(i["id"]),
+        "name": i["id"],
+        "content": contenido(i, cliente),
+        "role_type": "system",
+        "role": i.get("agente_id") or "sistema_cobranza",
+        "source_description": f"interaccion {i.get('tipo')}",
+    }
+    ts = iso(to_datetime(i.get("timestamp")))
+    if ts is not None:
+        msg["timestamp"] = ts
+    return msg
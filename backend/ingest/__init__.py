@@ -0,0 +1,15 @@
+from ingest.batch import BatchWriter, DEFAULT_BATCH_SIZE, chunked, iso
+from ingest.parallel import ParallelIngest
+from ingest.reader import iter_records
+from ingest.validate import RejectsFile, validate_records
+
+__all__ = [
+    "BatchWriter",
+    "DEFAULT_BATCH_SIZE",
+    "ParallelIngest",
+    "RejectsFile",
+    "chunked",
+    "iso",
+    "iter_records",
+    "validate_records",
+]
@@ -0,0 +1,520 @@
+# ingest/batch.py
+import hashlib
+import json
+import time
+from datetime import date, datetime, timezone
+from itertools import groupby, islice
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from core.cache import Q_BUMP_DATASET_VERSION
+from ingest import chain, cumplimiento, rollups
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Versión de la huella: subirla si cambia cómo se derivan las filas de un registro,
+# así la siguiente corrida incremental reescribe todo
+HUELLA_VERSION = 1
+
+# Constraints (idempotentes)
+CONSTRAINTS = [
+    "CREATE CONSTRAINT cliente_id IF NOT EXISTS FOR (c:Cliente) REQUIRE c.id IS UNIQUE",
+    "CREATE CONSTRAINT agente_id  IF NOT EXISTS FOR (a:Agente)  REQUIRE a.id IS UNIQUE",
+    "CREATE CONSTRAINT deuda_id   IF NOT EXISTS FOR (d:Deuda)   REQUIRE d.id IS UNIQUE",
+    "CREATE CONSTRAINT inter_id   IF NOT EXISTS FOR (i:Interaccion) REQUIRE i.id IS UNIQUE",
+    # Índices de rango sobre valores temporales nativos (promesas-incumplidas)
+    "CREATE RANGE INDEX promesa_fecha IF NOT EXISTS FOR (p:Promesa) ON (p.fecha_promesa)",
+    "CREATE RANGE INDEX inter_tipo_ts IF NOT EXISTS FOR (i:Interaccion) ON (i.tipo, i.timestamp)",
+] + rollups.CONSTRAINTS
+
+# ---- Sentencias UNWIND (una por etapa y lote) ----
+Q_CLIENTES = """
+UNWIND $rows AS r
+MERGE (x:Cliente {id:r.id})
+SET x.nombre=r.nombre, x.telefono=r.telefono, x.tipo_deuda=r.tipo_deuda,
+    x.monto_deuda_inicial=r.monto, x.fecha_prestamo=r.fecha, x.huella=r.huella
+MERGE (dd:Deuda {id:r.deuda.id})
+SET dd.tipo=r.deuda.tipo, dd.monto_inicial=r.deuda.monto_inicial
+MERGE (x)-[:POSEE]->(dd)
+WITH x, dd
+// Si cambió el tipo de deuda, el cliente deja de poseer la anterior y la deuda sin
+// dueño se borra (si no, /analytics/kpis la sigue contando en deuda_por_tipo)
+OPTIONAL MATCH (x)-[vieja:POSEE]->(otra:Deuda) WHERE otra <> dd
+DELETE vieja
+WITH otra
+WHERE otra IS NOT NULL AND NOT EXISTS { ()-[:POSEE]->(otra) }
+DETACH DELETE otra
+"""
+
+Q_AGENTES = """
+UNWIND $ids AS id
+MERGE (:Agente {id:id})
+"""
+
+# Devuelve el estado previo de cada interacción (timestamp y KPI de llamada) para
+# encadenar SIGUE_A y actualizar los rollups sólo con lo que cambió
+Q_INTERACCIONES = (
+    """
+UNWIND $rows AS r
+MERGE (ev:Interaccion {id:r.id})
+WITH ev, r, ev.timestamp AS ts_prev, """
+    + rollups.KPI_PREV.strip()
+    + """ AS kpi_prev, """
+    + rollups.DIARIO_PREV.strip()
+    + """ AS diario_prev
+SET ev += r.props
+WITH ev, r, ts_prev, kpi_prev, diario_prev
+OPTIONAL MATCH (c:Cliente {id:r.cliente_id})
+FOREACH (_ IN CASE WHEN c IS NULL THEN [] ELSE [1] END | MERGE (c)-[:TUVO]->(ev))
+RETURN r.id AS id, r.cliente_id AS cliente_id, ev.timestamp AS ts, ts_prev, kpi_prev, diario_prev
+"""
+)
+
+Q_ATENDIDA_POR = """
+UNWIND $rows AS r
+MATCH (ev:Interaccion {id:r.id}), (a:Agente {id:r.agente_id})
+MERGE (ev)-[:ATENDIDA_POR]->(a)
+"""
+
+Q_PROMESAS = """
+UNWIND $rows AS r
+MERGE (p:Promesa {id:r.promesa.id})
+SET p.monto_prometido=r.promesa.monto_prometido, p.fecha_promesa=r.promesa.fecha_promesa
+WITH p, r
+MATCH (ev:Interaccion {id:r.id})
+MERGE (ev)-[:RESULTA_EN]->(p)
+"""
+
+Q_PLANES = """
+UNWIND $rows AS r
+MERGE (pl:PlanRenegociacion {id:r.plan.id})
+SET pl.cuotas=r.plan.cuotas, pl.monto_mensual=r.plan.monto_mensual
+WITH pl, r
+MATCH (ev:Interaccion {id:r.id})
+MERGE (ev)-[:RESULTA_EN]->(pl)
+"""
+
+Q_PAGOS = """
+UNWIND $rows AS r
+MATCH (ev:Interaccion {id:r.id}), (d:Deuda {id:r.deuda_id})
+MERGE (ev)-[:APLICADO_A]->(d)
+WITH ev, d
+OPTIONAL MATCH (ev)-[vieja:APLICADO_A]->(otra:Deuda) WHERE otra <> d
+DELETE vieja
+"""
+
+# Modo streaming: sin mapa en memoria, la deuda se resuelve por el cliente
+Q_PAGOS_POSEE = """
+UNWIND $rows AS r
+MATCH (ev:Interaccion {id:r.id})
+MATCH (:Cliente {id:r.cliente_id})-[:POSEE]->(d:Deuda)
+MERGE (ev)-[:APLICADO_A]->(d)
+WITH ev, d
+OPTIONAL MATCH (ev)-[vieja:APLICADO_A]->(otra:Deuda) WHERE otra <> d
+DELETE vieja
+"""
+
+# Modo incremental: huella guardada de los registros del lote (seek por constraint)
+Q_HUELLAS_CLIENTES = """
+UNWIND $ids AS id
+MATCH (x:Cliente {id:id})
+RETURN x.id AS id, x.huella AS huella
+"""
+
+Q_HUELLAS_INTERACCIONES = """
+UNWIND $ids AS id
+MATCH (x:Interaccion {id:id})
+RETURN x.id AS id, x.huella AS huella
+"""
+
+
+def iso(dt):
+    if dt is None:
+        return None
+    if isinstance(dt, str):
+        return dt
+    if isinstance(dt, datetime):
+        return dt.isoformat()
+    return str(dt)
+
+
+def to_datetime(dt):
+    # Valor temporal nativo (DateTime con zona en Neo4j); sin zona se asume UTC.
+    # Un string que no es ISO se deja tal cual para no perder el dato.
+    if dt is None:
+        return None
+    if isinstance(dt, str):
+        try:
+            dt = datetime.fromisoformat(dt.replace("Z", "+00:00"))
+        except ValueError:
+            return dt
+    elif isinstance(dt, date) and not isinstance(dt, datetime):
+        dt = datetime(dt.year, dt.month, dt.day)
+    if isinstance(dt, datetime) and dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def dia_hora(ts: Any) -> Tuple[Optional[int], Optional[int]]:
+    # dia_semana ISO (1 = lunes, como date.dayOfWeek en Cypher) y hora del timestamp
+    ts = to_datetime(ts)
+    if isinstance(ts, datetime):
+        return ts.isoweekday(), ts.hour
+    return None, None
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def tipo_deuda(c: Dict[str, Any]) -> str:
+    return c.get("tipo_deuda") or "desconocida"
+
+
+def deuda_id(cliente_id: str, tipo: str) -> str:
+    return f"{cliente_id}:{tipo}"
+
+
+def huella(rec: Dict[str, Any]) -> str:
+    # Hash del registro tal como viene en el export (claves ordenadas): se guarda
+    # en el nodo y permite saltar los registros que no cambiaron
+    data = json.dumps(rec, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.blake2b(f"{HUELLA_VERSION}:{data}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+# ---- Filas (dict -> parámetros de las sentencias) ----
+def cliente_row(c: Dict[str, Any]) -> Dict[str, Any]:
+    tipo = tipo_deuda(c)
+    return {
+        "id": c["id"],
+        "nombre": c.get("nombre"),
+        "telefono": c.get("telefono"),
+        "tipo_deuda": c.get("tipo_deuda"),
+        "monto": c.get("monto_deuda_inicial"),
+        "fecha": c.get("fecha_prestamo"),
+        "deuda": {
+            "id": deuda_id(c["id"], tipo),
+            "tipo": tipo,
+            "monto_inicial": c.get("monto_deuda_inicial", 0),
+        },
+    }
+
+
+def interaccion_row(i: Dict[str, Any], deudas: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    iid = i["id"]
+    cid = i["cliente_id"]
+    tipo = i.get("tipo", "")
+    # El export no trae dia_semana / hora_del_dia: se derivan del timestamp
+    ts = to_datetime(i.get("timestamp"))
+    dia, hora = dia_hora(ts)
+    props = {
+        "tipo": tipo,
+        "timestamp": ts,
+        "dia_semana": i.get("dia_semana", dia),
+        "hora_del_dia": i.get("hora_del_dia", hora),
+    }
+    row: Dict[str, Any] = {"id": iid, "cliente_id": cid, "props": props}
+
+    if tipo.startswith("llamada"):
+        props.update(
+            duracion_segundos=i.get("duracion_segundos", 0),
+            resultado=i.get("resultado"),
+            sentimiento=i.get("sentimiento"),
+            # Sin es_contacto explícito: hubo contacto si la llamada tuvo respuesta
+            es_contacto=i.get("es_contacto", i.get("resultado") not in (None, "sin_respuesta")),
+        )
+        row["agente_id"] = i.get("agente_id")
+        # Derivados: Promesa / Plan
+        if i.get("resultado") == "promesa_pago":
+            row["promesa"] = {
+                "id": f"promesa:{iid}",
+                "monto_prometido": i.get("monto_prometido"),
+                "fecha_promesa": to_datetime(i.get("fecha_promesa")),
+            }
+        if i.get("resultado") == "renegociacion":
+            # El export anida el plan en nuevo_plan_pago
+            plan = i.get("nuevo_plan_pago") or {}
+            row["plan"] = {
+                "id": f"plan:{iid}",
+                "cuotas": plan.get("cuotas", i.get("cuotas")),
+                "monto_mensual": plan.get("monto_mensual", i.get("monto_mensual")),
+            }
+
+    if tipo == "pago_recibido":
+        props.update(
+            monto=i.get("monto"),
+            metodo_pago=i.get("metodo_pago"),
+            pago_completo=i.get("pago_completo"),
+        )
+        # La deuda sale del mapa en memoria cliente -> deuda (sin ida a la BD);
+        # sin mapa (streaming) se resuelve en la misma sentencia vía POSEE
+        if deudas is None:
+            row["deuda_id"] = None
+        else:
+            row["deuda_id"] = deudas.get(cid) or deuda_id(cid, "desconocida")
+
+    return row
+
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.rows = 0
+        self.statements = 0
+        self.transactions = 0
+        self.retries = 0
+        self.seconds = 0.0
+        # Modo incremental: registros leídos que no cambiaron / nuevos / modificados
+        self.unchanged = 0
+        self.inserted = 0
+        self.updated = 0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:<14} {self.rows:>9} filas  {self.seconds:8.2f}s  "
+            f"{self.rows_per_sec:>10.0f} filas/s  "
+            f"{self.transactions} tx / {self.statements} sentencias"
+            + (f" / {self.retries} reintentos" if self.retries else "")
+            + (
+                f"  [{self.unchanged} sin cambios, {self.inserted} insertados, {self.updated} actualizados]"
+                if self.unchanged or self.inserted or self.updated
+                else ""
+            )
+        )
+
+
+class BatchWriter:
+    """Escribe en Neo4j con sentencias UNWIND por lotes, una transacción por lote.
+
+    Con `incremental` cada lote lee primero la huella guardada de sus registros y
+    sólo escribe los nuevos o modificados; los derivados (SIGUE_A, KpiHorario,
+    CUMPLIDA_POR) se recalculan sólo para esos. Los pagos de un cliente escrito en
+    la corrida se reescriben aunque no hayan cambiado, para reenlazar APLICADO_A.
+    """
+
+    def __init__(self, session, batch_size: int = DEFAULT_BATCH_SIZE, incremental: bool = False):
+        self.session = session
+        self.batch_size = batch_size
+        self.incremental = incremental
+        self.stats: Dict[str, StageStats] = {}
+        # Modo incremental: clientes nuevos o modificados en esta corrida
+        self.clientes_escritos: Set[str] = set()
+
+    def _stage(self, name: str) -> StageStats:
+        if name not in self.stats:
+            self.stats[name] = StageStats(name)
+        return self.stats[name]
+
+    def _write(
+        self,
+        stage: str,
+        nrows: int,
+        statements: List[Tuple[str, Dict[str, Any]]],
+        then: Optional[Callable[[Any, List[Dict[str, Any]]], None]] = None,
+    ):
+        statements = [(q, p) for q, p in statements if any(p.values())]
+        if not statements:
+            return
+
+        # `then` corre dentro de la misma transacción con las filas devueltas.
+        # execute_write reintenta la función ante errores transitorios (deadlocks)
+        attempts = 0
+
+        def work(tx):
+            nonlocal attempts
+            attempts += 1
+            returned: List[Dict[str, Any]] = []
+            for q, params in statements:
+                returned.extend(tx.run(q, **params).data())
+            if then is not None:
+                then(tx, returned)
+
+        t0 = time.perf_counter()
+        self.session.execute_write(work)
+        st = self._stage(stage)
+        st.rows += nrows
+        st.statements += len(statements)
+        st.transactions += 1
+        st.retries += attempts - 1
+        st.seconds += time.perf_counter() - t0
+
+    def _timed(self, stage: str, fn: Callable[[], int]):
+        t0 = time.perf_counter()
+        n = fn()
+        st = self._stage(stage)
+        st.rows += n
+        st.statements += 1 if n else 0
+        st.seconds += time.perf_counter() - t0
+
+    def _changed(
+        self,
+        stage: str,
+        query: str,
+        rows: List[Dict[str, Any]],
+        key: Callable[[Dict[str, Any]], str],
+        forzar: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> List[Dict[str, Any]]:
+        # Filtra el lote contra las huellas guardadas; sin modo incremental no lee nada.
+        # `forzar` marca filas a reescribir aunque su huella no haya cambiado
+        if not self.incremental or not rows:
+            return rows
+        t0 = time.perf_counter()
+        ids = [r["id"] for r in rows]
+        stored = {
+            m["id"]: m["huella"]
+            for m in self.session.execute_read(lambda tx: tx.run(query, ids=ids).data())
+        }
+        lookup = self._stage("huellas")
+        lookup.rows += len(rows)
+        lookup.statements += 1
+        lookup.transactions += 1
+        lookup.seconds += time.perf_counter() - t0
+
+        st = self._stage(stage)
+        out = []
+        for r in rows:
+            if r["id"] not in stored:
+                st.inserted += 1
+                out.append(r)
+            elif stored[r["id"]] != key(r) or (forzar is not None and forzar(r)):
+                st.updated += 1
+                out.append(r)
+            else:
+                st.unchanged += 1
+        return out
+
+    def _after(self, tx, rows: List[Dict[str, Any]], returned: List[Dict[str, Any]]):
+        # Derivados incrementales en la misma transacción que el lote: SIGUE_A sobre
+        # las interacciones nuevas, CUMPLIDA_POR de las promesas de los clientes con
+        # promesas o pagos en el lote y, al final, los deltas de los rollups por
+        # horario y por día (ver Q_ROLLUPS_DELTA: así los workers no se serializan
+        # sobre los nodos de rollup mientras corren las otras etapas)
+        props = {r["id"]: r["props"] for r in rows}
+        self._timed("sigue_a", lambda: chain.link(tx, returned))
+        self._timed(
+            "cumplida_por",
+            lambda: cumplimiento.link(tx, cumplimiento.clientes_afectados(rows)),
+        )
+        self._timed(
+            "rollups",
+            lambda: rollups.apply(
+                tx,
+                ((m["kpi_prev"], rollups.kpi(props[m["id"]])) for m in returned),
+                ((m["diario_prev"], rollups.diario(props[m["id"]])) for m in returned),
+            ),
+        )
+
+    def constraints(self):
+        t0 = time.perf_counter()
+        for q in CONSTRAINTS:
+            self.session.run(q).consume()
+        st = self._stage("constraints")
+        st.statements += len(CONSTRAINTS)
+        st.seconds += time.perf_counter() - t0
+
+    def clientes(
+        self, clientes: Iterable[Dict[str, Any]], deudas: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, str]]:
+        for chunk in chunked(clientes, self.batch_size):
+            rows = [dict(cliente_row(c), huella=huella(c)) for c in chunk]
+            if deudas is not None:
+                for r in rows:
+                    deudas[r["id"]] = r["deuda"]["id"]
+            rows = self._changed("clientes", Q_HUELLAS_CLIENTES, rows, itemgetter("huella"))
+            if self.incremental:
+                self.clientes_escritos.update(r["id"] for r in rows)
+            self._write("clientes", len(rows), [(Q_CLIENTES, {"rows": rows})])
+        return deudas
+
+    def agentes(self, ids: Iterable[str]):
+        for chunk in chunked(ids, self.batch_size):
+            self._write("agentes", len(chunk), [(Q_AGENTES, {"ids": chunk})])
+
+    def interacciones(
+        self,
+        interacciones: Iterable[Dict[str, Any]],
+        deudas: Optional[Dict[str, str]],
+        merge_agentes: bool = False,
+        clientes_escritos: Optional[Set[str]] = None,
+    ):
+        # Los pagos de los clientes escritos en la corrida se reescriben: su deuda
+        # pudo cambiar (tipo_deuda) sin que cambie el registro del pago
+        if clientes_escritos is None:
+            clientes_escritos = self.clientes_escritos
+        for chunk in chunked(interacciones, self.batch_size):
+            rows = [interaccion_row(i, deudas) for i in chunk]
+            for r, i in zip(rows, chunk):
+                r["props"]["huella"] = huella(i)
+            rows = self._changed(
+                "interacciones",
+                Q_HUELLAS_INTERACCIONES,
+                rows,
+                lambda r: r["props"]["huella"],
+                forzar=lambda r: "deuda_id" in r and r["cliente_id"] in clientes_escritos,
+            )
+            pagos = [r for r in rows if "deuda_id" in r]
+            agentes = sorted({r["agente_id"] for r in rows if r.get("agente_id")}) if merge_agentes else []
+            self._write(
+                "interacciones",
+                len(rows),
+                [
+                    (Q_AGENTES, {"ids": agentes}),
+                    (Q_INTERACCIONES, {"rows": rows}),
+                    (Q_ATENDIDA_POR, {"rows": [r for r in rows if r.get("agente_id")]}),
+                    (Q_PROMESAS, {"rows": [r for r in rows if "promesa" in r]}),
+                    (Q_PLANES, {"rows": [r for r in rows if "plan" in r]}),
+                    (Q_PAGOS, {"rows": [r for r in pagos if r["deuda_id"]]}),
+                    (Q_PAGOS_POSEE, {"rows": [r for r in pagos if not r["deuda_id"]]}),
+                ],
+                then=lambda tx, returned, rows=rows: self._after(tx, rows, returned),
+            )
+
+    def stream(
+        self,
+        records: Iterable[Tuple[str, Dict[str, Any]]],
+        sink: Optional[Callable[[Iterable[Dict[str, Any]]], None]] = None,
+    ):
+        # Pipeline de generadores: cada tramo consecutivo de clientes o interacciones
+        # se consume por lotes sin materializar el archivo ni el mapa de deudas.
+        # Los agentes se crean por lote (MERGE) al no conocerse de antemano.
+        # `sink` permite mandar las interacciones a otro escritor (p. ej. ParallelIngest).
+        if sink is None:
+
+            def sink(items):
+                self.interacciones(items, None, merge_agentes=True)
+
+        for key, group in groupby(records, key=itemgetter(0)):
+            if key == "clientes":
+                self.clientes(rec for _, rec in group)
+            else:
+                sink(rec for _, rec in group)
+
+    def bump_version(self) -> int:
+        # Una vez por corrida: invalida el cache de respuestas del API (core/cache.py)
+        return self.session.execute_write(
+            lambda tx: tx.run(Q_BUMP_DATASET_VERSION).single()["version"]
+        )
+
+    @property
+    def changed(self) -> bool:
+        # Hubo escrituras (siempre en modo completo)
+        if not self.incremental:
+            return True
+        return any(st.inserted or st.updated for st in self.stats.values())
+
+    def report(self) -> List[str]:
+        return [str(st) for st in self.stats.values()]
+
+    @property
+    def round_trips(self) -> int:
+        return sum(st.statements for st in self.stats.values())
+
@@ -0,0 +1,243 @@
+# ingest/bulk.py
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ingest.batch import cliente_row, huella, interaccion_row
+from ingest.reader import Record
+
+# Propiedades de Interaccion que puede escribir BatchWriter (SET ev += r.props)
+PROPS_INTERACCION = (
+    "tipo",
+    "timestamp",
+    "dia_semana",
+    "hora_del_dia",
+    "duracion_segundos",
+    "resultado",
+    "sentimiento",
+    "es_contacto",
+    "monto",
+    "metodo_pago",
+    "pago_completo",
+    # Para que una carga offline admita después la ingesta --incremental
+    "huella",
+)
+
+# Tipo inferido por valor Python -> tipo de columna de neo4j-admin
+_TIPOS = {bool: "boolean", int: "long", float: "double", str: "string", datetime: "datetime"}
+
+
+def _cell(value: Any) -> str:
+    # Vacío = propiedad ausente (como SET x.p = null); strings siempre entre comillas
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class CsvTable:
+    """Un archivo de datos de neo4j-admin más su cabecera (<nombre>_header.csv).
+
+    La cabecera se escribe al cerrar, con el tipo de cada propiedad inferido de los
+    valores vistos: enteros y decimales mezclados quedan como double, cualquier otra
+    mezcla como string. Las columnas de `temporales` son datetime fijo.
+    """
+
+    def __init__(self, directory: str, name: str, keys: List[str], props: Iterable[str] = (),
+                 temporales: Iterable[str] = ()):
+        self.directory = directory
+        self.name = name
+        self.keys = keys
+        self.props = list(props)
+        self.temporales = set(temporales)
+        self.tipos: Dict[str, Set[str]] = {p: set() for p in self.props}
+        self.rows = 0
+        self.data_path = os.path.join(directory, f"{name}.csv")
+        self.header_path = os.path.join(directory, f"{name}_header.csv")
+        self._f = open(self.data_path, "w", encoding="utf-8", newline="")
+
+    def write(self, keys: Tuple[Any, ...], props: Optional[Dict[str, Any]] = None):
+        values = list(keys)
+        for p in self.props:
+            v = (props or {}).get(p)
+            if v is not None:
+                self.tipos[p].add(_TIPOS.get(type(v), "string"))
+            values.append(v)
+        self._f.write(",".join(_cell(v) for v in values) + "\n")
+        self.rows += 1
+
+    def _tipo(self, prop: str) -> str:
+        if prop in self.temporales:
+            return "datetime"
+        tipos = self.tipos[prop]
+        if len(tipos) == 1:
+            return next(iter(tipos))
+        if tipos and tipos <= {"long", "double"}:
+            return "double"
+        return "string"
+
+    def close(self):
+        self._f.close()
+        header = self.keys + [f"{p}:{self._tipo(p)}" for p in self.props]
+        with open(self.header_path, "w", encoding="utf-8", newline="") as f:
+            f.write(",".join(header) + "\n")
+
+    @property
+    def files(self) -> str:
+        return f"{self.header_path},{self.data_path}"
+
+
+class AdminCsvExport:
+    """Escribe el dataset como CSV para `neo4j-admin database import full`.
+
+    Mismos nodos, ids derivados (`{cliente}:{tipo_deuda}`, `promesa:{iid}`,
+    `plan:{iid}`), propiedades y aristas que BatchWriter, incluida la cadena SIGUE_A
+    por cliente en orden (timestamp, id). Lo que el importador no puede derivar
+    (constraints, KpiHorario, KpiDiario, CUMPLIDA_POR, DatasetVersion) se completa
+    después con `python -m scripts.export_admin_csv --post-import`.
+
+    Ids repetidos: se queda la última aparición, como en la ingesta transaccional
+    (MERGE + SET: el último registro gana); las demás se cuentan en `duplicados`.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.nodes = {
+            "Cliente": CsvTable(directory, "Cliente", ["id:ID(Cliente)"],
+                                ("nombre", "telefono", "tipo_deuda", "monto_deuda_inicial", "fecha_prestamo",
+                                 "huella")),
+            "Deuda": CsvTable(directory, "Deuda", ["id:ID(Deuda)"], ("tipo", "monto_inicial")),
+            "Agente": CsvTable(directory, "Agente", ["id:ID(Agente)"]),
+            "Interaccion": CsvTable(directory, "Interaccion", ["id:ID(Interaccion)"], PROPS_INTERACCION,
+                                    temporales=("timestamp",)),
+            "Promesa": CsvTable(directory, "Promesa", ["id:ID(Promesa)"], ("monto_prometido", "fecha_promesa"),
+                                temporales=("fecha_promesa",)),
+            "PlanRenegociacion": CsvTable(directory, "PlanRenegociacion", ["id:ID(PlanRenegociacion)"],
+                                          ("cuotas", "monto_mensual")),
+        }
+
+        def rel(name: str, start: str, end: str) -> CsvTable:
+            return CsvTable(directory, name, [f":START_ID({start})", f":END_ID({end})"])
+
+        # (tipo de relación, tabla)
+        self.rels = [
+            ("POSEE", rel("POSEE", "Cliente", "Deuda")),
+            ("TUVO", rel("TUVO", "Cliente", "Interaccion")),
+            ("ATENDIDA_POR", rel("ATENDIDA_POR", "Interaccion", "Agente")),
+            ("RESULTA_EN", rel("RESULTA_EN_Promesa", "Interaccion", "Promesa")),
+            ("RESULTA_EN", rel("RESULTA_EN_Plan", "Interaccion", "PlanRenegociacion")),
+            ("APLICADO_A", rel("APLICADO_A", "Interaccion", "Deuda")),
+            ("SIGUE_A", rel("SIGUE_A", "Interaccion", "Interaccion")),
+        ]
+        self._rel = {t.name: t for _, t in self.rels}
+        self.deudas: Dict[str, str] = {}
+        self.agentes: Set[str] = set()
+        # cliente_id -> [(timestamp, id)] para la cadena SIGUE_A
+        self.cadenas: Dict[str, List[Tuple[datetime, str]]] = {}
+        self.duplicados = 0
+        # Timestamps / fechas que no son ISO: la columna es datetime, se omiten
+        self.fechas_invalidas = 0
+
+    def clientes(self, clientes: Iterable[Dict[str, Any]]):
+        for c in clientes:
+            r = cliente_row(c)
+            d = r["deuda"]
+            self.deudas[r["id"]] = d["id"]
+            self.nodes["Cliente"].write((r["id"],), {
+                "nombre": r["nombre"],
+                "telefono": r["telefono"],
+                "tipo_deuda": r["tipo_deuda"],
+                "monto_deuda_inicial": r["monto"],
+                "fecha_prestamo": r["fecha"],
+                "huella": huella(c),
+            })
+            self.nodes["Deuda"].write((d["id"],), {"tipo": d["tipo"], "monto_inicial": d["monto_inicial"]})
+            self._rel["POSEE"].write((r["id"], d["id"]))
+
+    def _fecha(self, value: Any) -> Optional[datetime]:
+        if value is not None and not isinstance(value, datetime):
+            self.fechas_invalidas += 1
+            return None
+        return value
+
+    def interaccion(self, i: Dict[str, Any]):
+        r = interaccion_row(i, self.deudas)
+        iid, cid = r["id"], r["cliente_id"]
+        props = dict(r["props"], timestamp=self._fecha(r["props"]["timestamp"]), huella=huella(i))
+        self.nodes["Interaccion"].write((iid,), props)
+
+        # TUVO / SIGUE_A / APLICADO_A sólo si el cliente existe (MATCH en la ingesta)
+        if cid in self.deudas:
+            self._rel["TUVO"].write((cid, iid))
+            if props["timestamp"] is not None:
+                self.cadenas.setdefault(cid, []).append((props["timestamp"], iid))
+            if "deuda_id" in r:
+                self._rel["APLICADO_A"].write((iid, self.deudas[cid]))
+        if r.get("agente_id"):
+            self.agentes.add(r["agente_id"])
+            self._rel["ATENDIDA_POR"].write((iid, r["agente_id"]))
+        if "promesa" in r:
+            p = r["promesa"]
+            self.nodes["Promesa"].write((p["id"],), {
+                "monto_prometido": p["monto_prometido"],
+                "fecha_promesa": self._fecha(p["fecha_promesa"]),
+            })
+            self._rel["RESULTA_EN_Promesa"].write((iid, p["id"]))
+        if "plan" in r:
+            pl = r["plan"]
+            self.nodes["PlanRenegociacion"].write((pl["id"],), {
+                "cuotas": pl["cuotas"], "monto_mensual": pl["monto_mensual"],
+            })
+            self._rel["RESULTA_EN_Plan"].write((iid, pl["id"]))
+
+    def stream(self, records: Callable[[], Iterable[Record]]):
+        # Dos pasadas sobre el archivo (`records` lo vuelve a abrir): la primera ubica
+        # la última aparición de cada id y la deuda final de cada cliente, así TUVO y
+        # APLICADO_A ven a todos los clientes como en la ingesta en memoria (clientes
+        # antes que interacciones); la segunda escribe sólo esas apariciones
+        ultima: Dict[Tuple[str, str], int] = {}
+        for n, (key, rec) in enumerate(records()):
+            ultima[(key, rec["id"])] = n
+            if key == "clientes":
+                self.deudas[rec["id"]] = cliente_row(rec)["deuda"]["id"]
+        for n, (key, rec) in enumerate(records()):
+            if ultima[(key, rec["id"])] != n:
+                self.duplicados += 1
+            elif key == "clientes":
+                self.clientes([rec])
+            else:
+                self.interaccion(rec)
+
+    def close(self):
+        for aid in sorted(self.agentes):
+            self.nodes["Agente"].write((aid,))
+        sigue_a = self._rel["SIGUE_A"]
+        for evs in self.cadenas.values():
+            evs.sort()
+            for (_, a), (_, b) in zip(evs, evs[1:]):
+                sigue_a.write((a, b))
+        for t in list(self.nodes.values()) + [t for _, t in self.rels]:
+            t.close()
+
+    def summary(self) -> List[str]:
+        lines = [f"{name:<20} {t.rows:>10} nodos" for name, t in self.nodes.items()]
+        lines += [f"{t.name:<20} {t.rows:>10} relaciones" for _, t in self.rels]
+        if self.duplicados:
+            lines.append(f"{self.duplicados} ids repetidos omitidos (se conserva la última aparición)")
+        if self.fechas_invalidas:
+            lines.append(f"{self.fechas_invalidas} fechas no ISO omitidas")
+        return lines
+
+    def command(self, database: str) -> str:
+        # neo4j-admin con la base detenida; las rutas deben verse desde el servidor
+        args = [f"neo4j-admin database import full {database}", "--overwrite-destination",
+                "--multiline-fields=true", "--id-type=string"]
+        args += [f"--nodes={name}={t.files}" for name, t in self.nodes.items()]
+        args += [f"--relationships={rel}={t.files}" for rel, t in self.rels]
+        return " \\\n  ".join(args)
@@ -0,0 +1,63 @@
+# ingest/chain.py
+from typing import Any, Dict, Iterable, List
+
+# Re-enlaza SIGUE_A sólo en el tramo de cada cliente afectado por el lote: desde la
+# última interacción anterior a la nueva más antigua (`desde`) hasta el final. Si el
+# lote sólo agrega interacciones al final de la historia (caso diario), el tramo es
+# el delta más un nodo. Se borran las SIGUE_A salientes del tramo y se vuelven a
+# crear en orden (timestamp, id), así que la cadena sigue siendo lineal.
+Q_SIGUE_A_INCREMENTAL = """
+UNWIND $rows AS r
+MATCH (c:Cliente {id:r.cliente_id})
+CALL {
+  WITH c, r
+  OPTIONAL MATCH (c)-[:TUVO]->(p:Interaccion)
+  WHERE p.timestamp < r.desde
+  WITH p ORDER BY p.timestamp DESC, p.id DESC LIMIT 1
+  RETURN p AS prev
+}
+CALL {
+  WITH c, r
+  MATCH (c)-[:TUVO]->(i:Interaccion)
+  WHERE i.timestamp >= r.desde
+  WITH i ORDER BY i.timestamp ASC, i.id ASC
+  RETURN collect(i) AS tail
+}
+WITH CASE WHEN prev IS NULL THEN tail ELSE [prev] + tail END AS evs
+CALL {
+  WITH evs
+  UNWIND evs AS e
+  MATCH (e)-[old:SIGUE_A]->()
+  DELETE old
+}
+UNWIND range(0, size(evs) - 2) AS k
+WITH evs[k] AS a, evs[k + 1] AS b
+MERGE (a)-[:SIGUE_A]->(b)
+"""
+
+
+def desde_por_cliente(moved: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # moved: filas {cliente_id, ts, ts_prev}; sólo cuentan las interacciones nuevas
+    # o con timestamp cambiado. Si el timestamp cambió, el tramo empieza en la
+    # posición más temprana de las dos: así también se borra la SIGUE_A que el
+    # antiguo predecesor tenía hacia ella (si no, la cadena se ramifica).
+    # Un ts_prev string (grafos cargados antes de guardar DateTime nativos) no se
+    # compara con el nuevo: el tramo empieza en `ts`
+    desde: Dict[str, Any] = {}
+    for m in moved:
+        cid, ts, ts_prev = m["cliente_id"], m["ts"], m.get("ts_prev")
+        if isinstance(ts_prev, str):
+            ts_prev = None
+        if ts is None or ts == ts_prev:
+            continue
+        inicio = ts if ts_prev is None else min(ts, ts_prev)
+        if cid not in desde or inicio < desde[cid]:
+            desde[cid] = inicio
+    return [{"cliente_id": cid, "desde": ts} for cid, ts in desde.items()]
+
+
+def link(tx, moved: Iterable[Dict[str, Any]]) -> int:
+    rows = desde_por_cliente(moved)
+    if rows:
+        tx.run(Q_SIGUE_A_INCREMENTAL, rows=rows).consume()
+    return len(rows)
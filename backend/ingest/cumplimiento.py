@@ -0,0 +1,68 @@
+# ingest/cumplimiento.py
+import os
+from typing import Any, Dict, Iterable, List
+
+# Ventana de pago (días desde fecha_promesa) con la que se materializa CUMPLIDA_POR;
+# queda en cada promesa (ventana_dias) y los endpoints usan los derivados sólo si
+# ventanaDias coincide con la guardada en todas
+VENTANA_DIAS = int(os.getenv("CUMPLIMIENTO_VENTANA_DIAS", 14))
+
+# Recalcula las promesas de los clientes afectados por el lote. Por promesa se guardan
+# la suma y el máximo de los pagos en la ventana y si se cumple en cada modo
+# (acumulado: la suma cubre el monto; estricto: un solo pago lo cubre). Si se cumple
+# en modo acumulado se enlaza a cada pago de la ventana con CUMPLIDA_POR; la arista
+# lleva `estricto` cuando ese pago por sí solo cubre el monto.
+Q_CUMPLIDA_POR = """
+UNWIND $clientes AS cid
+MATCH (c:Cliente {id:cid})-[:TUVO]->(:Interaccion)-[:RESULTA_EN]->(p:Promesa)
+WHERE p.fecha_promesa IS NOT NULL
+CALL {
+  WITH p
+  MATCH (p)-[old:CUMPLIDA_POR]->()
+  DELETE old
+}
+CALL {
+  WITH c, p
+  OPTIONAL MATCH (c)-[:TUVO]->(pay:Interaccion)
+  WHERE pay.tipo = 'pago_recibido'
+    AND pay.timestamp >= p.fecha_promesa
+    AND pay.timestamp <= p.fecha_promesa + duration({days: $ventana})
+  RETURN collect(pay) AS pagos,
+         toFloat(sum(coalesce(pay.monto, 0))) AS total,
+         toFloat(coalesce(max(pay.monto), 0)) AS maximo
+}
+WITH p, pagos, total, maximo, coalesce(p.monto_prometido, 0.0) AS objetivo
+SET p.ventana_dias = $ventana,
+    p.monto_en_ventana = total,
+    p.monto_max_en_ventana = maximo,
+    p.cumplida_acumulado = total >= objetivo,
+    p.cumplida_estricto = maximo >= objetivo
+WITH p, pagos, objetivo
+UNWIND (CASE WHEN p.cumplida_acumulado THEN pagos ELSE [] END) AS pay
+MERGE (p)-[e:CUMPLIDA_POR]->(pay)
+SET e.estricto = coalesce(pay.monto, 0) >= objetivo
+"""
+
+# Clientes con promesas (para recalcular un grafo cargado antes de existir el derivado)
+Q_CLIENTES_CON_PROMESAS = """
+MATCH (c:Cliente)-[:TUVO]->(:Interaccion)-[:RESULTA_EN]->(:Promesa)
+RETURN DISTINCT c.id AS id
+ORDER BY id
+"""
+
+
+def clientes_afectados(rows: Iterable[Dict[str, Any]]) -> List[str]:
+    # Una promesa nueva o un pago nuevo/cambiado sólo afecta a las promesas de su cliente
+    return sorted(
+        {
+            r["cliente_id"]
+            for r in rows
+            if "promesa" in r or r["props"].get("tipo") == "pago_recibido"
+        }
+    )
+
+
+def link(tx, clientes: List[str], ventana: int = VENTANA_DIAS) -> int:
+    if clientes:
+        tx.run(Q_CUMPLIDA_POR, clientes=clientes, ventana=ventana).consume()
+    return len(clientes)
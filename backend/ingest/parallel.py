@@ -0,0 +1,117 @@
+# ingest/parallel.py
+import queue
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from ingest.batch import BatchWriter, StageStats
+
+# Cola acotada por worker: el lector no se adelanta más de N lotes por partición
+QUEUE_DEPTH = 4
+_FIN = object()
+
+
+def partition(cliente_id: str, workers: int) -> int:
+    # Hash estable (no depende de PYTHONHASHSEED): un cliente siempre cae en el mismo
+    # worker, así TUVO / SIGUE_A / POSEE de un cliente nunca se escriben en paralelo
+    return zlib.crc32(cliente_id.encode("utf-8")) % workers
+
+
+class ParallelIngest:
+    """Reparte interacciones por cliente_id entre N workers, cada uno con su sesión.
+
+    Los nodos compartidos (constraints, clientes, agentes) se crean antes desde el
+    hilo principal. Los interbloqueos transitorios sobre nodos compartidos (Agente)
+    los reintenta `execute_write`; los reintentos quedan en las estadísticas.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        workers: int,
+        batch_size: int,
+        deudas: Optional[Dict[str, str]] = None,
+        merge_agentes: bool = False,
+        incremental: bool = False,
+        clientes_escritos: Optional[Set[str]] = None,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self.deudas = deudas
+        self.merge_agentes = merge_agentes
+        self.incremental = incremental
+        # Clientes escritos por el hilo principal (ver BatchWriter.interacciones)
+        self.clientes_escritos = clientes_escritos
+        self.writers: List[BatchWriter] = []
+        self.errors: List[BaseException] = []
+        self.seconds = 0.0
+
+    def _worker(self, q: "queue.Queue"):
+        try:
+            with self.session_factory() as session:
+                w = BatchWriter(session, batch_size=self.batch_size, incremental=self.incremental)
+                self.writers.append(w)
+                while True:
+                    chunk = q.get()
+                    if chunk is _FIN:
+                        return
+                    w.interacciones(
+                        chunk,
+                        self.deudas,
+                        merge_agentes=self.merge_agentes,
+                        clientes_escritos=self.clientes_escritos,
+                    )
+        except BaseException as e:
+            self.errors.append(e)
+            # Vacía la cola para no bloquear al productor
+            while q.get() is not _FIN:
+                pass
+
+    def run(self, interacciones: Iterable[Dict[str, Any]]):
+        t0 = time.perf_counter()
+        queues = [queue.Queue(maxsize=QUEUE_DEPTH) for _ in range(self.workers)]
+        threads = [
+            threading.Thread(target=self._worker, args=(q,), name=f"ingest-{n}", daemon=True)
+            for n, q in enumerate(queues)
+        ]
+        for t in threads:
+            t.start()
+
+        buffers: List[List[Dict[str, Any]]] = [[] for _ in range(self.workers)]
+        try:
+            for i in interacciones:
+                n = partition(i["cliente_id"], self.workers)
+                buffers[n].append(i)
+                if len(buffers[n]) >= self.batch_size:
+                    queues[n].put(buffers[n])
+                    buffers[n] = []
+            for n, buf in enumerate(buffers):
+                if buf:
+                    queues[n].put(buf)
+        finally:
+            for q in queues:
+                q.put(_FIN)
+            for t in threads:
+                t.join()
+        self.seconds += time.perf_counter() - t0
+        if self.errors:
+            raise self.errors[0]
+
+    def stats(self) -> Dict[str, StageStats]:
+        # Suma por etapa; el tiempo es el de pared de la fase paralela
+        merged: Dict[str, StageStats] = {}
+        for w in self.writers:
+            for name, st in w.stats.items():
+                m = merged.setdefault(name, StageStats(name))
+                m.rows += st.rows
+                m.statements += st.statements
+                m.transactions += st.transactions
+                m.retries += st.retries
+                m.unchanged += st.unchanged
+                m.inserted += st.inserted
+                m.updated += st.updated
+        for m in merged.values():
+            m.seconds = self.seconds
+        return merged
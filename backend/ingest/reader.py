@@ -0,0 +1,130 @@
+# ingest/reader.py
+import gzip
+import io
+import json
+from typing import Any, Dict, Iterator, Tuple
+
+CHUNK_SIZE = 1 << 16
+STREAM_KEYS = ("clientes", "interacciones")
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+Record = Tuple[str, Dict[str, Any]]
+
+
+def open_text(path: str) -> io.TextIOBase:
+    # gzip se detecta por los magic bytes, no por la extensión
+    with open(path, "rb") as f:
+        magic = f.read(2)
+    if magic == b"\x1f\x8b":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def is_ndjson(path: str) -> bool:
+    name = path[:-3] if path.endswith(".gz") else path
+    return name.endswith(NDJSON_SUFFIXES)
+
+
+def iter_records(path: str) -> Iterator[Record]:
+    """Itera (clave, registro) leyendo el archivo de forma incremental.
+
+    Acepta el JSON del export ({metadata, clientes, interacciones}) o NDJSON con un
+    registro por línea, ambos opcionalmente comprimidos con gzip. Los clientes deben
+    aparecer antes que sus interacciones (el export ya viene en ese orden).
+    """
+    with open_text(path) as f:
+        if is_ndjson(path):
+            yield from _iter_ndjson(f)
+        else:
+            yield from _JsonArrayStream(f).iter_items(STREAM_KEYS)
+
+
+def _iter_ndjson(f) -> Iterator[Record]:
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        rec = json.loads(line)
+        yield ("interacciones" if "cliente_id" in rec else "clientes"), rec
+
+
+class _JsonArrayStream:
+    # Recorre el objeto raíz y decodifica uno a uno los elementos de los arrays
+    # pedidos; el resto de valores (metadata) se decodifican enteros y se descartan.
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        more = self.f.read(self.chunk_size)
+        if not more:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + more
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, ch: str):
+        got = self._peek()
+        if got != ch:
+            raise ValueError(f"JSON inválido: se esperaba {ch!r} y llegó {got!r} (offset {self.pos})")
+        self.pos += 1
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Un escalar que termina justo al final del buffer puede estar cortado
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def iter_items(self, keys: Tuple[str, ...]) -> Iterator[Record]:
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key in keys and self._peek() == "[":
+                self.pos += 1
+                if self._peek() == "]":
+                    self.pos += 1
+                else:
+                    while True:
+                        yield key, self._value()
+                        if self._peek() == ",":
+                            self.pos += 1
+                            continue
+                        self._expect("]")
+                        break
+            else:
+                self._value()
+            if self._peek() == ",":
+                self.pos += 1
+                continue
+            self._expect("}")
+            return
+
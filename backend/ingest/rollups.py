@@ -0,0 +1,302 @@
+# ingest/rollups.py
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Resultados que cuentan como éxito en /analytics/mejores-horarios
+EXITOS = ("promesa_pago", "pago_inmediato", "renegociacion")
+
+CONSTRAINTS = [
+    "CREATE CONSTRAINT kpi_horario_id IF NOT EXISTS FOR (k:KpiHorario) REQUIRE k.id IS UNIQUE",
+    "CREATE CONSTRAINT kpi_diario_id IF NOT EXISTS FOR (k:KpiDiario) REQUIRE k.id IS UNIQUE",
+    # /analytics/series: range seek por fecha, costo proporcional a los días pedidos
+    "CREATE RANGE INDEX kpi_diario_fecha IF NOT EXISTS FOR (k:KpiDiario) ON (k.fecha)",
+]
+
+# Contadores del rollup diario (KpiDiario, un nodo por día UTC con actividad)
+CAMPOS_DIARIO = ("llamadas", "contactos", "promesas", "pagos", "monto_pagado")
+
+# Estado KPI de una llamada tal como quedó en el grafo antes del SET del lote
+# (lo devuelve Q_INTERACCIONES como `kpi_prev`)
+KPI_PREV = """
+CASE WHEN ev.tipo STARTS WITH 'llamada' THEN {
+  dia: ev.dia_semana,
+  hora: ev.hora_del_dia,
+  contacto: coalesce(ev.es_contacto, false),
+  exito: coalesce(ev.resultado IN ['promesa_pago','pago_inmediato','renegociacion'], false)
+} END
+"""
+
+# Deltas ordenados por id: todos los escritores toman los locks en el mismo orden
+Q_KPI_HORARIO_DELTA = """
+UNWIND $rows AS r
+MERGE (k:KpiHorario {id:r.id})
+ON CREATE SET k.dia_semana=r.dia, k.hora_del_dia=r.hora,
+              k.llamadas=0, k.contactos=0, k.exitos=0
+SET k.llamadas = k.llamadas + r.llamadas,
+    k.contactos = k.contactos + r.contactos,
+    k.exitos = k.exitos + r.exitos
+"""
+
+# Agregado de referencia sobre las interacciones (el scan que reemplaza el rollup)
+Q_KPI_HORARIO_SCAN = """
+MATCH (i:Interaccion)
+WHERE i.tipo STARTS WITH 'llamada'
+  AND i.dia_semana IS NOT NULL AND i.hora_del_dia IS NOT NULL
+RETURN i.dia_semana AS dia, i.hora_del_dia AS hora,
+       count(*) AS llamadas,
+       sum(CASE WHEN coalesce(i.es_contacto,false) THEN 1 ELSE 0 END) AS contactos,
+       sum(CASE WHEN i.resultado IN ['promesa_pago','pago_inmediato','renegociacion'] THEN 1 ELSE 0 END) AS exitos
+"""
+
+Q_KPI_HORARIO_READ = """
+MATCH (k:KpiHorario)
+WHERE k.llamadas <> 0 OR k.contactos <> 0 OR k.exitos <> 0
+RETURN k.dia_semana AS dia, k.hora_del_dia AS hora,
+       k.llamadas AS llamadas, k.contactos AS contactos, k.exitos AS exitos
+"""
+
+Q_KPI_HORARIO_REBUILD = [
+    "MATCH (k:KpiHorario) DETACH DELETE k",
+    """
+    MATCH (i:Interaccion)
+    WHERE i.tipo STARTS WITH 'llamada'
+      AND i.dia_semana IS NOT NULL AND i.hora_del_dia IS NOT NULL
+    WITH i.dia_semana AS dia, i.hora_del_dia AS hora,
+         count(*) AS llamadas,
+         sum(CASE WHEN coalesce(i.es_contacto,false) THEN 1 ELSE 0 END) AS contactos,
+         sum(CASE WHEN i.resultado IN ['promesa_pago','pago_inmediato','renegociacion'] THEN 1 ELSE 0 END) AS exitos
+    CREATE (:KpiHorario {id: toString(dia) + ':' + toString(hora),
+                         dia_semana: dia, hora_del_dia: hora,
+                         llamadas: llamadas, contactos: contactos, exitos: exitos})
+    """,
+]
+
+# Estado de la interacción para el rollup diario antes del SET del lote
+# (lo devuelve Q_INTERACCIONES como `diario_prev`)
+DIARIO_PREV = """
+CASE WHEN ev.timestamp IS NULL THEN NULL ELSE {
+  ts: ev.timestamp,
+  tipo: ev.tipo,
+  resultado: ev.resultado,
+  contacto: coalesce(ev.es_contacto, false),
+  monto: ev.monto
+} END
+"""
+
+Q_KPI_DIARIO_DELTA = """
+UNWIND $rows AS r
+MERGE (k:KpiDiario {id:r.id})
+ON CREATE SET k.fecha=date(r.id), k.llamadas=0, k.contactos=0, k.promesas=0,
+              k.pagos=0, k.monto_pagado=0.0
+SET k.llamadas = k.llamadas + r.llamadas,
+    k.contactos = k.contactos + r.contactos,
+    k.promesas = k.promesas + r.promesas,
+    k.pagos = k.pagos + r.pagos,
+    k.monto_pagado = k.monto_pagado + r.monto_pagado
+"""
+
+# Ambos rollups en una sola sentencia, la última de la transacción de cada lote:
+# sus nodos los comparten todos los workers de la ingesta y el lock de escritura
+# dura hasta el commit, así que se toman lo más tarde posible y en un solo viaje
+Q_ROLLUPS_DELTA = (
+    "CALL {\n"
+    + Q_KPI_HORARIO_DELTA.replace("$rows", "$horario").strip()
+    + "\n}\nCALL {\n"
+    + Q_KPI_DIARIO_DELTA.replace("$rows", "$diario").strip()
+    + "\n}\n"
+)
+
+# Día UTC de cada interacción; el WHERE descarta timestamps que no son DateTime
+# (un string contra un DateTime compara como null)
+Q_KPI_DIARIO_AGREGADO = """
+MATCH (i:Interaccion)
+WHERE i.timestamp >= datetime('0001-01-01T00:00:00Z')
+WITH date(datetime({epochMillis: i.timestamp.epochMillis})) AS fecha, i
+WITH fecha,
+     sum(CASE WHEN i.tipo STARTS WITH 'llamada' THEN 1 ELSE 0 END) AS llamadas,
+     sum(CASE WHEN i.tipo STARTS WITH 'llamada' AND coalesce(i.es_contacto,false) THEN 1 ELSE 0 END) AS contactos,
+     sum(CASE WHEN i.tipo STARTS WITH 'llamada' AND i.resultado = 'promesa_pago' THEN 1 ELSE 0 END) AS promesas,
+     sum(CASE WHEN i.tipo = 'pago_recibido' THEN 1 ELSE 0 END) AS pagos,
+     toFloat(sum(CASE WHEN i.tipo = 'pago_recibido' THEN coalesce(i.monto, 0) ELSE 0 END)) AS monto_pagado
+"""
+
+Q_KPI_DIARIO_SCAN = Q_KPI_DIARIO_AGREGADO + """
+RETURN toString(fecha) AS dia, llamadas, contactos, promesas, pagos, monto_pagado
+"""
+
+Q_KPI_DIARIO_READ = """
+MATCH (k:KpiDiario)
+WHERE k.llamadas <> 0 OR k.pagos <> 0 OR k.monto_pagado <> 0
+RETURN k.id AS dia, k.llamadas AS llamadas, k.contactos AS contactos, k.promesas AS promesas,
+       k.pagos AS pagos, k.monto_pagado AS monto_pagado
+"""
+
+Q_KPI_DIARIO_REBUILD = [
+    "MATCH (k:KpiDiario) DETACH DELETE k",
+    Q_KPI_DIARIO_AGREGADO + """
+    CREATE (:KpiDiario {id: toString(fecha), fecha: fecha, llamadas: llamadas, contactos: contactos,
+                        promesas: promesas, pagos: pagos, monto_pagado: monto_pagado})
+    """,
+]
+
+Key = Tuple[Any, Any]
+
+
+def kpi(props: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # Mismo criterio que KPI_PREV, sobre las props que se van a escribir
+    if not str(props.get("tipo") or "").startswith("llamada"):
+        return None
+    return {
+        "dia": props.get("dia_semana"),
+        "hora": props.get("hora_del_dia"),
+        "contacto": bool(props.get("es_contacto")),
+        "exito": props.get("resultado") in EXITOS,
+    }
+
+
+def horario_deltas(changes: Iterable[Tuple[Optional[Dict], Optional[Dict]]]) -> List[Dict[str, Any]]:
+    # changes: pares (antes, después) por interacción; None si no era/es llamada
+    acc: Dict[Key, List[int]] = {}
+
+    def add(k: Optional[Dict[str, Any]], sign: int):
+        if k is None or k["dia"] is None or k["hora"] is None:
+            return
+        c = acc.setdefault((k["dia"], k["hora"]), [0, 0, 0])
+        c[0] += sign
+        c[1] += sign if k["contacto"] else 0
+        c[2] += sign if k["exito"] else 0
+
+    for prev, new in changes:
+        if prev == new:
+            continue
+        add(prev, -1)
+        add(new, +1)
+
+    return [
+        {"id": f"{dia}:{hora}", "dia": dia, "hora": hora,
+         "llamadas": c[0], "contactos": c[1], "exitos": c[2]}
+        for (dia, hora), c in sorted(acc.items(), key=lambda kv: f"{kv[0][0]}:{kv[0][1]}")
+        if any(c)
+    ]
+
+
+def dia_utc(ts: Any) -> Optional[str]:
+    # Día UTC (YYYY-MM-DD) de un timestamp; DateTime del driver o datetime de Python
+    if hasattr(ts, "to_native"):
+        ts = ts.to_native()
+    if not isinstance(ts, datetime):
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc).date().isoformat()
+
+
+def diario(props: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # Mismo criterio que DIARIO_PREV, sobre las props que se van a escribir
+    if props.get("timestamp") is None:
+        return None
+    return {
+        "ts": props["timestamp"],
+        "tipo": props.get("tipo"),
+        "resultado": props.get("resultado"),
+        "contacto": bool(props.get("es_contacto")),
+        "monto": props.get("monto"),
+    }
+
+
+def diario_deltas(changes: Iterable[Tuple[Optional[Dict], Optional[Dict]]]) -> List[Dict[str, Any]]:
+    acc: Dict[str, List[float]] = {}
+
+    def add(k: Optional[Dict[str, Any]], sign: int):
+        dia = dia_utc(k["ts"]) if k is not None else None
+        if dia is None:
+            return
+        c = acc.setdefault(dia, [0, 0, 0, 0, 0.0])
+        tipo = str(k["tipo"] or "")
+        if tipo.startswith("llamada"):
+            c[0] += sign
+            c[1] += sign if k["contacto"] else 0
+            c[2] += sign if k["resultado"] == "promesa_pago" else 0
+        if tipo == "pago_recibido":
+            c[3] += sign
+            c[4] += sign * float(k["monto"] or 0)
+
+    for prev, new in changes:
+        if prev == new:
+            continue
+        add(prev, -1)
+        add(new, +1)
+
+    return [
+        dict(zip(("id",) + CAMPOS_DIARIO, [dia] + c))
+        for dia, c in sorted(acc.items())
+        if any(c)
+    ]
+
+
+def apply(
+    tx,
+    horario: Iterable[Tuple[Optional[Dict], Optional[Dict]]],
+    diario: Iterable[Tuple[Optional[Dict], Optional[Dict]]],
+) -> int:
+    # Pares (antes, después) por interacción para cada rollup; una sola sentencia
+    h, d = horario_deltas(horario), diario_deltas(diario)
+    if h or d:
+        tx.run(Q_ROLLUPS_DELTA, horario=h, diario=d).consume()
+    return len(h) + len(d)
+
+
+def inicio_periodo(d: date, bucket: str) -> date:
+    # Mismo criterio que date.truncate en Cypher: semana ISO (lunes) o mes
+    if bucket == "semana":
+        return d - timedelta(days=d.weekday())
+    if bucket == "mes":
+        return d.replace(day=1)
+    return d
+
+
+def n_periodos(desde: date, hasta: date, bucket: str) -> int:
+    # Cantidad de períodos de periodos(desde, hasta, bucket) sin generarlos
+    if desde > hasta:
+        return 0
+    a, b = inicio_periodo(desde, bucket), inicio_periodo(hasta, bucket)
+    if bucket == "mes":
+        return (b.year - a.year) * 12 + b.month - a.month + 1
+    return (b - a).days // (7 if bucket == "semana" else 1) + 1
+
+
+def periodos(desde: date, hasta: date, bucket: str) -> List[date]:
+    # Inicio de cada período que toca [desde, hasta]; uno por bucket, no por día
+    out = []
+    d = inicio_periodo(desde, bucket)
+    while d <= hasta:
+        out.append(d)
+        if bucket == "semana":
+            d += timedelta(days=7)
+        elif bucket == "mes":
+            d = date(d.year + d.month // 12, d.month % 12 + 1, 1)
+        else:
+            d += timedelta(days=1)
+    return out
+
+
+def compare(
+    scan: Iterable[Dict[str, Any]],
+    rollup: Iterable[Dict[str, Any]],
+    keys: Sequence[str] = ("dia", "hora"),
+    fields: Sequence[str] = ("llamadas", "contactos", "exitos"),
+) -> List[str]:
+    # Diferencias entre el scan y el rollup, una línea por celda (día, hora) / día.
+    # Los montos se comparan redondeados (sumas de floats en otro orden)
+    def valores(r: Dict[str, Any]) -> Tuple:
+        return tuple(round(r[f], 6) if isinstance(r[f], float) else r[f] for f in fields)
+
+    a = {tuple(r[k] for k in keys): valores(r) for r in scan}
+    b = {tuple(r[k] for k in keys): valores(r) for r in rollup}
+    cero = tuple(0 for _ in fields)
+    diffs = []
+    for key in sorted(set(a) | set(b), key=str):
+        if a.get(key, cero) != b.get(key, cero):
+            celda = " ".join(f"{k}={v}" for k, v in zip(keys, key))
+            diffs.append(f"{celda}: scan={a.get(key)} rollup={b.get(key)}")
+    return diffs
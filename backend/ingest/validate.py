@@ -0,0 +1,138 @@
+# ingest/validate.py
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple, get_args
+
+from pydantic import TypeAdapter, ValidationError
+
+from schemas import Cliente, Interaccion
+from ingest.batch import chunked
+
+DEFAULT_CHUNK_SIZE = 2000
+
+Record = Tuple[str, Dict[str, Any]]
+Reject = Tuple[int, str, List[Dict[str, Any]]]
+
+# Se construyen una vez por proceso: armar el validador es lo caro, no usarlo.
+# Las interacciones se agrupan por modelo según `tipo` y cada grupo se valida como
+# List[Modelo]; así se evita resolver la unión discriminada registro a registro.
+CLIENTES = TypeAdapter(List[Cliente])
+INTERACCION = TypeAdapter(Interaccion)
+MODELOS: Dict[str, Any] = {
+    tipo: model
+    for model in get_args(get_args(Interaccion)[0])
+    for tipo in get_args(model.model_fields["tipo"].annotation)
+}
+LISTAS: Dict[Any, TypeAdapter] = {m: TypeAdapter(List[m]) for m in set(MODELOS.values())}
+
+
+def _errors(e: ValidationError) -> List[Dict[str, Any]]:
+    return e.errors(include_url=False, include_context=False, include_input=False)
+
+
+def _validate_list(adapter: TypeAdapter, chunk: List[Record], idx: List[int], key: str) -> List[Reject]:
+    try:
+        adapter.validate_python([chunk[n][1] for n in idx])
+    except ValidationError as e:
+        by_pos: Dict[int, List[Dict[str, Any]]] = {}
+        for err in _errors(e):
+            by_pos.setdefault(err["loc"][0], []).append({**err, "loc": list(err["loc"][1:])})
+        return [(idx[pos], key, errs) for pos, errs in sorted(by_pos.items())]
+    return []
+
+
+def validate_chunk(chunk: List[Record]) -> List[Reject]:
+    """Valida un lote y devuelve (índice, clave, errores) de los registros inválidos.
+
+    pydantic reporta los errores de una lista con el índice del elemento, así que un
+    registro malo no invalida el resto del lote.
+    """
+    clientes: List[int] = []
+    grupos: Dict[Any, List[int]] = {}
+    rejects: List[Reject] = []
+    for n, (key, rec) in enumerate(chunk):
+        if key == "clientes":
+            clientes.append(n)
+            continue
+        model = MODELOS.get(rec.get("tipo")) if isinstance(rec, dict) else None
+        if model is None:
+            # tipo desconocido: la unión discriminada da el error con su formato
+            try:
+                INTERACCION.validate_python(rec)
+            except ValidationError as e:
+                rejects.append((n, key, _errors(e)))
+            continue
+        grupos.setdefault(model, []).append(n)
+
+    if clientes:
+        rejects.extend(_validate_list(CLIENTES, chunk, clientes, "clientes"))
+    for model, idx in grupos.items():
+        rejects.extend(_validate_list(LISTAS[model], chunk, idx, "interacciones"))
+    return sorted(rejects, key=lambda r: r[0])
+
+
+class RejectsFile:
+    # NDJSON: {"clave", "registro", "errores"} por registro rechazado
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.count = 0
+        self._f: Optional[IO[str]] = None
+
+    def write(self, key: str, rec: Dict[str, Any], errors: List[Dict[str, Any]]):
+        self.count += 1
+        if self.path is None:
+            return
+        if self._f is None:
+            self._f = open(self.path, "w", encoding="utf-8")
+        line = {"clave": key, "registro": rec, "errores": errors}
+        self._f.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _emit(chunk: List[Record], rejects: List[Reject], out: RejectsFile) -> Iterator[Record]:
+    bad = {n for n, _, _ in rejects}
+    for n, key, errs in rejects:
+        out.write(key, chunk[n][1], errs)
+    for n, rec in enumerate(chunk):
+        if n not in bad:
+            yield rec
+
+
+def validate_records(
+    records: Iterable[Record],
+    rejects: RejectsFile,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    processes: int = 1,
+) -> Iterator[Record]:
+    """Filtra (clave, registro) dejando pasar sólo los válidos, en el orden original.
+
+    Con processes > 1 los lotes se validan en un ProcessPoolExecutor con a lo sumo
+    2 lotes en vuelo por proceso, así que la memoria sigue acotada en streaming.
+    """
+    if processes <= 1:
+        for chunk in chunked(records, chunk_size):
+            yield from _emit(chunk, validate_chunk(chunk), rejects)
+        return
+
+    pending: deque = deque()
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for chunk in chunked(records, chunk_size):
+            pending.append((chunk, pool.submit(validate_chunk, chunk)))
+            if len(pending) >= 2 * processes:
+                done, fut = pending.popleft()
+                yield from _emit(done, fut.result(), rejects)
+        while pending:
+            done, fut = pending.popleft()
+            yield from _emit(done, fut.result(), rejects)
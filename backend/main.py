@@ -1,11 +1,39 @@
+import logging
+import os
+from contextlib import asynccontextmanager
 from typing import Union
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from core import metrics
+import router.analytics as analytics
 from router.analytics import router as analytics_router
 
-app = FastAPI()
+
+# Ejecutar cada consulta de los endpoints antes de aceptar tráfico (0 = desactivado)
+API_WARMUP = os.getenv("API_WARMUP", "1") == "1"
+
+log = logging.getLogger("uvicorn.error")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Un único driver async (con su pool) por proceso, o el dataset en memoria
+    # con ANALYTICS_BACKEND=memoria. Con --workers N cada worker abre el suyo;
+    # si Neo4j no responde en NEO4J_STARTUP_TIMEOUT el arranque falla
+    await analytics.backend.open()
+    if API_WARMUP:
+        segundos = await analytics.warmup()
+        log.info("warm-up de consultas (%s): %.0f ms", analytics.ANALYTICS_BACKEND, segundos * 1000)
+    yield
+    await analytics.backend.close()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(analytics_router)
+# Latencia por ruta, X-Request-Id y Server-Timing (core/metrics.py)
+app.add_middleware(metrics.MetricsMiddleware)
 
 origins = ["http://localhost:5173"]
 app.add_middleware(
@@ -22,3 +50,8 @@ app.add_middleware(
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return metrics.render()
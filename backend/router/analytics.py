@@ -1,200 +1,835 @@
 # app/routers/analytics.py
-from typing import Any, Dict, List
-from datetime import datetime
+import asyncio
 import os
-from fastapi import APIRouter, HTTPException, Query as FQuery
-from neo4j import GraphDatabase, basic_auth, Query as CypherQuery
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+from fastapi import APIRouter, HTTPException, Request, Query as FQuery
+from fastapi.responses import Response, StreamingResponse
+from neo4j import Query as CypherQuery
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
 
-# ---- Neo4j driver (variables de entorno) ----
-NEO4J_URI = os.getenv("NEO4J_URI", "bolt://neo4j:7687")
-NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
-NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password123")
-NEO4J_DB = os.getenv("NEO4J_DATABASE", "neo4j")
-
-driver = GraphDatabase.driver(NEO4J_URI, auth=basic_auth(NEO4J_USER, NEO4J_PASSWORD))
+from columnar import ColumnarBackend
+from core.db import NEO4J_DB, close_driver, get_driver, init_driver, verify_connectivity
+from core.metrics import QUERY_PROFILE, current_trace, record_error, record_query
+from core.cache import (
+    DatasetVersion,
+    LRUCache,
+    Q_DATASET_VERSION,
+    etag,
+    etag_matches,
+    normalize,
+)
+from core.pagination import (
+    NDJSON,
+    decode_cursor,
+    encode_cursor,
+    ndjson_line,
+    next_cursor_headers,
+    wants_ndjson,
+)
+from core.serialization import Payload, dumps, json_response
+from ingest import cumplimiento, rollups
 
 router = APIRouter(prefix="", tags=["analytics"])
 
+# neo4j (default) o memoria: el export cargado en columnas al arrancar
+ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", "neo4j")
+ANALYTICS_DATASET = os.getenv("ANALYTICS_DATASET", "interacciones_clientes_2.json")
+# Puntos por respuesta de /analytics/series (≈ 10 años por día): los períodos sin
+# actividad se completan en Python, un rango sin tope arma millones de puntos
+SERIES_MAX_PUNTOS = int(os.getenv("SERIES_MAX_PUNTOS", 3660))
+
+
+def query_error(name: str, e: Exception) -> HTTPException:
+    # Base caída o error transitorio: 503 (reintentable); timeout de la
+    # transacción: 504; el resto (consulta inválida, bug): 500. El código de
+    # Neo4j va en X-Error-Code y en la métrica de errores.
+    code = getattr(e, "code", None) or type(e).__name__
+    record_error(name, code)
+    if isinstance(e, (ServiceUnavailable, SessionExpired, TransientError)):
+        status = 503
+    elif "TransactionTimedOut" in code:
+        status = 504
+    else:
+        status = 500
+    return HTTPException(status_code=status, detail=str(e), headers={"X-Error-Code": code})
+
+
+# Driver async (creado/cerrado en el lifespan de main.py): la espera a Neo4j no
+# ocupa un hilo del threadpool, sólo una conexión del pool del driver
+async def run_cypher(
+    query: str, params: Dict[str, Any], name: str = "cypher"
+) -> List[Dict[str, Any]]:
+    if QUERY_PROFILE:
+        query = "PROFILE " + query
+    t0 = time.perf_counter()
+    try:
+        async with get_driver().session(database=NEO4J_DB) as session:
+            result = await session.run(CypherQuery(query), **params)
+            rows = [r.data() async for r in result]
+            summary = await result.consume()
+    except Exception as e:
+        raise query_error(name, e)
+    record_query(name, time.perf_counter() - t0, len(rows), "neo4j", summary, params)
+    return rows
+
+
+async def stream_cypher(
+    query: str, params: Dict[str, Any], name: str = "cypher"
+) -> AsyncIterator[Dict[str, Any]]:
+    t0 = time.perf_counter()
+    n = 0
+    try:
+        async with get_driver().session(database=NEO4J_DB) as session:
+            result = await session.run(CypherQuery(query), **params)
+            async for r in result:
+                n += 1
+                yield r.data()
+            summary = await result.consume()
+    except Exception as e:
+        raise query_error(name, e)
+    record_query(name, time.perf_counter() - t0, n, "neo4j", summary, params)
+
 
-def run_cypher(query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+async def ndjson_response(rows: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    # Las filas pasan del backend al socket a medida que llegan: memoria constante
+    # sin importar el tamaño del resultado. La primera se lee antes de responder
+    # para que un error de la consulta siga siendo un 500 y no un cuerpo cortado.
     try:
-        with driver.session(database=NEO4J_DB) as session:
-            result = session.run(CypherQuery(query), **params)
-            return [r.data() for r in result]
+        first = [await rows.__anext__()]
+    except StopAsyncIteration:
+        first = []
+    except HTTPException:
+        await rows.aclose()
+        raise
     except Exception as e:
+        await rows.aclose()
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def body():
+        try:
+            for row in first:
+                yield ndjson_line(row)
+            async for row in rows:
+                yield ndjson_line(row)
+        finally:
+            await rows.aclose()
+
+    return StreamingResponse(body(), media_type=NDJSON)
+
+
+def cursor_key(cursor: Optional[str], types: Tuple[type, ...]) -> List[Any]:
+    if cursor is None:
+        return [None] * len(types)
+    try:
+        return decode_cursor(cursor, types)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def fetch_dataset_version() -> int:
+    return await backend.version()
+
+
+# ---- Cache de respuestas (invalidado por la versión del dataset) ----
+cache = LRUCache()
+dataset_version = DatasetVersion(fetch_dataset_version)
+
+
+async def cached_response(
+    request: Request,
+    endpoint: str,
+    params: Dict[str, Any],
+    compute: Callable[[], Awaitable[Any]],
+    next_cursor: Optional[Callable[[Any], Optional[str]]] = None,
+) -> Response:
+    # El ETag sale de (endpoint, params, versión): un If-None-Match vigente se
+    # responde con 304 sin ejecutar la consulta
+    version = await dataset_version.current()
+    tag = etag(endpoint, params, version)
+    headers = {"ETag": tag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), tag):
+        return Response(status_code=304, headers=headers)
+
+    # Se cachea el cuerpo ya serializado (y sus variantes comprimidas): un hit
+    # responde sin volver a codificar
+    key = (endpoint, normalize(params), version)
+    hit, payload = cache.get(key)
+    if not hit:
+        data = await compute()
+        payload = Payload(dumps(data), next_cursor(data) if next_cursor is not None else None)
+        cache.set(key, payload)
+    headers["X-Cache"] = "HIT" if hit else "MISS"
+    trace = current_trace()
+    if trace is not None:
+        trace.cache = headers["X-Cache"]
+    headers.update(next_cursor_headers(request, payload.cursor))
+    return json_response(request, payload, headers)
+
 
 # ---- Endpoint 1: Timeline del cliente ----
+# Keyset por (timestamp, id): la página se corta antes de expandir las relaciones
+Q_TIMELINE_KEYSET = """
+MATCH (c:Cliente {id: $id})-[:TUVO]->(i:Interaccion)
+WHERE $after_ts IS NULL
+   OR i.timestamp > datetime($after_ts)
+   OR (i.timestamp = datetime($after_ts) AND i.id > $after_id)
+WITH i ORDER BY i.timestamp ASC, i.id ASC
+"""
+
+Q_TIMELINE_RELACIONES = """
+OPTIONAL MATCH (i)-[:ATENDIDA_POR]->(a:Agente)
+OPTIONAL MATCH (i)-[:RESULTA_EN]->(pr:Promesa)
+OPTIONAL MATCH (i)-[:RESULTA_EN]->(pl:PlanRenegociacion)
+OPTIONAL MATCH (pr)-[:CUMPLIDA_POR]->(pc:Interaccion {tipo:'pago_recibido'})
+OPTIONAL MATCH (i)-[:APLICADO_A]->(d:Deuda)
+WITH i, a, pr, pl, d, collect(pc) AS pagos_que_cumplen
+RETURN
+  i.id            AS interaccion_id,
+  i.tipo          AS tipo,
+  i.timestamp     AS timestamp,
+  i.resultado     AS resultado,
+  i.sentimiento   AS sentimiento,
+  i.duracion_segundos AS duracion_segundos,
+  (CASE WHEN a IS NULL THEN NULL ELSE a.id END) AS agente_id,
+  (CASE WHEN i.tipo = 'pago_recibido' THEN i.monto END) AS monto_pago,
+  (CASE WHEN i.tipo = 'pago_recibido' THEN i.metodo_pago END) AS metodo_pago,
+  (CASE WHEN i.tipo = 'pago_recibido' THEN i.pago_completo END) AS pago_completo,
+  (CASE WHEN d IS NULL THEN NULL ELSE {id: d.id, tipo: d.tipo} END) AS deuda,
+  (CASE WHEN pr IS NULL THEN NULL ELSE {id: coalesce(pr.id, elementId(pr)),
+                                       monto_prometido: pr.monto_prometido,
+                                       fecha_promesa: pr.fecha_promesa} END) AS promesa,
+  (CASE WHEN pl IS NULL THEN NULL ELSE {id: coalesce(pl.id, elementId(pl)),
+                                       cuotas: pl.cuotas,
+                                       monto_mensual: pl.monto_mensual} END) AS plan,
+  [p IN pagos_que_cumplen | {id: p.id, timestamp: p.timestamp, monto: p.monto}] AS pagos_que_cumplen
+ORDER BY timestamp ASC, interaccion_id ASC
+"""
+
+Q_TIMELINE = Q_TIMELINE_KEYSET + Q_TIMELINE_RELACIONES
+Q_TIMELINE_PAGINA = Q_TIMELINE_KEYSET + "LIMIT $limit" + Q_TIMELINE_RELACIONES
+
+
 @router.get("/clientes/{id}/timeline")
-def cliente_timeline(id: str) -> List[Dict[str, Any]]:
-    query = """
-    MATCH (c:Cliente {id: $id})-[:TUVO]->(i:Interaccion)
-    OPTIONAL MATCH (i)-[:ATENDIDA_POR]->(a:Agente)
-    OPTIONAL MATCH (i)-[:RESULTA_EN]->(pr:Promesa)
-    OPTIONAL MATCH (i)-[:RESULTA_EN]->(pl:PlanRenegociacion)
-    OPTIONAL MATCH (pr)-[:CUMPLIDA_POR]->(pc:Interaccion {tipo:'pago_recibido'})
-    OPTIONAL MATCH (i)-[:APLICADO_A]->(d:Deuda)
-    WITH i, a, pr, pl, d, collect(pc) AS pagos_que_cumplen
-    RETURN
-      i.id            AS interaccion_id,
-      i.tipo          AS tipo,
-      i.timestamp     AS timestamp,
-      i.resultado     AS resultado,
-      i.sentimiento   AS sentimiento,
-      i.duracion_segundos AS duracion_segundos,
-      (CASE WHEN a IS NULL THEN NULL ELSE a.id END) AS agente_id,
-      (CASE WHEN i.tipo = 'pago_recibido' THEN i.monto END) AS monto_pago,
-      (CASE WHEN i.tipo = 'pago_recibido' THEN i.metodo_pago END) AS metodo_pago,
-      (CASE WHEN i.tipo = 'pago_recibido' THEN i.pago_completo END) AS pago_completo,
-      (CASE WHEN d IS NULL THEN NULL ELSE {id: d.id, tipo: d.tipo} END) AS deuda,
-      (CASE WHEN pr IS NULL THEN NULL ELSE {id: coalesce(pr.id, elementId(pr)),
-                                           monto_prometido: pr.monto_prometido,
-                                           fecha_promesa: pr.fecha_promesa} END) AS promesa,
-      (CASE WHEN pl IS NULL THEN NULL ELSE {id: coalesce(pl.id, elementId(pl)),
-                                           cuotas: pl.cuotas,
-                                           monto_mensual: pl.monto_mensual} END) AS plan,
-      [p IN pagos_que_cumplen | {id: p.id, timestamp: p.timestamp, monto: p.monto}] AS pagos_que_cumplen
-    ORDER BY timestamp ASC
-    """
-    return run_cypher(query, {"id": id})
+async def cliente_timeline(
+    id: str,
+    request: Request,
+    cursor: Optional[str] = FQuery(None),
+    limit: Optional[int] = FQuery(None, ge=1),
+) -> List[Dict[str, Any]]:
+    after_ts, after_id = cursor_key(cursor, (str, str))
+    params = {"id": id, "after_ts": after_ts, "after_id": after_id, "limit": limit}
+    if wants_ndjson(request):
+        return await ndjson_response(backend.stream("cliente_timeline", params))
+
+    def next_cursor(rows: List[Dict[str, Any]]) -> Optional[str]:
+        if limit and len(rows) == limit:
+            return encode_cursor(rows[-1]["timestamp"], rows[-1]["interaccion_id"])
+        return None
+
+    return await cached_response(
+        request,
+        "cliente_timeline",
+        params,
+        lambda: backend.rows("cliente_timeline", params),
+        next_cursor,
+    )
 
 
 # ---- Endpoint 2: Efectividad del agente ----
+# Una sola pasada sobre las llamadas: se agrega por (agente, día, hora) y después
+# por agente, sin juntar las llamadas en listas. El costo crece con el total de
+# llamadas de los agentes pedidos, no con agentes x llamadas.
+Q_EFECTIVIDAD = """
+MATCH (i:Interaccion)-[:ATENDIDA_POR]->(a)
+OPTIONAL MATCH (i)-[:RESULTA_EN]->(p:Promesa)
+WITH a, i.dia_semana AS dia, i.hora_del_dia AS hora,
+     count(i) AS llamadas,
+     sum(CASE WHEN coalesce(i.es_contacto,false) THEN 1 ELSE 0 END) AS contactos,
+     sum(CASE WHEN i.resultado IN ['promesa_pago','pago_inmediato','renegociacion'] THEN 1 ELSE 0 END) AS exitos,
+     sum(CASE WHEN i.resultado = 'promesa_pago' THEN 1 ELSE 0 END) AS promesas,
+     sum(CASE WHEN i.resultado = 'pago_inmediato' THEN 1 ELSE 0 END) AS pagos_inmediatos,
+     sum(CASE WHEN i.resultado = 'renegociacion' THEN 1 ELSE 0 END) AS reneg,
+     sum(coalesce(i.duracion_segundos,0)) AS duracion,
+     // Promesas cumplidas (CUMPLIDA_POR materializada en la ingesta)
+     count(DISTINCT CASE WHEN EXISTS { (p)-[:CUMPLIDA_POR]->() } THEN p END) AS cumplidas
+WITH a,
+     sum(llamadas) AS total,
+     sum(contactos) AS n_contactos,
+     sum(promesas) AS n_promesas,
+     sum(pagos_inmediatos) AS n_pagos_inmediatos,
+     sum(reneg) AS n_reneg,
+     sum(duracion) AS duracion,
+     sum(cumplidas) AS promesas_cumplidas,
+     collect({
+       dia_semana: dia,
+       hora_del_dia: hora,
+       llamadas: llamadas,
+       tasa_contacto: toFloat(contactos)/llamadas,
+       tasa_exito: toFloat(exitos)/llamadas
+     }) AS por_horario
+WHERE total >= $min_llamadas
+WITH a.id AS agente_id, por_horario, {
+  total_llamadas: total,
+  tasa_contacto: toFloat(n_contactos)/total,
+  promesas: n_promesas,
+  tasa_promesa_sobre_llamadas: toFloat(n_promesas)/total,
+  promesas_cumplidas: promesas_cumplidas,
+  tasa_cumplimiento_sobre_promesas: CASE WHEN n_promesas=0 THEN 0.0 ELSE toFloat(promesas_cumplidas)/n_promesas END,
+  pagos_inmediatos: n_pagos_inmediatos,
+  tasa_pago_inmediato: toFloat(n_pagos_inmediatos)/total,
+  renegociaciones: n_reneg,
+  duracion_media_seg: toFloat(duracion)/total
+} AS resumen
+RETURN agente_id, resumen, por_horario
+ORDER BY resumen[$orden] DESC, agente_id ASC
+LIMIT $top_k
+"""
+
+# Todos los agentes, o sólo los pedidos (seek por la constraint agente_id)
+Q_AGENTES_EFECTIVIDAD = "MATCH (a:Agente)\nWITH a" + Q_EFECTIVIDAD
+Q_AGENTES_EFECTIVIDAD_IDS = (
+    "UNWIND $ids AS aid\nMATCH (a:Agente {id: aid})\nWITH DISTINCT a" + Q_EFECTIVIDAD
+)
+
+# Claves de `resumen` por las que se puede ordenar el ranking
+ORDENES_EFECTIVIDAD = (
+    "total_llamadas",
+    "tasa_contacto",
+    "promesas",
+    "tasa_promesa_sobre_llamadas",
+    "promesas_cumplidas",
+    "tasa_cumplimiento_sobre_promesas",
+    "pagos_inmediatos",
+    "tasa_pago_inmediato",
+    "renegociaciones",
+    "duracion_media_seg",
+)
+
+
+@router.get("/agentes/efectividad")
+async def agentes_efectividad(
+    request: Request,
+    ids: Optional[List[str]] = FQuery(None),
+    orden: str = FQuery("tasa_contacto", regex="^(" + "|".join(ORDENES_EFECTIVIDAD) + ")$"),
+    top_k: int = FQuery(20, ge=1),
+    min_llamadas: int = FQuery(1, ge=1),
+) -> List[Dict[str, Any]]:
+    params = {"orden": orden, "top_k": top_k, "min_llamadas": min_llamadas}
+    if ids:
+        params["ids"] = sorted(set(ids))
+    return await cached_response(
+        request, "agentes_efectividad", params, lambda: backend.rows("agentes_efectividad", params)
+    )
+
+
 @router.get("/agentes/{id}/efectividad")
-def agente_efectividad(id: str) -> Dict[str, Any]:
-    query = """
-    // Llamadas del agente
-    MATCH (i:Interaccion)-[:ATENDIDA_POR]->(a:Agente {id: $id})
-    WITH collect(i) AS calls, count(i) AS total
-
-    // Agregados base
-    WITH calls, total,
-         [x IN calls WHERE coalesce(x.es_contacto,false)] AS contactos,
-         [x IN calls WHERE x.resultado = 'promesa_pago'] AS promesas,
-         [x IN calls WHERE x.resultado = 'pago_inmediato'] AS pagos_inmediatos,
-         [x IN calls WHERE x.resultado = 'renegociacion'] AS reneg
-
-    // Cumplimiento de promesas del agente (si existe CUMPLIDA_POR)
-    OPTIONAL MATCH (l:Interaccion)-[:ATENDIDA_POR]->(:Agente {id: $id})
-           -[:RESULTA_EN]->(p:Promesa)
-    OPTIONAL MATCH (p)-[:CUMPLIDA_POR]->(:Interaccion {tipo:'pago_recibido'})
-    WITH calls, total,
-         size(contactos) AS n_contactos,
-         size(promesas)  AS n_promesas,
-         size(pagos_inmediatos) AS n_pagos_inmediatos,
-         size(reneg)     AS n_reneg,
-         count(DISTINCT p) AS promesas_cumplidas
-
-    WITH {
-      total_llamadas: total,
-      tasa_contacto: CASE WHEN total=0 THEN 0.0 ELSE toFloat(n_contactos)/total END,
-      promesas: n_promesas,
-      tasa_promesa_sobre_llamadas: CASE WHEN total=0 THEN 0.0 ELSE toFloat(n_promesas)/total END,
-      promesas_cumplidas: promesas_cumplidas,
-      tasa_cumplimiento_sobre_promesas: CASE WHEN n_promesas=0 THEN 0.0 ELSE toFloat(promesas_cumplidas)/n_promesas END,
-      pagos_inmediatos: n_pagos_inmediatos,
-      tasa_pago_inmediato: CASE WHEN total=0 THEN 0.0 ELSE toFloat(n_pagos_inmediatos)/total END,
-      renegociaciones: n_reneg,
-      duracion_media_seg: CASE WHEN total=0 THEN 0.0 ELSE toFloat(reduce(s=0, x IN calls | s + coalesce(x.duracion_segundos,0)))/total END
-    } AS resumen, calls
-
-    // Breakdown por día/hora
-    UNWIND calls AS ci
-    WITH resumen, ci.dia_semana AS dia, ci.hora_del_dia AS hora,
-         coalesce(ci.es_contacto,false) AS contacto,
-         ci.resultado AS res
-    WITH resumen, dia, hora,
-         count(*) AS llamadas,
-         sum(CASE WHEN contacto THEN 1 ELSE 0 END) AS contactos,
-         sum(CASE WHEN res IN ['promesa_pago','pago_inmediato','renegociacion'] THEN 1 ELSE 0 END) AS exitos
-    RETURN resumen,
-           collect({
-             dia_semana: dia,
-             hora_del_dia: hora,
-             llamadas: llamadas,
-             tasa_contacto: CASE WHEN llamadas=0 THEN 0.0 ELSE toFloat(contactos)/llamadas END,
-             tasa_exito: CASE WHEN llamadas=0 THEN 0.0 ELSE toFloat(exitos)/llamadas END
-           }) AS por_horario
-    """
-    rows = run_cypher(query, {"id": id})
-    return rows[0] if rows else {"resumen": {}, "por_horario": []}
+async def agente_efectividad(id: str, request: Request) -> Dict[str, Any]:
+
+    async def compute():
+        rows = await backend.rows(
+            "agentes_efectividad",
+            {"ids": [id], "orden": "total_llamadas", "top_k": 1, "min_llamadas": 1},
+        )
+        if not rows:
+            return {"resumen": {}, "por_horario": []}
+        return {"resumen": rows[0]["resumen"], "por_horario": rows[0]["por_horario"]}
+
+    return await cached_response(request, "agente_efectividad", {"id": id}, compute)
 
 
 # ---- Endpoint 3: Promesas vencidas e incumplidas ----
+# Orden y keyset por (dias_vencida DESC, promesa_id). dias_vencida es monótono en
+# fecha_promesa, así que la página siguiente también se acota por rango sobre el
+# índice promesa_fecha ($desde, calculado a partir del cursor).
+# Si ventanaDias es la ventana materializada en las promesas (Q_VENTANA_MATERIALIZADA)
+# se leen sus derivados; con otra ventana se agregan los pagos en la consulta.
+Q_PROMESAS_INCUMPLIDAS_MATERIALIZADA = """
+WITH datetime($hasta) AS LIMITE, coalesce($modo,'acumulado') AS modo
+MATCH (p:Promesa)
+WHERE p.fecha_promesa < LIMITE
+  AND p.fecha_promesa > coalesce(datetime($desde), datetime('0001-01-01T00:00:00Z'))
+  AND p.ventana_dias = $ventanaDias
+  AND NOT (CASE WHEN modo = 'estricto' THEN p.cumplida_estricto ELSE p.cumplida_acumulado END)
+WITH p, LIMITE, modo,
+     duration.inDays(p.fecha_promesa, LIMITE).days AS dias_vencida,
+     coalesce(p.id, elementId(p)) AS promesa_id
+WHERE $after_dias IS NULL
+   OR dias_vencida < $after_dias
+   OR (dias_vencida = $after_dias AND promesa_id > $after_id)
+MATCH (c:Cliente)-[:TUVO]->(:Interaccion)-[:RESULTA_EN]->(p)
+RETURN
+  c.id AS cliente_id,
+  promesa_id,
+  p.fecha_promesa AS fecha_promesa,
+  p.monto_prometido AS monto_prometido,
+  CASE WHEN modo = 'estricto' THEN p.monto_max_en_ventana ELSE p.monto_en_ventana END
+    AS monto_pagado_en_ventana,
+  dias_vencida
+ORDER BY dias_vencida DESC, promesa_id ASC
+"""
+
+Q_PROMESAS_INCUMPLIDAS = """
+WITH datetime($hasta) AS LIMITE, toInteger($ventanaDias) AS W, coalesce($modo,'acumulado') AS modo
+// Corte por `hasta`: range seek sobre el índice promesa_fecha (DateTime nativo)
+MATCH (p:Promesa)
+WHERE p.fecha_promesa < LIMITE
+  AND p.fecha_promesa > coalesce(datetime($desde), datetime('0001-01-01T00:00:00Z'))
+WITH p, LIMITE, W, modo,
+     duration.inDays(p.fecha_promesa, LIMITE).days AS dias_vencida,
+     coalesce(p.id, elementId(p)) AS promesa_id
+WHERE $after_dias IS NULL
+   OR dias_vencida < $after_dias
+   OR (dias_vencida = $after_dias AND promesa_id > $after_id)
+MATCH (c:Cliente)-[:TUVO]->(:Interaccion)-[:RESULTA_EN]->(p)
+// Ventana de pago: predicados sargables sobre (tipo, timestamp) nativos, sin
+// convertir strings por fila
+CALL {
+  WITH c, p, W
+  OPTIONAL MATCH (c)-[:TUVO]->(pay:Interaccion)
+  WHERE pay.tipo = 'pago_recibido'
+    AND pay.timestamp >= p.fecha_promesa
+    AND pay.timestamp <= p.fecha_promesa + duration({days: W})
+  RETURN toFloat(sum(coalesce(pay.monto, 0))) AS monto_sum,
+         toFloat(coalesce(max(pay.monto), 0)) AS monto_max
+}
+WITH c, p, dias_vencida, promesa_id,
+     CASE WHEN modo = 'estricto' THEN monto_max ELSE monto_sum END AS monto_en_ventana
+WHERE monto_en_ventana < coalesce(p.monto_prometido, 0.0)
+RETURN
+  c.id AS cliente_id,
+  promesa_id,
+  p.fecha_promesa AS fecha_promesa,
+  p.monto_prometido AS monto_prometido,
+  monto_en_ventana AS monto_pagado_en_ventana,
+  dias_vencida
+ORDER BY dias_vencida DESC, promesa_id ASC
+"""
+
+
+def desde_cursor(hasta: datetime, after_dias: Optional[int]) -> Optional[str]:
+    # dias_vencida <= after_dias  <=>  fecha_promesa > hasta - (after_dias + 1) días
+    if after_dias is None:
+        return None
+    return (hasta - timedelta(days=after_dias + 1)).isoformat()
+
+
 @router.get("/analytics/promesas-incumplidas")
-def promesas_incumplidas(
+async def promesas_incumplidas(
+    request: Request,
     hasta: datetime = FQuery(...),
     ventanaDias: int = FQuery(14, ge=1),
     modo: str = FQuery("acumulado", regex="^(acumulado|estricto)$"),
+    cursor: Optional[str] = FQuery(None),
+    limit: Optional[int] = FQuery(None, ge=1),
 ):
-    query = """
-    WITH datetime($hasta) AS LIMITE, toInteger($ventanaDias) AS W, coalesce($modo,'acumulado') AS modo
-    MATCH (c:Cliente)-[:TUVO]->(l:Interaccion)-[:RESULTA_EN]->(p:Promesa)
-    WHERE datetime(p.fecha_promesa) < LIMITE
-    OPTIONAL MATCH (c)-[:TUVO]->(pay:Interaccion {tipo:'pago_recibido'})
-    WHERE pay.timestamp >= datetime(p.fecha_promesa)
-      AND pay.timestamp <= datetime(p.fecha_promesa) + duration({days: W})
-    WITH c, p,
-         reduce(s=0.0, x IN collect(coalesce(pay.monto,0.0)) | s + x) AS monto_sum,
-         reduce(mx=0.0, x IN collect(coalesce(pay.monto,0.0)) | CASE WHEN x>mx THEN x ELSE mx END) AS monto_max,
-         LIMITE, modo
-    WITH c, p, LIMITE, modo,
-         monto_sum, monto_max,
-         CASE WHEN modo = 'estricto' THEN monto_max ELSE monto_sum END AS monto_en_ventana,
-         CASE
-           WHEN modo = 'estricto' THEN (monto_max >= coalesce(p.monto_prometido, 0.0))
-           ELSE (monto_sum >= coalesce(p.monto_prometido, 0.0))
-         END AS cumplida
-    WHERE cumplida = false
-    RETURN
-      c.id AS cliente_id,
-      coalesce(p.id, elementId(p)) AS promesa_id,
-      p.fecha_promesa AS fecha_promesa,
-      p.monto_prometido AS monto_prometido,
-      monto_en_ventana AS monto_pagado_en_ventana,
-      duration.between(datetime(p.fecha_promesa), LIMITE).days AS dias_vencida
-    ORDER BY dias_vencida DESC, fecha_promesa ASC
-    """
-    return run_cypher(
-        query, {"hasta": hasta.isoformat(), "ventanaDias": ventanaDias, "modo": modo}
+    after_dias, after_id = cursor_key(cursor, (int, str))
+    params = {
+        "hasta": hasta.isoformat(),
+        "ventanaDias": ventanaDias,
+        "modo": modo,
+        "desde": desde_cursor(hasta, after_dias),
+        "after_dias": after_dias,
+        "after_id": after_id,
+        "limit": limit,
+    }
+    if wants_ndjson(request):
+        return await ndjson_response(backend.stream("promesas_incumplidas", params))
+
+    def next_cursor(rows: List[Dict[str, Any]]) -> Optional[str]:
+        if limit and len(rows) == limit:
+            return encode_cursor(rows[-1]["dias_vencida"], rows[-1]["promesa_id"])
+        return None
+
+    return await cached_response(
+        request,
+        "promesas_incumplidas",
+        params,
+        lambda: backend.rows("promesas_incumplidas", params),
+        next_cursor,
     )
 
 
 # ---- Endpoint 4: Mejores horarios ----
+Q_MEJORES_HORARIOS = """
+WITH toInteger($min_llamadas) AS MINN,
+     toFloat(coalesce($alpha,0.5)) AS A
+MATCH (k:KpiHorario)
+WHERE k.llamadas >= MINN
+WITH k.dia_semana AS dia, k.hora_del_dia AS hora, k.llamadas AS L,
+     toFloat(k.contactos)/k.llamadas AS tasa_contacto,
+     toFloat(k.exitos)/k.llamadas    AS tasa_exito,
+     A
+RETURN
+  dia, hora, L AS llamadas,
+  tasa_contacto, tasa_exito,
+  (A * tasa_exito + (1.0 - A) * tasa_contacto) AS score
+ORDER BY score DESC, llamadas DESC
+LIMIT $top_k
+"""
+
+
 @router.get("/analytics/mejores-horarios")
-def mejores_horarios(
+async def mejores_horarios(
+    request: Request,
     min_llamadas: int = FQuery(10, ge=1),
     top_k: int = FQuery(20, ge=1),
     alpha: float = FQuery(0.5, ge=0.0, le=1.0),
 ) -> List[Dict[str, Any]]:
-    query = """
-    WITH toInteger($min_llamadas) AS MINN,
-         toFloat(coalesce($alpha,0.5)) AS A
-    MATCH (i:Interaccion)
-    WHERE i.tipo STARTS WITH 'llamada'
-    WITH i.dia_semana AS dia, i.hora_del_dia AS hora,
-         count(*) AS llamadas,
-         sum(CASE WHEN coalesce(i.es_contacto,false) THEN 1 ELSE 0 END) AS contactos,
-         sum(CASE WHEN i.resultado IN ['promesa_pago','pago_inmediato','renegociacion'] THEN 1 ELSE 0 END) AS exitos,
-         MINN, A
-    WHERE llamadas >= MINN
-    WITH dia, hora, llamadas,
-         toFloat(contactos)/llamadas AS tasa_contacto,
-         toFloat(exitos)/llamadas    AS tasa_exito,
-         A, llamadas AS L
-    RETURN
-      dia, hora, L AS llamadas,
-      tasa_contacto, tasa_exito,
-      (A * tasa_exito + (1.0 - A) * tasa_contacto) AS score
-    ORDER BY score DESC, llamadas DESC
-    LIMIT $top_k
-    """
-    return run_cypher(
-        query,
-        {
-            "min_llamadas": min_llamadas,
-            "top_k": int(top_k),
-            "alpha": float(alpha),
+    # Responde desde el rollup KpiHorario (a lo sumo 7x24 nodos) que mantiene la
+    # ingesta; min_llamadas, alpha y top_k se aplican aquí sobre los contadores
+    params = {
+        "min_llamadas": min_llamadas,
+        "top_k": int(top_k),
+        "alpha": float(alpha),
+    }
+    return await cached_response(
+        request, "mejores_horarios", params, lambda: backend.rows("mejores_horarios", params)
+    )
+
+
+# ---- Endpoint 5: KPIs del dashboard ----
+# Todas las tarjetas en un round trip: cada bloque es un CALL que devuelve una sola
+# fila (recuperación por tipo de deuda, actividad de pagos del período y del
+# anterior, promesas vencidas / cumplidas). Como en promesas-incumplidas, con la
+# ventana materializada se leen los derivados de cada promesa.
+Q_KPIS_INICIO = """
+WITH datetime($hasta) AS LIMITE, datetime($desde) AS DESDE,
+     datetime($desde_anterior) AS DESDE_ANTERIOR, coalesce($modo,'acumulado') AS modo
+CALL {
+  WITH LIMITE
+  MATCH (d:Deuda)
+  CALL {
+    WITH d, LIMITE
+    OPTIONAL MATCH (pay:Interaccion)-[:APLICADO_A]->(d)
+    WHERE pay.timestamp < LIMITE
+    RETURN sum(coalesce(pay.monto, 0)) AS recuperado
+  }
+  WITH d.tipo AS tipo, count(d) AS deudas,
+       toFloat(sum(coalesce(d.monto_inicial, 0))) AS deuda_inicial,
+       toFloat(sum(recuperado)) AS recuperado
+  ORDER BY tipo
+  RETURN collect({
+    tipo: tipo,
+    deudas: deudas,
+    deuda_inicial: deuda_inicial,
+    recuperado: recuperado,
+    tasa_recuperacion: CASE WHEN deuda_inicial = 0 THEN 0.0 ELSE recuperado / deuda_inicial END
+  }) AS deuda_por_tipo
+}
+CALL {
+  // Range seek sobre inter_tipo_ts: sólo los pagos de los dos períodos
+  WITH LIMITE, DESDE, DESDE_ANTERIOR
+  MATCH (pay:Interaccion)
+  WHERE pay.tipo = 'pago_recibido'
+    AND pay.timestamp >= DESDE_ANTERIOR
+    AND pay.timestamp < LIMITE
+  WITH pay, pay.timestamp >= DESDE AS actual, coalesce(pay.monto, 0) AS monto
+  RETURN {
+    pagos: sum(CASE WHEN actual THEN 1 ELSE 0 END),
+    monto: toFloat(sum(CASE WHEN actual THEN monto ELSE 0 END)),
+    pagos_completos: sum(CASE WHEN actual AND coalesce(pay.pago_completo, false) THEN 1 ELSE 0 END),
+    pagos_anterior: sum(CASE WHEN actual THEN 0 ELSE 1 END),
+    monto_anterior: toFloat(sum(CASE WHEN actual THEN 0 ELSE monto END))
+  } AS actividad_pagos
+}
+"""
+
+Q_KPIS_PROMESAS_MATERIALIZADA = """
+CALL {
+  WITH LIMITE, modo
+  MATCH (p:Promesa)
+  WHERE p.fecha_promesa < LIMITE
+    AND p.ventana_dias = $ventanaDias
+  WITH p, CASE WHEN modo = 'estricto' THEN p.cumplida_estricto ELSE p.cumplida_acumulado END AS cumplida
+"""
+
+Q_KPIS_PROMESAS = """
+CALL {
+  WITH LIMITE, modo
+  MATCH (p:Promesa)
+  WHERE p.fecha_promesa < LIMITE
+  MATCH (c:Cliente)-[:TUVO]->(:Interaccion)-[:RESULTA_EN]->(p)
+  CALL {
+    WITH c, p
+    OPTIONAL MATCH (c)-[:TUVO]->(pay:Interaccion)
+    WHERE pay.tipo = 'pago_recibido'
+      AND pay.timestamp >= p.fecha_promesa
+      AND pay.timestamp <= p.fecha_promesa + duration({days: toInteger($ventanaDias)})
+    RETURN toFloat(sum(coalesce(pay.monto, 0))) AS monto_sum,
+           toFloat(coalesce(max(pay.monto), 0)) AS monto_max
+  }
+  WITH p, (CASE WHEN modo = 'estricto' THEN monto_max ELSE monto_sum END)
+          >= coalesce(p.monto_prometido, 0.0) AS cumplida
+"""
+
+Q_KPIS_FIN = """
+  RETURN {
+    vencidas: count(p),
+    cumplidas: sum(CASE WHEN cumplida THEN 1 ELSE 0 END),
+    monto_prometido: toFloat(sum(coalesce(p.monto_prometido, 0))),
+    monto_cumplido: toFloat(sum(CASE WHEN cumplida THEN coalesce(p.monto_prometido, 0) ELSE 0 END))
+  } AS promesas
+}
+RETURN deuda_por_tipo, actividad_pagos, promesas
+"""
+
+Q_KPIS_MATERIALIZADA = Q_KPIS_INICIO + Q_KPIS_PROMESAS_MATERIALIZADA + Q_KPIS_FIN
+Q_KPIS = Q_KPIS_INICIO + Q_KPIS_PROMESAS + Q_KPIS_FIN
+
+
+def variacion_pct(actual: float, anterior: float) -> Optional[float]:
+    return None if not anterior else (actual - anterior) / anterior * 100.0
+
+
+def resumen_kpis(row: Dict[str, Any], agente: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    # Totales y tasas a partir de los bloques de la consulta (mismo cálculo para
+    # los dos backends)
+    deuda_inicial = sum(d["deuda_inicial"] for d in row["deuda_por_tipo"])
+    recuperado = sum(d["recuperado"] for d in row["deuda_por_tipo"])
+    p = row["promesas"]
+    a = row["actividad_pagos"]
+    return {
+        "recuperacion": {
+            "deuda_inicial": deuda_inicial,
+            "recuperado": recuperado,
+            "tasa": recuperado / deuda_inicial if deuda_inicial else 0.0,
         },
+        "promesas": dict(
+            p,
+            incumplidas=p["vencidas"] - p["cumplidas"],
+            tasa_cumplimiento=p["cumplidas"] / p["vencidas"] if p["vencidas"] else 0.0,
+        ),
+        "deuda_por_tipo": row["deuda_por_tipo"],
+        "actividad_pagos": dict(
+            a,
+            variacion_pagos_pct=variacion_pct(a["pagos"], a["pagos_anterior"]),
+            variacion_monto_pct=variacion_pct(a["monto"], a["monto_anterior"]),
+        ),
+        "agente": (
+            {"agente_id": agente[0]["agente_id"], "resumen": agente[0]["resumen"]} if agente else None
+        ),
+    }
+
+
+@router.get("/analytics/kpis")
+async def kpis(
+    request: Request,
+    hasta: datetime = FQuery(...),
+    periodoDias: int = FQuery(30, ge=1),
+    ventanaDias: int = FQuery(14, ge=1),
+    modo: str = FQuery("acumulado", regex="^(acumulado|estricto)$"),
+    agente_id: Optional[str] = FQuery(None),
+) -> Dict[str, Any]:
+    # Una request por carga del dashboard en lugar de una por tarjeta
+    params = {
+        "hasta": hasta.isoformat(),
+        "desde": (hasta - timedelta(days=periodoDias)).isoformat(),
+        "desde_anterior": (hasta - timedelta(days=2 * periodoDias)).isoformat(),
+        "ventanaDias": ventanaDias,
+        "modo": modo,
+    }
+
+    async def compute():
+        # El resumen del agente va en paralelo, por otra conexión del pool
+        tareas = [backend.rows("kpis", params)]
+        if agente_id:
+            tareas.append(
+                backend.rows(
+                    "agentes_efectividad",
+                    {"ids": [agente_id], "orden": "total_llamadas", "top_k": 1, "min_llamadas": 1},
+                )
+            )
+        rows, *agente = await asyncio.gather(*tareas)
+        return resumen_kpis(rows[0], agente[0] if agente else None)
+
+    return await cached_response(request, "kpis", dict(params, agente_id=agente_id), compute)
+
+
+# ---- Endpoint 6: Series para el gráfico de tendencia ----
+# Range seek sobre el rollup KpiDiario (índice kpi_diario_fecha): el costo depende
+# de los días pedidos, no de las interacciones. Días, semanas ISO o meses UTC
+Q_SERIES = """
+MATCH (k:KpiDiario)
+WHERE k.fecha >= date($desde) AND k.fecha <= date($hasta)
+WITH CASE $bucket
+       WHEN 'semana' THEN date.truncate('week', k.fecha)
+       WHEN 'mes' THEN date.truncate('month', k.fecha)
+       ELSE k.fecha
+     END AS periodo, k
+RETURN toString(periodo) AS periodo,
+       sum(k.llamadas) AS llamadas,
+       sum(k.contactos) AS contactos,
+       sum(k.promesas) AS promesas,
+       sum(k.pagos) AS pagos,
+       toFloat(sum(k.monto_pagado)) AS monto_pagado
+ORDER BY periodo
+"""
+
+
+def completar_series(rows: List[Dict[str, Any]], desde: date, hasta: date, bucket: str) -> List[Dict[str, Any]]:
+    # Los días sin actividad no tienen nodo: se completan con ceros para que el
+    # gráfico tenga un punto por período
+    por_periodo = {r["periodo"]: r for r in rows}
+    vacio = dict.fromkeys(rollups.CAMPOS_DIARIO, 0)
+    out = []
+    for inicio in rollups.periodos(desde, hasta, bucket):
+        r = dict(por_periodo.get(inicio.isoformat()) or dict(vacio, periodo=inicio.isoformat()))
+        r["monto_pagado"] = float(r["monto_pagado"])
+        r["tasa_contacto"] = r["contactos"] / r["llamadas"] if r["llamadas"] else 0.0
+        out.append(r)
+    return out
+
+
+@router.get("/analytics/series")
+async def series(
+    request: Request,
+    desde: date = FQuery(...),
+    hasta: date = FQuery(...),
+    bucket: str = FQuery("dia", regex="^(dia|semana|mes)$"),
+) -> Dict[str, Any]:
+    if desde > hasta:
+        raise HTTPException(status_code=400, detail="desde debe ser anterior o igual a hasta")
+    puntos = rollups.n_periodos(desde, hasta, bucket)
+    if puntos > SERIES_MAX_PUNTOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"el rango pide {puntos} puntos por {bucket}; el máximo es {SERIES_MAX_PUNTOS}",
+        )
+    params = {"desde": desde.isoformat(), "hasta": hasta.isoformat(), "bucket": bucket}
+
+    async def compute():
+        rows = await backend.rows("series", params)
+        return dict(params, puntos=completar_series(rows, desde, hasta, bucket))
+
+    return await cached_response(request, "series", params, compute)
+
+
+# ---- Backends ----
+# Los endpoints piden filas por nombre (el del endpoint) con sus parámetros; el
+# backend decide cómo resolverlas: Cypher contra Neo4j o el motor columnar en
+# memoria sobre el export (columnar/), sin base de datos
+
+# Ventana con la que la ingesta materializó CUMPLIDA_POR en cada promesa. Puede no
+# coincidir con CUMPLIMIENTO_VENTANA_DIAS del API, o quedar mezclada si una
+# re-ingesta incremental usó otra: los derivados sólo sirven si todas las promesas
+# tienen la misma ventana que la pedida
+Q_VENTANA_MATERIALIZADA = """
+MATCH (p:Promesa)
+WHERE p.fecha_promesa IS NOT NULL
+RETURN collect(DISTINCT coalesce(p.ventana_dias, -1)) AS ventanas
+"""
+
+
+def ventana_unica(ventanas: List[int]) -> Optional[int]:
+    return ventanas[0] if len(ventanas) == 1 and ventanas[0] >= 0 else None
+
+
+def cypher_query(name: str, params: Dict[str, Any], ventana: Optional[int] = None) -> str:
+    # `ventana`: la materializada en el grafo (None = los derivados no sirven)
+    materializada = ventana is not None and params.get("ventanaDias") == ventana
+    if name == "cliente_timeline":
+        return Q_TIMELINE_PAGINA if params.get("limit") else Q_TIMELINE
+    if name == "agentes_efectividad":
+        return Q_AGENTES_EFECTIVIDAD_IDS if params.get("ids") else Q_AGENTES_EFECTIVIDAD
+    if name == "promesas_incumplidas":
+        query = Q_PROMESAS_INCUMPLIDAS_MATERIALIZADA if materializada else Q_PROMESAS_INCUMPLIDAS
+        return query + "LIMIT $limit\n" if params.get("limit") else query
+    if name == "mejores_horarios":
+        return Q_MEJORES_HORARIOS
+    if name == "kpis":
+        return Q_KPIS_MATERIALIZADA if materializada else Q_KPIS
+    if name == "series":
+        return Q_SERIES
+    raise KeyError(name)
+
+
+class Neo4jBackend:
+    def __init__(self):
+        # (versión del dataset, ventana materializada)
+        self._ventana: Tuple[Optional[int], Optional[int]] = (None, None)
+
+    async def open(self):
+        await init_driver()
+        await verify_connectivity()
+
+    async def close(self):
+        await close_driver()
+
+    async def version(self) -> int:
+        rows = await run_cypher(Q_DATASET_VERSION, {}, "dataset_version")
+        return rows[0]["version"]
+
+    async def ventana_materializada(self) -> Optional[int]:
+        # Se lee una vez por versión del dataset (cambia sólo con una ingesta)
+        version = await dataset_version.current()
+        if self._ventana[0] != version:
+            rows = await run_cypher(Q_VENTANA_MATERIALIZADA, {}, "ventana_materializada")
+            self._ventana = (version, ventana_unica(rows[0]["ventanas"]))
+        return self._ventana[1]
+
+    async def query(self, name: str, params: Dict[str, Any]) -> str:
+        ventana = await self.ventana_materializada() if "ventanaDias" in params else None
+        return cypher_query(name, params, ventana)
+
+    async def rows(self, name: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await run_cypher(await self.query(name, params), params, name)
+
+    async def stream(self, name: str, params: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        async for row in stream_cypher(await self.query(name, params), params, name):
+            yield row
+
+
+def select_backend():
+    if ANALYTICS_BACKEND == "memoria":
+        return ColumnarBackend(ANALYTICS_DATASET)
+    return Neo4jBackend()
+
+
+backend = select_backend()
+
+
+# ---- Arranque: warm-up ----
+# Neo4j cachea el plan por texto de consulta: se ejecuta una vez cada variante que
+# puede producir cypher_query para que el primer request de cada endpoint no pague
+# la planificación. Ids inexistentes: el plan es el mismo y la ejecución mínima
+def warmup_queries(hasta: datetime, ventana: int) -> List[Tuple[str, Dict[str, Any]]]:
+    corte = hasta.isoformat()
+    promesas = {"hasta": corte, "modo": "acumulado", "desde": None, "after_dias": None, "after_id": None}
+    kpis = {
+        "hasta": corte,
+        "desde": (hasta - timedelta(days=30)).isoformat(),
+        "desde_anterior": (hasta - timedelta(days=60)).isoformat(),
+        "modo": "acumulado",
+    }
+    # La materializada y otra cualquiera: las dos variantes de promesas y kpis
+    ventanas = (ventana, ventana + 1)
+    timeline = {"id": "__warmup__", "after_ts": None, "after_id": None}
+    return (
+        [("cliente_timeline", dict(timeline, limit=limit)) for limit in (None, 1)]
+        + [
+            ("agentes_efectividad", {"orden": "total_llamadas", "top_k": 1, "min_llamadas": 1}),
+            ("agentes_efectividad", {"ids": ["__warmup__"], "orden": "total_llamadas", "top_k": 1, "min_llamadas": 1}),
+        ]
+        + [
+            ("promesas_incumplidas", dict(promesas, ventanaDias=v, limit=limit))
+            for v in ventanas
+            for limit in (None, 1)
+        ]
+        + [("mejores_horarios", {"min_llamadas": 1, "top_k": 1, "alpha": 0.5})]
+        + [("kpis", dict(kpis, ventanaDias=v)) for v in ventanas]
+        + [("series", {"desde": hasta.date().isoformat(), "hasta": hasta.date().isoformat(), "bucket": "dia"})]
     )
+
+
+async def warmup() -> float:
+    # Devuelve los segundos que tomó (se loguea en main.py)
+    t0 = time.perf_counter()
+    await dataset_version.current()
+    ventana = cumplimiento.VENTANA_DIAS
+    if isinstance(backend, Neo4jBackend):
+        ventana = await backend.ventana_materializada() or ventana
+    for name, params in warmup_queries(datetime.now(timezone.utc), ventana):
+        await backend.rows(name, params)
+    return time.perf_counter() - t0
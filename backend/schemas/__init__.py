@@ -1,5 +1,8 @@
+from schemas.cliente import Cliente
+from schemas.dataset import Dataset
+from schemas.interacciones import Interaccion
 from schemas.interacciones import Llamada
 from schemas.interacciones import Mensaje
 from schemas.interacciones import Pago
 
-__all__ = ["Llamada", "Mensaje", "Pago"]
+__all__ = ["Cliente", "Dataset", "Interaccion", "Llamada", "Mensaje", "Pago"]
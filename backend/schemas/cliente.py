@@ -1,3 +1,4 @@
+from datetime import date
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -5,4 +6,7 @@ class Cliente(BaseModel):
     model_config = ConfigDict(extra="forbid")
     id: str
     nombre: str
+    telefono: str | None = None
     monto_deuda_inicial: int = Field(ge=0)
+    fecha_prestamo: date | None = None
+    tipo_deuda: str | None = None
@@ -14,6 +14,6 @@ class Llamada(BaseModel):
     agente_id: str
     resultado: str
     sentimiento: Literal["cooperativo", "neutral", "frustrado", "hostil", "n/a"]
-    monto_prometido: float | None
-    fecha_promesa: datetime | None
-    nuevo_plan_pago: Renegociacion
+    monto_prometido: float | None = None
+    fecha_promesa: datetime | None = None
+    nuevo_plan_pago: Renegociacion | None = None
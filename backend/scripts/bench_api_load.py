@@ -0,0 +1,92 @@
+# scripts/bench_api_load.py
+# Latencia p50/p99 del API según concurrencia, con un stub en lugar de Neo4j.
+#
+#   python -m scripts.bench_api_load --concurrency 1,10,50,100 --latency-ms 20
+#
+# "antes": handler `def` que bloquea un hilo del threadpool durante la consulta
+#          (como el driver síncrono).
+# "después": el router real (`async def` + run_cypher async) con run_cypher
+#          reemplazado por un stub que espera la misma latencia sin bloquear.
+# Sin cache de respuestas (como bench_suite) y con la versión del dataset vencida al
+# empezar cada nivel: todos los niveles miden el camino de la consulta, no hits.
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+import router.analytics as analytics
+
+FILAS = [{"interaccion_id": "int_0", "tipo": "llamada_saliente", "timestamp": "2025-05-17T13:37:49Z"}]
+
+
+def app_sync(latency: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/clientes/{id}/timeline")
+    def cliente_timeline(id: str):
+        time.sleep(latency)
+        return FILAS
+
+    return app
+
+
+def app_async(latency: float) -> FastAPI:
+    async def stub_run_cypher(query, params, name="cypher"):
+        await asyncio.sleep(latency)
+        if "DatasetVersion" in query:
+            return [{"version": 1}]
+        return FILAS
+
+    analytics.run_cypher = stub_run_cypher
+    analytics.cache.maxsize = 0
+    app = FastAPI()
+    app.include_router(analytics.router)
+    return app
+
+
+async def load(app: FastAPI, concurrency: int, requests: int):
+    # Mismo punto de partida en cada nivel (los ids se repiten entre niveles)
+    analytics.cache.clear()
+    analytics.dataset_version.invalidate()
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one(n: int):
+            async with sem:
+                t0 = time.perf_counter()
+                r = await client.get(f"/clientes/cliente_{n}/timeline")
+                latencies.append(time.perf_counter() - t0)
+                r.raise_for_status()
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(n) for n in range(requests)))
+        wall = time.perf_counter() - t0
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return p50 * 1000, p99 * 1000, requests / wall
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--concurrency", default="1,10,50,100,200")
+    p.add_argument("--requests", type=int, default=1000)
+    p.add_argument("--latency-ms", type=float, default=20.0, help="latencia simulada de Neo4j")
+    args = p.parse_args()
+    latency = args.latency_ms / 1000
+
+    apps = [("antes (sync)", app_sync(latency)), ("después (async)", app_async(latency))]
+    print(f"{'modo':<16} {'conc':>5} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    for name, app in apps:
+        for c in [int(x) for x in args.concurrency.split(",")]:
+            p50, p99, rps = asyncio.run(load(app, c, args.requests))
+            print(f"{name:<16} {c:>5} {p50:>8.1f} {p99:>8.1f} {rps:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
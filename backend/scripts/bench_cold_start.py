@@ -0,0 +1,120 @@
+# scripts/bench_cold_start.py
+# Arranque en frío del API: tiempo desde que se lanza uvicorn hasta que acepta
+# requests y hasta la primera respuesta de cada endpoint, contra la latencia en
+# tibio, sin warm-up (API_WARMUP=0, como antes) y con warm-up en el lifespan.
+#
+#   python -m scripts.bench_cold_start --neo4j                       # base cargada con el archivo
+#   python -m scripts.bench_cold_start --dataset ./interacciones_clientes_2.json --workers 2
+#
+#   # otro checkout (p. ej. un worktree anterior al warm-up, que ignora API_WARMUP)
+#   git worktree add /tmp/base <commit>
+#   python -m scripts.bench_cold_start --backend-dir /tmp/base/backend --modos sin
+#
+# Cada modo levanta un uvicorn nuevo en un subproceso, con el cache de respuestas
+# desactivado. Con --neo4j se vacía antes el cache de planes del servidor
+# (db.clearQueryCaches): si no, un arranque encontraría los planes del anterior.
+# Sin --neo4j usa el backend en memoria.
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from scripts.bench_stream_memory import SAMPLE
+from scripts.bench_suite import requests_for
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def clear_plan_cache():
+    from scripts.ingest_from_json import NEO4J_DB, open_driver
+
+    driver = open_driver()
+    try:
+        with driver.session(database=NEO4J_DB) as s:
+            s.run("CALL db.clearQueryCaches()").consume()
+    finally:
+        driver.close()
+
+
+def medir(modo: str, warmup: bool, args) -> Dict[str, Any]:
+    env = dict(os.environ, API_WARMUP="1" if warmup else "0", RESULT_CACHE_SIZE="0")
+    if not args.neo4j:
+        env.update(ANALYTICS_BACKEND="memoria", ANALYTICS_DATASET=os.path.abspath(args.dataset))
+    else:
+        clear_plan_cache()
+    reqs = requests_for(args.dataset, args.requests + 1, args.seed)
+    base = f"http://127.0.0.1:{args.port}"
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(args.port),
+           "--workers", str(args.workers)]
+
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=args.backend_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        with httpx.Client(base_url=base, timeout=30) as client:
+            # uvicorn no acepta conexiones hasta terminar el lifespan (warm-up incluido)
+            while True:
+                if proc.poll() is not None:
+                    raise RuntimeError(f"uvicorn terminó al arrancar:\n{proc.stderr.read().decode()[-2000:]}")
+                try:
+                    if client.get("/").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.02)
+            listo = time.perf_counter() - t0
+
+            endpoints = {}
+            for name, urls in reqs.items():
+                t = time.perf_counter()
+                client.request(*urls[0]).raise_for_status()
+                endpoints[name] = {"primera_ms": (time.perf_counter() - t) * 1000}
+            primera_pasada = time.perf_counter() - t0
+
+            for name, urls in reqs.items():
+                latencias = []
+                for method, url in urls[1:]:
+                    t = time.perf_counter()
+                    client.request(method, url).raise_for_status()
+                    latencias.append((time.perf_counter() - t) * 1000)
+                endpoints[name]["tibia_p50_ms"] = statistics.median(latencias)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return {"modo": modo, "listo_s": listo, "primera_pasada_s": primera_pasada, "endpoints": endpoints}
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--dataset", default=SAMPLE, help="archivo cargado (ids de clientes / agentes para los requests)")
+    p.add_argument("--neo4j", action="store_true", help="contra Neo4j (NEO4J_URI...) en lugar del backend en memoria")
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--port", type=int, default=9137)
+    p.add_argument("--requests", type=int, default=20, help="requests en tibio por endpoint")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--backend-dir", default=BACKEND_DIR, help="directorio backend/ desde el que se lanza uvicorn")
+    p.add_argument("--modos", default="sin,con", help="sin y/o con warm-up")
+    args = p.parse_args()
+
+    modos = args.modos.split(",")
+    resultados: List[Dict[str, Any]] = [
+        medir(f"{modo} warm-up", modo == "con", args) for modo in ("sin", "con") if modo in modos
+    ]
+    if args.backend_dir != BACKEND_DIR:
+        print(f"uvicorn desde {os.path.abspath(args.backend_dir)}")
+    for r in resultados:
+        print(f"{r['modo']}: acepta requests a los {r['listo_s']:.2f}s, "
+              f"primera respuesta de todos los endpoints a los {r['primera_pasada_s']:.2f}s")
+        for name, e in r["endpoints"].items():
+            print(f"  {name:<26} primera {e['primera_ms']:9.2f} ms   tibia p50 {e['tibia_p50_ms']:8.2f} ms   "
+                  f"x{e['primera_ms'] / e['tibia_p50_ms']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# scripts/bench_graphiti.py
+# Episodios/s de la ingesta a Graphiti según concurrencia, contra el stub
+# (scripts/graphiti_stub.py) en el mismo proceso o contra un servidor con --url.
+#
+#   python -m scripts.bench_graphiti --concurrency 1,4,16,32 --latency-ms 200
+#   python -m scripts.bench_graphiti --fallas 0.1 --capacidad 8       # reintentos / 429
+#   python -m scripts.bench_graphiti --url http://localhost:8000      # stub o Graphiti real
+#
+# Con el stub en proceso verifica además que cada cliente llegó en orden
+# cronológico y sin duplicados; una segunda corrida con el mismo checkpoint no
+# debe enviar nada. Sale con código 1 si algo de eso falla.
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from typing import List, Optional
+
+import httpx
+
+from graphiti import AsyncGraphitiClient, BuildStats, Checkpoint, GraphBuilder
+from graphiti.graph_builder import carriles
+from ingest import iter_records
+from scripts.bench_stream_memory import SAMPLE
+from scripts.graphiti_stub import app as stub_app
+
+GROUP = "bench"
+
+
+def en_orden(path: str, llegadas: List[str]) -> bool:
+    # Cada carril (cliente) llegó en el orden en que el pipeline debía enviarlo
+    pos = {name: n for n, name in enumerate(llegadas)}
+    for carril in carriles(iter_records(path), Checkpoint(None), BuildStats()):
+        vistos = [pos.get(iid, -1) for iid, _, _ in carril]
+        if vistos != sorted(vistos) or -1 in vistos:
+            return False
+    return True
+
+
+async def corrida(path: str, concurrency: int, args, checkpoint: str, transport: Optional[httpx.AsyncBaseTransport]):
+    async with AsyncGraphitiClient(
+        args.url or "http://stub", max_connections=concurrency, rate=args.rate,
+        max_retries=args.max_retries, transport=transport,
+    ) as client:
+        with Checkpoint(checkpoint) as cp:
+            return await GraphBuilder(client, GROUP, concurrency, args.batch_size, cp).run(iter_records(path))
+
+
+async def main_async(args) -> int:
+    errores = 0
+    print(f"{'conc':>5} {'episodios':>9} {'seg':>8} {'ep/s':>8} {'req':>6} {'reint':>6} {'en vuelo':>8}  verificación")
+    for concurrency in [int(c) for c in args.concurrency.split(",")]:
+        stub = None
+        transport = None
+        if not args.url:
+            stub = stub_app(args.latency_ms / 1000, args.fallas, args.capacidad, seed=concurrency)
+            transport = httpx.ASGITransport(app=stub)
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = os.path.join(tmp, "checkpoint.ndjson")
+            stats = await corrida(args.path, concurrency, args, checkpoint, transport)
+            reanudar = await corrida(args.path, concurrency, args, checkpoint, transport)
+        notas = []
+        if stub is not None:
+            st = stub.state.stub
+            llegadas = st.llegadas.get(GROUP, [])
+            if len(st.episodios.get(GROUP, {})) != stats.episodios or len(llegadas) != len(set(llegadas)):
+                notas.append("FALTAN O SOBRAN EPISODIOS")
+            if not en_orden(args.path, llegadas):
+                notas.append("FUERA DE ORDEN")
+            en_vuelo = st.max_en_vuelo
+        else:
+            en_vuelo = 0
+        if reanudar.enviados or stats.fallidos:
+            notas.append(f"REANUDAR ENVIÓ {reanudar.enviados}, fallidos {stats.fallidos}")
+        errores += bool(notas)
+        print(
+            f"{concurrency:>5} {stats.enviados:>9} {stats.seconds:>8.2f} {stats.episodios_por_seg:>8.1f} "
+            f"{stats.requests:>6} {stats.retries:>6} {en_vuelo:>8}  " + ("; ".join(notas) or "ok")
+        )
+    return 1 if errores else 0
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--path", default=SAMPLE, help="export a enviar (default: el sample del repo)")
+    p.add_argument("--url", default=None, help="servidor real en lugar del stub en proceso")
+    p.add_argument("--concurrency", default="1,4,16,32")
+    p.add_argument("--batch-size", type=int, default=5)
+    p.add_argument("--rate", type=float, default=0.0)
+    p.add_argument("--max-retries", type=int, default=8)
+    p.add_argument("--latency-ms", type=float, default=200.0, help="latencia del stub por request")
+    p.add_argument("--fallas", type=float, default=0.0, help="probabilidad de 503 del stub")
+    p.add_argument("--capacidad", type=int, default=0, help="requests en vuelo que acepta el stub (0 = sin límite)")
+    args = p.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# scripts/bench_ingest_workers.py
+# Throughput de la ingesta de interacciones según el número de workers.
+#
+#   python -m scripts.bench_ingest_workers --scale 100 --workers 1,2,4,8
+#   python -m scripts.bench_ingest_workers --scale 100 --workers 1,2,4,8 --neo4j
+#
+# Sin --neo4j se usa una sesión simulada que duerme una latencia fija por sentencia
+# más un costo por fila (como un servidor remoto), lo que mide el solapamiento entre
+# workers. El stub corre también los derivados y modela el lock de escritura sobre
+# los nodos de rollup (KpiHorario / KpiDiario), compartidos por todos los workers,
+# hasta el commit; "espera lock" es el tiempo total que los workers esperaron por
+# él (--sin-locks lo desactiva). Con --neo4j escribe en NEO4J_URI con ids propios de cada corrida, así que
+# conviene usar una base de pruebas.
+import argparse
+import threading
+import uuid
+from functools import partial
+
+from ingest import BatchWriter, ParallelIngest
+from scripts.bench_stream_memory import load_sample, scaled
+from scripts.stub_session import StubSession
+
+
+def run_once(session_factory, sample, scale, workers, batch_size):
+    tag = f"_b{uuid.uuid4().hex[:6]}"
+    clientes, interacciones = scaled(sample, scale, tag)
+    interacciones = list(interacciones)
+    agentes = sorted({i["agente_id"] for i in interacciones if i.get("agente_id")})
+
+    with session_factory() as s:
+        w = BatchWriter(s, batch_size=batch_size)
+        w.constraints()
+        deudas = w.clientes(clientes, {})
+        w.agentes(agentes)
+
+    par = ParallelIngest(session_factory, workers=workers, batch_size=batch_size, deudas=deudas)
+    par.run(interacciones)
+    st = par.stats()["interacciones"]
+    return len(interacciones), par.seconds, st.retries
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--scale", type=int, default=20, help="réplicas del sample (502 interacciones c/u)")
+    p.add_argument("--workers", default="1,2,4,8")
+    p.add_argument("--batch-size", type=int, default=500)
+    p.add_argument("--neo4j", action="store_true", help="escribir en NEO4J_URI en lugar del stub")
+    p.add_argument("--latency-ms", type=float, default=5.0, help="stub: latencia por sentencia")
+    p.add_argument("--row-us", type=float, default=20.0, help="stub: costo por fila en µs")
+    p.add_argument("--sin-locks", action="store_true", help="stub: sin lock sobre los nodos de rollup")
+    args = p.parse_args()
+
+    sample = load_sample()
+    driver = None
+    if args.neo4j:
+        from scripts.ingest_from_json import NEO4J_DB, open_driver
+
+        driver = open_driver()
+        factory = partial(driver.session, database=NEO4J_DB)
+    else:
+        lock = None if args.sin_locks else threading.Lock()
+
+        def factory():
+            s = StubSession(args.latency_ms, args.row_us, derivados=True, rollup_lock=lock)
+            sesiones.append(s)
+            return s
+
+    try:
+        print(
+            f"{'workers':>7} {'filas':>9} {'seg':>8} {'filas/s':>10} {'speedup':>8} {'reintentos':>10}"
+            + ("" if args.neo4j else f" {'espera lock':>12}")
+        )
+        base = None
+        for n in [int(x) for x in args.workers.split(",")]:
+            sesiones = []
+            rows, secs, retries = run_once(factory, sample, args.scale, n, args.batch_size)
+            rate = rows / secs if secs else 0.0
+            base = base or rate
+            print(
+                f"{n:>7} {rows:>9} {secs:>8.2f} {rate:>10.0f} {rate / base:>7.2f}x {retries:>10}"
+                + ("" if args.neo4j else f" {sum(s.lock_wait for s in sesiones):>11.2f}s")
+            )
+    finally:
+        if driver is not None:
+            driver.close()
+
+
+if __name__ == "__main__":
+    main()
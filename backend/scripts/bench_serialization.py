@@ -0,0 +1,115 @@
+# scripts/bench_serialization.py
+# CPU y bytes por respuesta: el camino anterior (to_native + jsonable_encoder +
+# json.dumps de JSONResponse) contra core.serialization (orjson con los tipos de
+# Neo4j, sin recorrer las filas antes), y el tamaño con gzip / brotli.
+#
+#   python -m scripts.bench_serialization --dataset ./interacciones_clientes_2.json
+#   python -m scripts.bench_serialization --clientes 2000 --interacciones-por-cliente 40
+#
+# Las filas salen del backend columnar y se pasan a DateTime de Neo4j, como las
+# devuelve el driver. Sale con código 1 si los dos caminos no producen el mismo JSON.
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from neo4j.time import DateTime
+
+from columnar import ColumnarStore, load
+from columnar.store import SIN_TS, from_us
+from core import serialization
+from scripts.check_columnar import to_native
+from scripts.generate_dataset import add_arguments, params_from, write
+
+
+def as_driver(value: Any) -> Any:
+    # datetime -> neo4j.time.DateTime en toda la estructura
+    if isinstance(value, datetime):
+        return DateTime.from_native(value)
+    if isinstance(value, dict):
+        return {k: as_driver(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [as_driver(v) for v in value]
+    return value
+
+
+def respuestas(store: ColumnarStore) -> Dict[str, List[Dict[str, Any]]]:
+    mayor = max(store.rango_cliente, key=lambda c: store.rango_cliente[c][1] - store.rango_cliente[c][0])
+    hasta = from_us(max(t for t in store.ts if t != SIN_TS)).isoformat()
+    return {
+        "timeline (cliente más largo)": store.cliente_timeline(
+            {"id": mayor, "after_ts": None, "after_id": None, "limit": None}
+        ),
+        "promesas-incumplidas": store.promesas_incumplidas({
+            "hasta": hasta,
+            "ventanaDias": 14,
+            "modo": "acumulado",
+            "desde": None,
+            "after_dias": None,
+            "after_id": None,
+            "limit": None,
+        }),
+        "agentes-efectividad": store.agentes_efectividad({"orden": "total_llamadas", "top_k": 1000, "min_llamadas": 1}),
+    }
+
+
+def anterior(rows: Any) -> bytes:
+    return JSONResponse(content=jsonable_encoder(to_native(rows))).body
+
+
+def cpu(fn: Callable[[Any], bytes], rows: Any, repeat: int) -> float:
+    # Segundos de CPU por llamada (media de `repeat`)
+    t0 = time.process_time()
+    for _ in range(repeat):
+        fn(rows)
+    return (time.process_time() - t0) / repeat
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--dataset", help="usar este archivo en lugar de generar uno")
+    add_arguments(p)
+    p.add_argument("--repeat", type=int, default=50, help="serializaciones por medición")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.dataset
+        if path is None:
+            path = os.path.join(tmp, "sintetico.json")
+            write(path, params_from(args))
+        store = load(path)
+
+    encodings = ("gzip", "br") if serialization.brotli is not None else ("gzip",)
+    distintos = []
+    print(f"{'respuesta':<30} {'filas':>6} {'antes ms':>9} {'orjson ms':>9} {'x':>6} "
+          f"{'bytes':>9}" + "".join(f" {e:>9}" for e in encodings) + "  ms comprimir")
+    for nombre, rows in respuestas(store).items():
+        rows = as_driver(rows)
+        a, b = anterior(rows), serialization.dumps(rows)
+        if json.loads(a) != json.loads(b):
+            distintos.append(nombre)
+        t_antes = cpu(anterior, rows, args.repeat)
+        t_orjson = cpu(serialization.dumps, rows, args.repeat)
+        tamanos = [len(serialization.compress(b, e)) for e in encodings]
+        t_comp = [cpu(lambda body: serialization.compress(body, e), b, max(1, args.repeat // 5)) for e in encodings]
+        print(
+            f"{nombre:<30} {len(rows):>6} {t_antes * 1000:>9.3f} {t_orjson * 1000:>9.3f} "
+            f"{t_antes / t_orjson if t_orjson else 0:>6.1f} {len(b):>9}"
+            + "".join(f" {n:>9}" for n in tamanos)
+            + "  " + " / ".join(f"{t * 1000:.3f}" for t in t_comp)
+        )
+    if serialization.brotli is None:
+        print("(brotli no instalado: sólo gzip)")
+    for nombre in distintos:
+        print(f"DIFERENTE: {nombre}")
+    sys.exit(1 if distintos else 0)
+
+
+if __name__ == "__main__":
+    main()
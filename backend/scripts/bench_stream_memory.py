@@ -0,0 +1,101 @@
+# scripts/bench_stream_memory.py
+# Compara el pico de RSS de la ingesta en memoria (json.load) contra la ingesta
+# streaming, sobre datasets sintéticos cada vez más grandes. No necesita Neo4j:
+# las sentencias se envían a una sesión nula.
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+from ingest import BatchWriter, iter_records
+from scripts.stub_session import StubSession
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "interacciones_clientes_2.json")
+
+
+def load_sample(sample_path=SAMPLE):
+    with open(sample_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def scaled(sample, scale, tag=""):
+    # Replica el sample `scale` veces con ids nuevos (clientes, interacciones)
+    clientes = (
+        dict(c, id=f"{c['id']}{tag}_{k}") for k in range(scale) for c in sample["clientes"]
+    )
+    interacciones = (
+        dict(i, id=f"{i['id']}{tag}_{k}", cliente_id=f"{i['cliente_id']}{tag}_{k}")
+        for k in range(scale)
+        for i in sample["interacciones"]
+    )
+    return clientes, interacciones
+
+
+def write_scaled(sample_path, out_path, scale):
+    # Escribe registro a registro para no materializar el dataset escalado
+    sample = load_sample(sample_path)
+    clientes, interacciones = scaled(sample, scale)
+    with open(out_path, "w", encoding="utf-8") as out:
+        out.write('{"metadata": %s, "clientes": [' % json.dumps(sample["metadata"]))
+        for n, c in enumerate(clientes):
+            out.write(("," if n else "") + json.dumps(c))
+        out.write('], "interacciones": [')
+        for n, i in enumerate(interacciones):
+            out.write(("," if n else "") + json.dumps(i))
+        out.write("]}")
+
+
+def run_mode(mode, path, batch_size):
+    w = BatchWriter(StubSession(), batch_size=batch_size)
+    if mode == "load":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        clientes = data.get("clientes", [])
+        interacciones = data.get("interacciones", [])
+        agentes = sorted({i["agente_id"] for i in interacciones if i.get("agente_id")})
+        deudas = w.clientes(clientes, {})
+        w.agentes(agentes)
+        w.interacciones(interacciones, deudas)
+    else:
+        w.stream(iter_records(path))
+    # ru_maxrss está en KiB en Linux
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def measure(mode, path, batch_size):
+    out = subprocess.check_output(
+        [sys.executable, "-m", "scripts.bench_stream_memory", "--child", mode, path,
+         "--batch-size", str(batch_size)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    return int(out.decode().strip().splitlines()[-1])
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--scales", default="1,10,100", help="factores de escala del sample")
+    p.add_argument("--batch-size", type=int, default=1000)
+    p.add_argument("--child", nargs=2, metavar=("MODO", "RUTA"), help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    if args.child:
+        run_mode(args.child[0], args.child[1], args.batch_size)
+        return
+
+    print(f"{'escala':>7} {'MB archivo':>11} {'RSS load MB':>12} {'RSS stream MB':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in [int(x) for x in args.scales.split(",")]:
+            path = os.path.join(tmp, f"dataset_x{scale}.json")
+            write_scaled(SAMPLE, path, scale)
+            size_mb = os.path.getsize(path) / 2**20
+            load_mb = measure("load", path, args.batch_size) / 1024
+            stream_mb = measure("stream", path, args.batch_size) / 1024
+            print(f"{scale:>7} {size_mb:>11.1f} {load_mb:>12.1f} {stream_mb:>14.1f}")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# scripts/bench_suite.py
+# Suite de benchmarks reproducible: genera un dataset sintético con semilla (o usa
+# uno dado), mide el throughput de la ingesta y la latencia p50/p99 de cada endpoint
+# a través de la app (httpx + ASGI, sin cache de respuestas) y guarda el resultado
+# en JSON para comparar corridas.
+#
+#   python -m scripts.bench_suite --clientes 5000 --out bench/base.json
+#   python -m scripts.bench_suite --clientes 5000 --compare bench/base.json
+#   python -m scripts.bench_suite --neo4j --clientes 2000      # contra un Neo4j local
+#   python -m scripts.bench_suite --dataset ./interacciones_clientes_2.json
+#
+# Sin --neo4j la ingesta se mide contra una sesión nula (construcción de filas y
+# lotes del lado de Python) y los endpoints contra el backend columnar en memoria.
+# --compare sale con código 1 si algún p50 o el throughput empeoran más que
+# --tolerancia respecto de la corrida de referencia.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+import httpx
+from fastapi import FastAPI
+
+import router.analytics as analytics
+from columnar import ColumnarBackend
+from ingest import BatchWriter, iter_records
+from scripts.generate_dataset import Params, add_arguments, params_from, write
+from scripts.stub_session import StubSession
+
+Request = Tuple[str, str]
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+        return out.stdout.strip() or "desconocido"
+    except OSError:
+        return "desconocido"
+
+
+def dataset_ids(path: str) -> Tuple[List[str], List[str], str]:
+    # Clientes, agentes y el último timestamp (para `hasta` de promesas-incumplidas)
+    clientes, agentes, ultimo = [], set(), ""
+    for key, rec in iter_records(path):
+        if key == "clientes":
+            clientes.append(rec["id"])
+        else:
+            if rec.get("agente_id"):
+                agentes.add(rec["agente_id"])
+            ultimo = max(ultimo, rec.get("timestamp") or "")
+    return clientes, sorted(agentes), ultimo
+
+
+def bench_ingest(path: str, neo4j: bool, batch_size: int) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    if neo4j:
+        from scripts.ingest_from_json import NEO4J_DB, open_driver
+
+        driver = open_driver()
+        try:
+            with driver.session(database=NEO4J_DB) as s:
+                w = BatchWriter(s, batch_size=batch_size)
+                w.constraints()
+                w.stream(iter_records(path))
+                w.bump_version()
+        finally:
+            driver.close()
+    else:
+        w = BatchWriter(StubSession(), batch_size=batch_size)
+        w.stream(iter_records(path))
+    seconds = time.perf_counter() - t0
+    rows = w.stats["interacciones"].rows if "interacciones" in w.stats else 0
+    return {
+        "destino": "neo4j" if neo4j else "sesion_nula",
+        "interacciones": rows,
+        "segundos": round(seconds, 3),
+        "filas_por_seg": round(rows / seconds, 1) if seconds else 0.0,
+        "etapas": {
+            name: {"filas": st.rows, "segundos": round(st.seconds, 3), "transacciones": st.transactions}
+            for name, st in w.stats.items()
+        },
+    }
+
+
+def requests_for(path: str, n: int, seed: int) -> Dict[str, List[Request]]:
+    rng = random.Random(seed)
+    clientes, agentes, ultimo = dataset_ids(path)
+    hasta = (
+        datetime.fromisoformat(ultimo.replace("Z", "+00:00")) if ultimo else datetime.now(timezone.utc)
+    ) + timedelta(days=1)
+    hasta_q = hasta.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return {
+        "cliente_timeline": [("GET", f"/clientes/{rng.choice(clientes)}/timeline") for _ in range(n)],
+        "cliente_timeline_pagina": [
+            ("GET", f"/clientes/{rng.choice(clientes)}/timeline?limit=20") for _ in range(n)
+        ],
+        "agente_efectividad": [("GET", f"/agentes/{rng.choice(agentes)}/efectividad") for _ in range(n)],
+        "agentes_efectividad": [
+            ("GET", f"/agentes/efectividad?orden={o}&top_k=20")
+            for o in rng.choices(analytics.ORDENES_EFECTIVIDAD, k=n)
+        ],
+        "promesas_incumplidas": [
+            ("GET", f"/analytics/promesas-incumplidas?hasta={hasta_q}&modo={m}&limit=100")
+            for m in rng.choices(("acumulado", "estricto"), k=n)
+        ],
+        "mejores_horarios": [
+            ("GET", f"/analytics/mejores-horarios?min_llamadas={rng.choice((1, 5, 10))}&alpha={a}")
+            for a in rng.choices((0.0, 0.25, 0.5, 0.75, 1.0), k=n)
+        ],
+        "kpis": [
+            ("GET", f"/analytics/kpis?hasta={hasta_q}&periodoDias={d}&agente_id={rng.choice(agentes)}")
+            for d in rng.choices((7, 30, 90), k=n)
+        ],
+        "series": [
+            ("GET", f"/analytics/series?desde={(hasta - timedelta(days=d)).date()}&hasta={hasta.date()}&bucket={b}")
+            for d, b in zip(rng.choices((7, 30, 90), k=n), rng.choices(("dia", "semana", "mes"), k=n))
+        ],
+    }
+
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return {
+        "n": len(latencies),
+        "p50_ms": round(p50 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "media_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+    }
+
+
+async def bench_endpoints(path: str, neo4j: bool, n: int, seed: int) -> Dict[str, Any]:
+    analytics.backend = analytics.Neo4jBackend() if neo4j else ColumnarBackend(path)
+    t0 = time.perf_counter()
+    await analytics.backend.open()
+    carga = time.perf_counter() - t0
+    # Sin cache de respuestas: cada request ejecuta la consulta
+    analytics.cache.maxsize = 0
+    app = FastAPI()
+    app.include_router(analytics.router)
+
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, reqs in requests_for(path, n, seed).items():
+                latencies = []
+                for method, url in reqs:
+                    t = time.perf_counter()
+                    r = await client.request(method, url)
+                    latencies.append(time.perf_counter() - t)
+                    r.raise_for_status()
+                results[name] = percentiles(latencies)
+    finally:
+        await analytics.backend.close()
+    return {"backend": "neo4j" if neo4j else "memoria", "carga_segundos": round(carga, 3), "endpoints": results}
+
+
+def compare(base: Dict[str, Any], actual: Dict[str, Any], tolerancia: float) -> List[str]:
+    regresiones = []
+    print(f"{'medida':<28} {'base':>10} {'actual':>10} {'cambio':>8}")
+
+    def fila(nombre: str, antes: float, ahora: float, menor_es_mejor: bool = True):
+        if not antes:
+            return
+        cambio = ahora / antes - 1
+        peor = cambio > tolerancia if menor_es_mejor else -cambio > tolerancia
+        print(f"{nombre:<28} {antes:>10.3f} {ahora:>10.3f} {cambio:>+7.0%}" + ("  REGRESIÓN" if peor else ""))
+        if peor:
+            regresiones.append(nombre)
+
+    fila("ingesta filas/s", base["ingesta"]["filas_por_seg"], actual["ingesta"]["filas_por_seg"], False)
+    for name, r in actual["api"]["endpoints"].items():
+        b = base["api"]["endpoints"].get(name)
+        if b:
+            fila(f"{name} p50", b["p50_ms"], r["p50_ms"])
+            fila(f"{name} p99", b["p99_ms"], r["p99_ms"])
+    return [r for r in regresiones if not r.endswith("p99")]
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--dataset", help="usar este archivo en lugar de generar uno")
+    add_arguments(p)
+    p.add_argument("--neo4j", action="store_true", help="ingesta y consultas contra Neo4j")
+    p.add_argument("--requests", type=int, default=200, help="requests por endpoint")
+    p.add_argument("--batch-size", type=int, default=1000)
+    p.add_argument("--out", help="guardar el resultado en este JSON")
+    p.add_argument("--compare", help="JSON de una corrida anterior")
+    p.add_argument("--tolerancia", type=float, default=0.25, help="regresión tolerada (0.25 = 25%%)")
+    args = p.parse_args()
+
+    params: Params = params_from(args)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.dataset
+        if path is None:
+            path = os.path.join(tmp, "sintetico.json")
+            t0 = time.perf_counter()
+            n = write(path, params)
+            print(f"dataset: {params.clientes} clientes, {n} interacciones ({time.perf_counter() - t0:.1f}s)")
+
+        ingesta = bench_ingest(path, args.neo4j, args.batch_size)
+        print(f"ingesta: {ingesta['interacciones']} interacciones, {ingesta['filas_por_seg']:.0f} filas/s")
+        api = asyncio.run(bench_endpoints(path, args.neo4j, args.requests, params.seed))
+        for name, r in api["endpoints"].items():
+            print(f"  {name:<26} p50 {r['p50_ms']:8.3f} ms   p99 {r['p99_ms']:8.3f} ms")
+
+    result = {
+        "meta": {
+            "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "dataset": args.dataset or {"generado": params.__dict__},
+            "requests": args.requests,
+            "batch_size": args.batch_size,
+        },
+        "ingesta": ingesta,
+        "api": api,
+    }
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"resultado -> {args.out}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = compare(base, result, args.tolerancia)
+        sys.exit(1 if regresiones else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# scripts/bench_validation.py
+# Registros/s validando interacciones: model_validate registro a registro contra el
+# TypeAdapter por lotes (1 proceso y N procesos).
+#
+#   python -m scripts.bench_validation --scale 50 --processes 4
+import argparse
+import time
+
+from ingest import RejectsFile, validate_records
+from ingest.validate import validate_chunk
+from schemas import Llamada, Mensaje, Pago
+from scripts.bench_stream_memory import load_sample, scaled
+
+MODELOS = {
+    "llamada_saliente": Llamada,
+    "llamada_entrante": Llamada,
+    "pago_recibido": Pago,
+    "email": Mensaje,
+    "sms": Mensaje,
+}
+
+
+def per_record(records):
+    for _, rec in records:
+        MODELOS[rec["tipo"]].model_validate(rec)
+
+
+def batched(records, chunk_size):
+    for n in range(0, len(records), chunk_size):
+        validate_chunk(records[n : n + chunk_size])
+
+
+def multiprocess(records, chunk_size, processes):
+    for _ in validate_records(iter(records), RejectsFile(None), chunk_size, processes):
+        pass
+
+
+def timed(fn, *args, repeat=3):
+    # Mejor de `repeat` corridas
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--scale", type=int, default=50, help="réplicas del sample (502 interacciones c/u)")
+    p.add_argument("--chunk-size", type=int, default=2000)
+    p.add_argument("--processes", type=int, default=4)
+    args = p.parse_args()
+
+    _, interacciones = scaled(load_sample(), args.scale)
+    records = [("interacciones", i) for i in interacciones]
+    n = len(records)
+
+    runs = [
+        ("model_validate por registro", timed(per_record, records)),
+        ("TypeAdapter por lotes", timed(batched, records, args.chunk_size)),
+        (
+            f"TypeAdapter por lotes x{args.processes} procesos",
+            timed(multiprocess, records, args.chunk_size, args.processes),
+        ),
+    ]
+    base = n / runs[0][1]
+    print(f"{n} interacciones")
+    for name, secs in runs:
+        rate = n / secs
+        print(f"{name:<40} {secs:8.2f}s {rate:>12.0f} reg/s {rate / base:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+# scripts/check_bulk.py
+# Paridad del export para neo4j-admin (ingest/bulk.py) con la ingesta transaccional
+# (BatchWriter), sobre un archivo con ids repetidos: copias corregidas de clientes e
+# interacciones más adelante en el archivo, y repeticiones exactas. Compara nodos,
+# propiedades y aristas sin los derivados que completa --post-import. Sale con
+# código 1 si algo difiere.
+#
+#   python -m scripts.check_bulk --duplicados 200
+#   # contra la base: cargar el archivo generado y comparar con lo que quedó en Neo4j
+#   python -m scripts.check_bulk --duplicados 200 --salida /tmp/dup.json
+#   python -m scripts.ingest_from_json /tmp/dup.json
+#   python -m scripts.check_bulk --dataset /tmp/dup.json --duplicados 0 --neo4j
+#
+# Sin --neo4j, el grafo esperado sale de pasar las sentencias de BatchWriter por
+# GrafoMerge, que aplica MERGE / SET como Cypher sobre un grafo en memoria. La regla
+# común es "el último registro de cada id gana". Cambiar en una copia el cliente, el
+# agente, el tipo o el resultado de una interacción (o el tipo de deuda de un
+# cliente) deja en la ingesta transaccional las aristas del registro anterior; el
+# export no las reproduce, por eso las copias de este script no cambian esos campos.
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Set, Tuple
+
+from ingest import BatchWriter, iter_records
+from ingest.batch import (
+    Q_AGENTES,
+    Q_ATENDIDA_POR,
+    Q_CLIENTES,
+    Q_INTERACCIONES,
+    Q_PAGOS,
+    Q_PAGOS_POSEE,
+    Q_PLANES,
+    Q_PROMESAS,
+)
+from ingest.bulk import AdminCsvExport
+from scripts.bench_stream_memory import SAMPLE
+from scripts.stub_session import StubResult
+
+Nodo = Tuple[str, str]
+Arista = Tuple[str, str, str, str, str]
+
+# Propiedades que escribe CUMPLIDA_POR (no están en el export, las pone --post-import)
+DERIVADOS_PROMESA = {"ventana_dias", "monto_en_ventana", "monto_max_en_ventana", "cumplida_acumulado",
+                     "cumplida_estricto"}
+ETIQUETAS = ("Cliente", "Deuda", "Agente", "Interaccion", "Promesa", "PlanRenegociacion")
+TIPOS = ("POSEE", "TUVO", "ATENDIDA_POR", "RESULTA_EN", "APLICADO_A", "SIGUE_A")
+
+
+class Grafo:
+    def __init__(self):
+        self.nodos: Dict[Nodo, Dict[str, Any]] = {}
+        self.aristas: Set[Arista] = set()
+
+
+class GrafoMerge(Grafo):
+    """Sesión que aplica las sentencias de BatchWriter a un grafo en memoria.
+
+    MERGE por id, `SET x.p = v` / `SET x += {...}` con null como borrado, y las
+    aristas sólo si los extremos existen (MATCH). Los derivados (CUMPLIDA_POR,
+    rollups) se ignoran; SIGUE_A se arma al final con `cadenas`.
+    """
+
+    def _merge(self, label: str, id: str) -> Dict[str, Any]:
+        return self.nodos.setdefault((label, id), {})
+
+    @staticmethod
+    def _set(props: Dict[str, Any], values: Dict[str, Any]):
+        for k, v in values.items():
+            if v is None:
+                props.pop(k, None)
+            else:
+                props[k] = v
+
+    def _arista(self, tipo: str, a: Nodo, b: Nodo):
+        if a in self.nodos and b in self.nodos:
+            self.aristas.add((tipo, a[0], a[1], b[0], b[1]))
+
+    def _unica(self, tipo: str, a: Nodo, b: Nodo) -> List[Nodo]:
+        # MERGE de la arista y borrado de las del mismo tipo desde `a` hacia otro
+        # nodo; devuelve los nodos que perdieron la arista
+        if a not in self.nodos or b not in self.nodos:
+            return []
+        viejas = {x for x in self.aristas if x[:3] == (tipo, *a) and x[3:] != b}
+        self.aristas -= viejas
+        self._arista(tipo, a, b)
+        return [x[3:] for x in viejas]
+
+    def _borrar(self, nodo: Nodo):
+        # DETACH DELETE
+        self.nodos.pop(nodo, None)
+        self.aristas = {x for x in self.aristas if x[1:3] != nodo and x[3:] != nodo}
+
+    def run(self, query, **params):
+        rows = params.get("rows") or []
+        if query == Q_CLIENTES:
+            for r in rows:
+                self._set(self._merge("Cliente", r["id"]), {
+                    "nombre": r["nombre"], "telefono": r["telefono"], "tipo_deuda": r["tipo_deuda"],
+                    "monto_deuda_inicial": r["monto"], "fecha_prestamo": r["fecha"], "huella": r["huella"],
+                })
+                d = r["deuda"]
+                self._set(self._merge("Deuda", d["id"]), {"tipo": d["tipo"], "monto_inicial": d["monto_inicial"]})
+                for otra in self._unica("POSEE", ("Cliente", r["id"]), ("Deuda", d["id"])):
+                    if not any(x[0] == "POSEE" and x[3:] == otra for x in self.aristas):
+                        self._borrar(otra)
+        elif query == Q_AGENTES:
+            for aid in params["ids"]:
+                self._merge("Agente", aid)
+        elif query == Q_INTERACCIONES:
+            for r in rows:
+                self._set(self._merge("Interaccion", r["id"]), r["props"])
+                self._arista("TUVO", ("Cliente", r["cliente_id"]), ("Interaccion", r["id"]))
+        elif query == Q_ATENDIDA_POR:
+            for r in rows:
+                self._arista("ATENDIDA_POR", ("Interaccion", r["id"]), ("Agente", r["agente_id"]))
+        elif query in (Q_PROMESAS, Q_PLANES):
+            label, key = ("Promesa", "promesa") if query == Q_PROMESAS else ("PlanRenegociacion", "plan")
+            for r in rows:
+                values = dict(r[key])
+                self._set(self._merge(label, values.pop("id")), values)
+                self._arista("RESULTA_EN", ("Interaccion", r["id"]), (label, r[key]["id"]))
+        elif query == Q_PAGOS:
+            for r in rows:
+                self._unica("APLICADO_A", ("Interaccion", r["id"]), ("Deuda", r["deuda_id"]))
+        elif query == Q_PAGOS_POSEE:
+            for r in rows:
+                for tipo, _, cid, _, did in list(self.aristas):
+                    if tipo == "POSEE" and cid == r["cliente_id"]:
+                        self._unica("APLICADO_A", ("Interaccion", r["id"]), ("Deuda", did))
+        return StubResult()
+
+    def execute_write(self, fn, *args, **kwargs):
+        return fn(self, *args, **kwargs)
+
+    def cadenas(self):
+        # Lo que mantiene chain.link: por cliente, sus interacciones en orden (timestamp, id)
+        por_cliente: Dict[str, List[Tuple[datetime, str]]] = {}
+        for tipo, _, cid, _, iid in self.aristas:
+            ts = self.nodos[("Interaccion", iid)].get("timestamp") if tipo == "TUVO" else None
+            if isinstance(ts, datetime):
+                por_cliente.setdefault(cid, []).append((ts, iid))
+        for evs in por_cliente.values():
+            evs.sort()
+            for (_, a), (_, b) in zip(evs, evs[1:]):
+                self.aristas.add(("SIGUE_A", "Interaccion", a, "Interaccion", b))
+
+
+def transaccional(path: str) -> Grafo:
+    # Como ingest_from_json en modo memoria: clientes, agentes de las llamadas e interacciones
+    clientes, interacciones = [], []
+    for key, rec in iter_records(path):
+        (clientes if key == "clientes" else interacciones).append(rec)
+    agentes = sorted({i["agente_id"] for i in interacciones
+                      if str(i.get("tipo", "")).startswith("llamada") and i.get("agente_id")})
+    g = GrafoMerge()
+    w = BatchWriter(g)
+    deudas = w.clientes(clientes, {})
+    w.agentes(agentes)
+    w.interacciones(interacciones, deudas)
+    g.cadenas()
+    return g
+
+
+_CONVERSION = {
+    "long": int,
+    "double": float,
+    "boolean": lambda v: v == "true",
+    "datetime": datetime.fromisoformat,
+    "string": str,
+}
+
+
+def _tabla(path: str, header_path: str) -> List[Tuple[List[str], Dict[str, Any]]]:
+    # Filas del CSV: (valores de las columnas clave, propiedades tipadas por la cabecera)
+    with open(header_path, encoding="utf-8", newline="") as f:
+        header = next(csv.reader(f))
+    claves = [h for h in header if h.startswith(":") or ":ID(" in h]
+    out = []
+    with open(path, encoding="utf-8", newline="") as f:
+        for fila in csv.reader(f):
+            ks, props = [], {}
+            for h, v in zip(header, fila):
+                if h in claves:
+                    ks.append(v)
+                elif v != "":
+                    name, tipo = h.split(":")
+                    props[name] = _CONVERSION[tipo](v)
+            out.append((ks, props))
+    return out
+
+
+def exportado(path: str, directory: str) -> Tuple[Grafo, AdminCsvExport]:
+    out = AdminCsvExport(directory)
+    out.stream(lambda: iter_records(path))
+    out.close()
+    g = Grafo()
+    for label, t in out.nodes.items():
+        for (id,), props in _tabla(t.data_path, t.header_path):
+            g.nodos[(label, id)] = props
+    for tipo, t in out.rels:
+        a, b = (k[k.index("(") + 1:-1] for k in t.keys)
+        for (ida, idb), _ in _tabla(t.data_path, t.header_path):
+            g.aristas.add((tipo, a, ida, b, idb))
+    return g, out
+
+
+def en_neo4j() -> Grafo:
+    from scripts.ingest_from_json import NEO4J_DB, open_driver
+
+    g = Grafo()
+    driver = open_driver()
+    try:
+        with driver.session(database=NEO4J_DB) as s:
+            for r in s.run("MATCH (n) WHERE any(l IN labels(n) WHERE l IN $etiquetas) "
+                           "RETURN [l IN labels(n) WHERE l IN $etiquetas][0] AS label, properties(n) AS props",
+                           etiquetas=list(ETIQUETAS)):
+                props = dict(r["props"])
+                g.nodos[(r["label"], props.pop("id"))] = props
+            for r in s.run("MATCH (a)-[e]->(b) WHERE type(e) IN $tipos "
+                           "RETURN type(e) AS tipo, labels(a)[0] AS la, a.id AS a, labels(b)[0] AS lb, b.id AS b",
+                           tipos=list(TIPOS)):
+                g.aristas.add((r["tipo"], r["la"], r["a"], r["lb"], r["b"]))
+    finally:
+        driver.close()
+    return g
+
+
+def valor(v: Any) -> Any:
+    # Números como float (neo4j-admin guarda como double las columnas mixtas) e
+    # instantes en UTC
+    if hasattr(v, "to_native"):
+        v = v.to_native()
+    if isinstance(v, bool) or not isinstance(v, (int, float, datetime)):
+        return v
+    if isinstance(v, datetime):
+        return v.astimezone(timezone.utc).isoformat()
+    return float(v)
+
+
+def props(label: str, p: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        k: valor(v) for k, v in p.items()
+        if v not in (None, "") and not (label == "Promesa" and k in DERIVADOS_PROMESA)
+    }
+
+
+def diferencias(esperado: Grafo, obtenido: Grafo) -> List[str]:
+    diffs = []
+    for key in sorted(set(esperado.nodos) | set(obtenido.nodos)):
+        a, b = esperado.nodos.get(key), obtenido.nodos.get(key)
+        if a is None or b is None:
+            diffs.append(f"nodo {key}: {'sólo en el export' if a is None else 'falta en el export'}")
+        elif props(key[0], a) != props(key[0], b):
+            diffs.append(f"nodo {key}: transaccional={props(key[0], a)} export={props(key[0], b)}")
+    for e in sorted(esperado.aristas - obtenido.aristas):
+        diffs.append(f"arista {e}: falta en el export")
+    for e in sorted(obtenido.aristas - esperado.aristas):
+        diffs.append(f"arista {e}: sólo en el export")
+    return diffs
+
+
+def con_duplicados(path: str, out_path: str, n: int, seed: int) -> Tuple[int, int]:
+    # Copias corregidas (mismos cliente / agente / tipo / resultado) y repeticiones
+    # exactas, siempre después del original; los clientes siguen antes que las
+    # interacciones
+    rng = random.Random(seed)
+    clientes, interacciones = [], []
+    for key, rec in iter_records(path):
+        (clientes if key == "clientes" else interacciones).append(rec)
+
+    def corregir(rec: Dict[str, Any]) -> Dict[str, Any]:
+        if rng.random() < 0.3:
+            return dict(rec)
+        c = dict(rec)
+        if "nombre" in c:
+            c["nombre"] = f"{c['nombre']} (corregido)"
+            c["monto_deuda_inicial"] = round(float(c.get("monto_deuda_inicial") or 0) * 1.1, 2)
+        if c.get("timestamp"):
+            ts = datetime.fromisoformat(c["timestamp"].replace("Z", "+00:00"))
+            c["timestamp"] = (ts + timedelta(hours=rng.randint(-72, 72))).isoformat()
+        if "duracion_segundos" in c:
+            c["duracion_segundos"] = int(c["duracion_segundos"] or 0) + 30
+        if "monto" in c:
+            c["monto"] = round(float(c["monto"] or 0) + 10, 2)
+        if "monto_prometido" in c:
+            c["monto_prometido"] = round(float(c["monto_prometido"] or 0) + 5, 2)
+        return c
+
+    dup_c = [corregir(rng.choice(clientes)) for _ in range(n // 4)]
+    salida_i = list(interacciones)
+    for _ in range(n - len(dup_c)):
+        k = rng.randrange(len(interacciones))
+        pos = rng.randint(salida_i.index(interacciones[k]) + 1, len(salida_i))
+        salida_i.insert(pos, corregir(interacciones[k]))
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"metadata": {}, "clientes": clientes + dup_c, "interacciones": salida_i}, f)
+    return len(dup_c), n - len(dup_c)
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--dataset", default=SAMPLE)
+    p.add_argument("--duplicados", type=int, default=200, help="copias a agregar (0 = usar el archivo tal cual)")
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--salida", default=None, help="guardar el archivo con duplicados (para cargarlo en Neo4j)")
+    p.add_argument("--neo4j", action="store_true", help="comparar con el grafo cargado en NEO4J_URI")
+    p.add_argument("--mostrar", type=int, default=10, help="diferencias a imprimir")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.dataset
+        if args.duplicados:
+            path = args.salida or os.path.join(tmp, "duplicados.json")
+            nc, ni = con_duplicados(args.dataset, path, args.duplicados, args.seed)
+            print(f"{path}: {nc} clientes y {ni} interacciones repetidos")
+        obtenido, out = exportado(path, os.path.join(tmp, "import"))
+        esperado = en_neo4j() if args.neo4j else transaccional(path)
+
+    print(f"export: {sum(t.rows for t in out.nodes.values())} nodos, "
+          f"{sum(t.rows for _, t in out.rels)} relaciones, {out.duplicados} repetidos omitidos")
+    diffs = diferencias(esperado, obtenido)
+    for d in diffs[: args.mostrar]:
+        print(f"DIFERENCIA {d}")
+    fuente = "Neo4j" if args.neo4j else "ingesta transaccional (GrafoMerge)"
+    print(f"{len(esperado.nodos)} nodos y {len(esperado.aristas)} aristas en {fuente}, {len(diffs)} diferencias.")
+    sys.exit(1 if diffs else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+# scripts/check_columnar.py
+# Paridad del backend columnar (memoria) con las consultas Cypher, sobre una base
+# cargada con el mismo archivo. Sale con código 1 si alguna respuesta difiere.
+#
+# Además, en cada backend, las páginas (limit + cursor, como las recorre un cliente
+# del API) y el cuerpo NDJSON concatenados deben dar el resultado completo.
+#
+#   python -m scripts.ingest_from_json ./interacciones_clientes_2.json
+#   python -m scripts.check_columnar ./interacciones_clientes_2.json
+#   python -m scripts.check_columnar ./interacciones_clientes_2.json --solo-memoria
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from neo4j.time import Date, DateTime, Duration, Time
+
+from columnar import ColumnarBackend, ColumnarStore, load
+from core.pagination import decode_cursor, encode_cursor
+from core.serialization import dumps
+from router.analytics import (
+    ORDENES_EFECTIVIDAD,
+    Q_VENTANA_MATERIALIZADA,
+    cypher_query,
+    desde_cursor,
+    ndjson_response,
+    ventana_unica,
+)
+from scripts.ingest_from_json import NEO4J_DB, open_driver
+
+Caso = Tuple[str, Dict[str, Any]]
+# Endpoint, parámetros sin página y tamaño de página
+Paginado = Tuple[str, Dict[str, Any], int]
+Fetch = Callable[[str, Dict[str, Any]], List[Dict[str, Any]]]
+
+
+def casos(store: ColumnarStore) -> Iterator[Caso]:
+    for cid in sorted(store.rango_cliente):
+        yield "cliente_timeline", {"id": cid, "after_ts": None, "after_id": None, "limit": None}
+    yield "cliente_timeline", {"id": "cliente_inexistente", "after_ts": None, "after_id": None, "limit": None}
+    for orden in ORDENES_EFECTIVIDAD:
+        yield "agentes_efectividad", {"orden": orden, "top_k": 1000, "min_llamadas": 1}
+    for aid in sorted(store.rango_agente):
+        yield "agentes_efectividad", {"ids": [aid], "orden": "total_llamadas", "top_k": 1, "min_llamadas": 1}
+    for hasta in ("2025-06-01T00:00:00Z", "2025-07-15T12:00:00Z", "2025-09-01T00:00:00Z"):
+        for ventana in (7, 14, 30):
+            for modo in ("acumulado", "estricto"):
+                yield "promesas_incumplidas", {
+                    "hasta": hasta,
+                    "ventanaDias": ventana,
+                    "modo": modo,
+                    "desde": None,
+                    "after_dias": None,
+                    "after_id": None,
+                    "limit": None,
+                }
+    for hasta in ("2025-06-01T00:00:00Z", "2025-09-01T00:00:00Z"):
+        corte = datetime.fromisoformat(hasta.replace("Z", "+00:00"))
+        for periodo in (7, 30):
+            for ventana in (7, 14):
+                for modo in ("acumulado", "estricto"):
+                    yield "kpis", {
+                        "hasta": hasta,
+                        "desde": (corte - timedelta(days=periodo)).isoformat(),
+                        "desde_anterior": (corte - timedelta(days=2 * periodo)).isoformat(),
+                        "ventanaDias": ventana,
+                        "modo": modo,
+                    }
+    for desde, hasta in (("2025-05-01", "2025-09-30"), ("2025-06-10", "2025-06-20"), ("2030-01-01", "2030-01-31")):
+        for bucket in ("dia", "semana", "mes"):
+            yield "series", {"desde": desde, "hasta": hasta, "bucket": bucket}
+    for alpha in (0.0, 0.5, 1.0):
+        for minimo in (1, 10):
+            yield "mejores_horarios", {"min_llamadas": minimo, "top_k": 1000, "alpha": alpha}
+
+
+def paginados(store: ColumnarStore) -> Iterator[Paginado]:
+    # Los clientes con más interacciones (empates de timestamp incluidos) y promesas
+    # con páginas de 1 fila, de tamaño intermedio y mayores que el resultado
+    largos = sorted(store.rango_cliente, key=lambda c: store.rango_cliente[c][0] - store.rango_cliente[c][1])
+    for cid in largos[:5]:
+        for limit in (1, 4, 1000):
+            yield "cliente_timeline", {"id": cid, "after_ts": None, "after_id": None}, limit
+    for hasta in ("2025-07-15T12:00:00+00:00", "2025-09-01T00:00:00+00:00"):
+        for modo in ("acumulado", "estricto"):
+            for limit in (1, 7, 1000):
+                yield "promesas_incumplidas", {
+                    "hasta": hasta,
+                    "ventanaDias": 14,
+                    "modo": modo,
+                    "desde": None,
+                    "after_dias": None,
+                    "after_id": None,
+                }, limit
+
+
+def siguiente(name: str, params: Dict[str, Any], fila: Dict[str, Any]) -> Dict[str, Any]:
+    # Parámetros de la página siguiente, como los arma el router a partir del cursor
+    # que anuncia (encode_cursor de la clave de la última fila)
+    if name == "cliente_timeline":
+        cursor = encode_cursor(fila["timestamp"], fila["interaccion_id"])
+        after_ts, after_id = decode_cursor(cursor, (str, str))
+        return dict(params, after_ts=after_ts, after_id=after_id)
+    cursor = encode_cursor(fila["dias_vencida"], fila["promesa_id"])
+    after_dias, after_id = decode_cursor(cursor, (int, str))
+    hasta = datetime.fromisoformat(params["hasta"])
+    return dict(params, after_dias=after_dias, after_id=after_id, desde=desde_cursor(hasta, after_dias))
+
+
+def paginar(fetch: Fetch, name: str, params: Dict[str, Any], limit: int, maximo: int) -> List[Dict[str, Any]]:
+    # Concatena páginas hasta una incompleta (el API sólo anuncia cursor con página
+    # llena); `maximo` corta un cursor que no avanza
+    filas: List[Dict[str, Any]] = []
+    params = dict(params, limit=limit)
+    for _ in range(maximo):
+        pagina = fetch(name, params)
+        filas.extend(pagina)
+        if len(pagina) < limit:
+            break
+        params = siguiente(name, params, pagina[-1])
+    return filas
+
+
+async def _filas(rows: Iterable[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    for row in rows:
+        yield row
+
+
+async def _cuerpo(rows: AsyncIterator[Dict[str, Any]]) -> bytes:
+    response = await ndjson_response(rows)
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+def ndjson(rows: AsyncIterator[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Cuerpo NDJSON del router, una fila por línea
+    return [json.loads(line) for line in asyncio.run(_cuerpo(rows)).splitlines()]
+
+
+def as_json(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Filas tal como salen en el cuerpo JSON de la respuesta
+    return json.loads(dumps(rows))
+
+
+def to_native(value: Any) -> Any:
+    # Tipos temporales de Neo4j -> tipos de Python, para comparar filas (el API no
+    # lo necesita: core.serialization los serializa directo)
+    if isinstance(value, (Date, DateTime, Time)):
+        return value.to_native()
+    if isinstance(value, Duration):
+        return str(value)
+    if isinstance(value, dict):
+        return {k: to_native(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_native(v) for v in value]
+    return value
+
+
+def normalize(value: Any) -> Any:
+    # Instantes en UTC, floats redondeados y listas sin orden definido ordenadas
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat()
+    if isinstance(value, float):
+        return round(value, 9)
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [normalize(v) for v in value]
+    return value
+
+
+def sin_orden(name: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    for r in rows:
+        if "por_horario" in r:
+            r["por_horario"].sort(key=lambda h: (str(h["dia_semana"]), str(h["hora_del_dia"])))
+        if "pagos_que_cumplen" in r:
+            r["pagos_que_cumplen"].sort(key=lambda p: p["id"])
+    if name == "mejores_horarios":
+        # Empates de score sin desempate en Cypher
+        rows.sort(key=lambda r: (r["dia"], r["hora"]))
+    return rows
+
+
+def check_paginas(
+    backend: str, todos: List[Paginado], fetch: Fetch, stream: Fetch
+) -> List[Tuple[str, Dict[str, Any], Any, Any]]:
+    # Por caso: páginas JSON y páginas NDJSON concatenadas contra el resultado completo
+    diffs = []
+    for name, params, limit in todos:
+        completo = as_json(fetch(name, dict(params, limit=None)))
+        maximo = len(completo) // limit + 2
+        paginas = {
+            "json": as_json(paginar(fetch, name, params, limit, maximo)),
+            "ndjson": paginar(stream, name, params, limit, maximo),
+            "ndjson completo": stream(name, dict(params, limit=None)),
+        }
+        esperado = normalize(sin_orden(name, completo))
+        for modo, filas in paginas.items():
+            filas = normalize(sin_orden(name, filas))
+            if filas != esperado:
+                diffs.append((f"{name} ({backend}, {modo}, limit={limit})", params, filas, esperado))
+    return diffs
+
+
+def print_diffs(diffs: List[Tuple[str, Dict[str, Any], Any, Any]], mostrar: int, a: str, b: str):
+    for name, params, x, y in diffs[:mostrar]:
+        print(f"DIFERENCIA {name} {params}")
+        print(f"  {a:<9} {x[:3]}")
+        print(f"  {b:<9} {y[:3]}")
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("path", help="archivo cargado en Neo4j (JSON, NDJSON o .gz)")
+    p.add_argument("--solo-memoria", action="store_true", help="sólo el backend columnar (sin Neo4j)")
+    p.add_argument("--mostrar", type=int, default=5, help="diferencias a imprimir")
+    args = p.parse_args()
+
+    t0 = time.perf_counter()
+    store = load(args.path)
+    print(f"columnar: {len(store)} interacciones cargadas en {time.perf_counter() - t0:.2f}s")
+
+    todos = list(casos(store))
+    tiempos: Dict[str, List[float]] = {}
+    memoria = []
+    for name, params in todos:
+        t0 = time.perf_counter()
+        memoria.append(getattr(store, name)(params))
+        tiempos.setdefault(name, []).append(time.perf_counter() - t0)
+    for name, ts in tiempos.items():
+        print(f"  {name:<22} {len(ts):>4} consultas  media {sum(ts) / len(ts) * 1000:8.3f} ms")
+
+    # Páginas del backend columnar: el mismo stream que usa el router
+    columnar = ColumnarBackend(args.path)
+    columnar.store = store
+    pags = list(paginados(store))
+    paginas = check_paginas(
+        "memoria",
+        pags,
+        lambda name, params: getattr(store, name)(params),
+        lambda name, params: ndjson(columnar.stream(name, params)),
+    )
+
+    diffs = []
+    if not args.solo_memoria:
+        driver = open_driver()
+        try:
+            with driver.session(database=NEO4J_DB) as s:
+                # Misma elección de consulta que el API (derivados sólo con la ventana guardada)
+                ventana = ventana_unica(s.run(Q_VENTANA_MATERIALIZADA).single()["ventanas"])
+
+                def cypher(name: str, params: Dict[str, Any], nativo: bool = True) -> List[Dict[str, Any]]:
+                    rows = [r.data() for r in s.run(cypher_query(name, params, ventana), **params)]
+                    return [to_native(r) for r in rows] if nativo else rows
+
+                for (name, params), rows in zip(todos, memoria):
+                    a = normalize(sin_orden(name, cypher(name, params)))
+                    b = normalize(sin_orden(name, rows))
+                    if a != b:
+                        diffs.append((name, params, a, b))
+                # NDJSON con las filas del driver sin convertir, como las serializa el router
+                paginas += check_paginas(
+                    "cypher",
+                    pags,
+                    cypher,
+                    lambda name, params: ndjson(_filas(cypher(name, params, nativo=False))),
+                )
+        finally:
+            driver.close()
+
+        print_diffs(diffs, args.mostrar, "cypher:", "columnar:")
+        print(f"{len(todos)} casos, {len(diffs)} diferencias.")
+
+    print_diffs(paginas, args.mostrar, "páginas:", "completo:")
+    backends = "memoria" if args.solo_memoria else "memoria y cypher"
+    print(f"{len(pags)} casos paginados ({backends}; JSON y NDJSON), {len(paginas)} diferencias.")
+    sys.exit(1 if diffs or paginas else 0)
+
+
+if __name__ == "__main__":
+    main()
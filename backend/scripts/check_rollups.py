@@ -0,0 +1,61 @@
+# scripts/check_rollups.py
+# Compara los rollups KpiHorario y KpiDiario con el scan completo de interacciones.
+#
+#   python -m scripts.check_rollups            # sale con código 1 si difieren
+#   python -m scripts.check_rollups --rebuild  # recalcula los rollups desde el scan
+#                                              # y CUMPLIDA_POR de todas las promesas
+import argparse
+import sys
+
+from core.cache import Q_BUMP_DATASET_VERSION
+from ingest import chunked, cumplimiento, rollups
+from scripts.ingest_from_json import NEO4J_DB, open_driver
+
+
+def rebuild(s):
+    # Derivados sobre todo el grafo: KpiHorario y KpiDiario desde el scan, CUMPLIDA_POR
+    # de todas las promesas y un bump de versión al final (invalida el cache del API)
+    def kpi(tx):
+        for q in rollups.Q_KPI_HORARIO_REBUILD + rollups.Q_KPI_DIARIO_REBUILD:
+            tx.run(q).consume()
+
+    s.execute_write(kpi)
+    print("Rollups KpiHorario y KpiDiario recalculados.")
+
+    ids = [r["id"] for r in s.run(cumplimiento.Q_CLIENTES_CON_PROMESAS)]
+    for chunk in chunked(ids, 500):
+        s.execute_write(cumplimiento.link, chunk)
+    s.execute_write(lambda tx: tx.run(Q_BUMP_DATASET_VERSION).consume())
+    print(f"CUMPLIDA_POR recalculada para {len(ids)} clientes.")
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--rebuild", action="store_true", help="recalcular el rollup antes de comparar")
+    args = p.parse_args()
+
+    driver = open_driver()
+    try:
+        with driver.session(database=NEO4J_DB) as s:
+            if args.rebuild:
+                rebuild(s)
+            scan = s.run(rollups.Q_KPI_HORARIO_SCAN).data()
+            rollup = s.run(rollups.Q_KPI_HORARIO_READ).data()
+            scan_diario = s.run(rollups.Q_KPI_DIARIO_SCAN).data()
+            rollup_diario = s.run(rollups.Q_KPI_DIARIO_READ).data()
+    finally:
+        driver.close()
+
+    diffs = rollups.compare(scan, rollup)
+    for line in diffs:
+        print(line)
+    print(f"KpiHorario: {len(rollup)} celdas, scan: {len(scan)} celdas, {len(diffs)} diferencias.")
+    diffs_diario = rollups.compare(scan_diario, rollup_diario, ("dia",), rollups.CAMPOS_DIARIO)
+    for line in diffs_diario:
+        print(line)
+    print(f"KpiDiario: {len(rollup_diario)} días, scan: {len(scan_diario)} días, {len(diffs_diario)} diferencias.")
+    sys.exit(1 if diffs or diffs_diario else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,15 @@
 # scripts/clear_group.py
 import argparse
-from graphiti_client import GraphitiClient
+from graphiti import GraphitiClient
 
 
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--group", required=True, help="group_id a borrar")
     args = p.parse_args()
-    cli = GraphitiClient()
-    print(cli.healthcheck())
-    cli.clear_group(args.group)
+    with GraphitiClient() as cli:
+        print(cli.healthcheck())
+        cli.clear_group(args.group)
     print(f"Grupo '{args.group}' borrado.")
 
 
@@ -0,0 +1,79 @@
+# scripts/export_admin_csv.py
+# Carga inicial / reconstrucción completa con el importador offline de Neo4j:
+# convierte el export a CSV de nodos y relaciones (mismo grafo que ingest_from_json)
+# e imprime el comando de neo4j-admin. Con la base detenida:
+#
+#   python -m scripts.export_admin_csv ./interacciones_clientes_2.json ./import
+#   neo4j-admin database import full neo4j --overwrite-destination ...   # el comando impreso
+#   # con la base levantada: constraints, KpiHorario, KpiDiario, CUMPLIDA_POR y versión
+#   python -m scripts.export_admin_csv --post-import
+import argparse
+import time
+
+from ingest import BatchWriter, RejectsFile, iter_records, validate_records
+from ingest.bulk import AdminCsvExport
+from scripts.check_rollups import rebuild
+from scripts.ingest_from_json import NEO4J_DB, open_driver
+
+
+def export(path, directory, rejects=None, processes=1):
+    t0 = time.perf_counter()
+    # El export lee el archivo dos veces (ver AdminCsvExport.stream); la primera
+    # pasada valida igual pero sólo la segunda escribe los rechazados
+    sinks = iter([RejectsFile(None), rejects])
+
+    def records():
+        r = iter_records(path)
+        return r if rejects is None else validate_records(r, next(sinks), processes=processes)
+
+    out = AdminCsvExport(directory)
+    out.stream(records)
+    out.close()
+
+    for line in out.summary():
+        print(line)
+    print(f"CSV escritos en {directory} en {time.perf_counter() - t0:.2f}s.")
+    if rejects is not None and rejects.count:
+        print(f"{rejects.count} registros rechazados -> {rejects.path}")
+    print()
+    print(out.command(NEO4J_DB))
+
+
+def post_import():
+    driver = open_driver()
+    try:
+        with driver.session(database=NEO4J_DB) as s:
+            w = BatchWriter(s)
+            w.constraints()
+            print(f"{w.stats['constraints'].statements} constraints / índices creados.")
+            rebuild(s)
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("path", nargs="?", help="ruta al export (JSON, NDJSON, .gz)")
+    p.add_argument("directory", nargs="?", default="./import", help="destino de los CSV (default ./import)")
+    p.add_argument(
+        "--post-import",
+        action="store_true",
+        help="después de neo4j-admin: constraints, rollups, CUMPLIDA_POR y versión",
+    )
+    p.add_argument(
+        "--validate",
+        action="store_true",
+        help="validar cada registro con los modelos de schemas antes de escribir",
+    )
+    p.add_argument("--rejects", default=None, help="NDJSON de registros inválidos (default <ruta>.rejects.ndjson)")
+    p.add_argument("--validate-processes", type=int, default=1, help="procesos para validar en paralelo (default 1)")
+    args = p.parse_args()
+    if args.post_import:
+        post_import()
+    elif args.path is None:
+        p.error("falta la ruta al export (o --post-import)")
+    elif args.validate:
+        with RejectsFile(args.rejects or f"{args.path}.rejects.ndjson") as rejects:
+            export(args.path, args.directory, rejects, args.validate_processes)
+    else:
+        export(args.path, args.directory)
@@ -0,0 +1,222 @@
+# scripts/generate_dataset.py
+# Generador sintético con semilla, con el esquema de interacciones_clientes_2.json.
+# La misma semilla y los mismos parámetros producen el mismo archivo byte a byte.
+#
+#   python -m scripts.generate_dataset ./sintetico.json --clientes 10000 --seed 7
+#   python -m scripts.generate_dataset ./sintetico.ndjson.gz --clientes 100000 \
+#       --interacciones-por-cliente 20 --agentes 200 --p-promesa 0.3 --p-cumple 0.5
+#
+# Escribe cliente por cliente sin materializar el dataset (memoria constante).
+# JSON del export o NDJSON según la extensión (.ndjson/.jsonl), con gzip si termina en .gz.
+import argparse
+import gzip
+import io
+import json
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, Tuple
+
+from ingest.reader import is_ndjson
+
+TIPOS_DEUDA = ("tarjeta_credito", "hipoteca", "auto", "prestamo_personal")
+METODOS_PAGO = ("transferencia", "tarjeta", "efectivo")
+# Resultados de llamada distintos de promesa / pago inmediato / renegociación
+OTROS_RESULTADOS = ("sin_respuesta", "se_niega_pagar", "disputa")
+SENTIMIENTOS = ("cooperativo", "neutral", "frustrado", "hostil")
+
+
+@dataclass
+class Params:
+    clientes: int = 50
+    interacciones_por_cliente: float = 10.0
+    agentes: int = 10
+    # Proporciones sobre las llamadas con respuesta
+    p_promesa: float = 0.25
+    p_pago_inmediato: float = 0.15
+    p_renegociacion: float = 0.15
+    # Probabilidad de que una promesa tenga pagos en su ventana, y de que cubran el monto
+    p_cumple: float = 0.4
+    # Pagos espontáneos (sin promesa) por interacción
+    p_pago: float = 0.08
+    p_sin_respuesta: float = 0.25
+    dias: int = 90
+    inicio: str = "2025-05-17T00:00:00+00:00"
+    seed: int = 42
+
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _hora_habil(rng: random.Random, dia: datetime) -> datetime:
+    # Horario con sesgo a horas hábiles (8-20), para que mejores-horarios tenga forma
+    hora = min(23, max(0, int(rng.gauss(13, 3))))
+    return dia.replace(hour=hora, minute=rng.randrange(60), second=rng.randrange(60),
+                       microsecond=rng.randrange(1_000_000))
+
+
+def generate(p: Params) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Itera (clave, registro) como iter_records: todos los clientes y después,
+    cliente por cliente, sus interacciones ordenadas por timestamp."""
+    rng = random.Random(p.seed)
+    inicio = datetime.fromisoformat(p.inicio).astimezone(timezone.utc)
+    ancho = len(str(max(p.clientes - 1, 1)))
+
+    def cliente_id(k: int) -> str:
+        return f"cliente_{k:0{ancho}d}"
+
+    montos = []
+    for k in range(p.clientes):
+        monto = rng.randrange(500, 20000)
+        montos.append(monto)
+        yield "clientes", {
+            "id": cliente_id(k),
+            "nombre": f"Cliente {k + 1}",
+            "telefono": f"+507 6{rng.randrange(100, 999)}-{rng.randrange(1000, 9999)}",
+            "monto_deuda_inicial": monto,
+            "fecha_prestamo": (inicio - timedelta(days=rng.randrange(30, 720))).date().isoformat(),
+            "tipo_deuda": rng.choice(TIPOS_DEUDA),
+        }
+
+    seq = 0
+    for k in range(p.clientes):
+        cid = cliente_id(k)
+        n = max(1, int(rng.expovariate(1 / p.interacciones_por_cliente)))
+        eventos = []
+        for _ in range(n):
+            dia = inicio + timedelta(days=rng.randrange(p.dias))
+            ts = _hora_habil(rng, dia)
+            r = rng.random()
+            if r < p.p_pago:
+                eventos.append((ts, {
+                    "tipo": "pago_recibido",
+                    "monto": rng.randrange(50, max(51, montos[k] // 4)),
+                    "metodo_pago": rng.choice(METODOS_PAGO),
+                    "pago_completo": rng.random() < 0.2,
+                }))
+            elif r < 0.75:
+                eventos.append((ts, _llamada(rng, p, montos[k], ts, eventos)))
+            else:
+                eventos.append((ts, {"tipo": rng.choice(("email", "email", "sms"))}))
+        eventos.sort(key=lambda e: e[0])
+        for ts, ev in eventos:
+            seq += 1
+            yield "interacciones", dict(
+                {"id": f"int_{p.seed:x}_{seq:08x}", "cliente_id": cid, "timestamp": _iso(ts)}, **ev
+            )
+
+
+def _llamada(rng: random.Random, p: Params, monto_deuda: int, ts: datetime, eventos) -> Dict[str, Any]:
+    llamada: Dict[str, Any] = {
+        "tipo": "llamada_saliente" if rng.random() < 0.8 else "llamada_entrante",
+        "duracion_segundos": rng.randrange(30, 900),
+        "agente_id": f"agente_{rng.randrange(p.agentes) + 1:03d}",
+    }
+    if rng.random() < p.p_sin_respuesta:
+        llamada.update(resultado="sin_respuesta", sentimiento="n/a")
+        return llamada
+    llamada["sentimiento"] = rng.choice(SENTIMIENTOS)
+    r = rng.random()
+    if r < p.p_promesa:
+        monto = rng.randrange(100, max(101, monto_deuda // 2))
+        fecha = (ts + timedelta(days=rng.randrange(3, 15))).replace(hour=0, minute=0, second=0, microsecond=0)
+        llamada.update(resultado="promesa_pago", monto_prometido=monto, fecha_promesa=fecha.date().isoformat())
+        if rng.random() < p.p_cumple:
+            # Uno o dos pagos dentro de la ventana de 14 días; a veces no alcanzan el monto
+            cubre = rng.random() < 0.7
+            partes = 1 if rng.random() < 0.6 else 2
+            total = monto if cubre else max(1, monto // 2)
+            for parte in range(partes):
+                eventos.append((fecha + timedelta(days=rng.randrange(0, 14), hours=rng.randrange(8, 20)), {
+                    "tipo": "pago_recibido",
+                    "monto": total // partes + (total % partes if parte == 0 else 0),
+                    "metodo_pago": rng.choice(METODOS_PAGO),
+                    "pago_completo": False,
+                }))
+    elif r < p.p_promesa + p.p_pago_inmediato:
+        llamada["resultado"] = "pago_inmediato"
+    elif r < p.p_promesa + p.p_pago_inmediato + p.p_renegociacion:
+        cuotas = rng.randrange(3, 13)
+        llamada.update(
+            resultado="renegociacion",
+            nuevo_plan_pago={"cuotas": cuotas, "monto_mensual": max(1, monto_deuda // cuotas)},
+        )
+    else:
+        llamada["resultado"] = rng.choice(OTROS_RESULTADOS[1:])
+    return llamada
+
+
+def open_out(path: str) -> io.TextIOBase:
+    # mtime=0 en la cabecera gzip: el .gz también es reproducible
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.GzipFile(path, "wb", mtime=0), encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def write(path: str, p: Params) -> int:
+    # Devuelve la cantidad de interacciones escritas
+    n = 0
+    metadata = {"generador": "scripts.generate_dataset", "parametros": asdict(p)}
+    with open_out(path) as out:
+        if is_ndjson(path):
+            for _, rec in generate(p):
+                out.write(json.dumps(rec) + "\n")
+                n += "cliente_id" in rec
+            return n
+        out.write('{"metadata": %s, "clientes": [' % json.dumps(metadata))
+        actual = "clientes"
+        primero = True
+        for key, rec in generate(p):
+            if key != actual:
+                out.write('], "interacciones": [')
+                actual, primero = key, True
+            out.write(("" if primero else ",") + json.dumps(rec))
+            primero = False
+            n += key == "interacciones"
+        if actual == "clientes":
+            out.write('], "interacciones": [')
+        out.write("]}")
+    return n
+
+
+def add_arguments(p: argparse.ArgumentParser):
+    d = Params()
+    p.add_argument("--clientes", type=int, default=d.clientes)
+    p.add_argument("--interacciones-por-cliente", type=float, default=d.interacciones_por_cliente)
+    p.add_argument("--agentes", type=int, default=d.agentes)
+    p.add_argument("--p-promesa", type=float, default=d.p_promesa)
+    p.add_argument("--p-pago-inmediato", type=float, default=d.p_pago_inmediato)
+    p.add_argument("--p-renegociacion", type=float, default=d.p_renegociacion)
+    p.add_argument("--p-cumple", type=float, default=d.p_cumple)
+    p.add_argument("--p-pago", type=float, default=d.p_pago)
+    p.add_argument("--dias", type=int, default=d.dias)
+    p.add_argument("--seed", type=int, default=d.seed)
+
+
+def params_from(args: argparse.Namespace) -> Params:
+    return Params(
+        clientes=args.clientes,
+        interacciones_por_cliente=args.interacciones_por_cliente,
+        agentes=args.agentes,
+        p_promesa=args.p_promesa,
+        p_pago_inmediato=args.p_pago_inmediato,
+        p_renegociacion=args.p_renegociacion,
+        p_cumple=args.p_cumple,
+        p_pago=args.p_pago,
+        dias=args.dias,
+        seed=args.seed,
+    )
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("path", help="destino (.json, .ndjson/.jsonl, opcional .gz)")
+    add_arguments(p)
+    args = p.parse_args()
+    n = write(args.path, params_from(args))
+    print(f"{args.clientes} clientes, {n} interacciones -> {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# scripts/graphiti_stub.py
+# Stub de la API REST de Graphiti que usa la ingesta (GET /healthcheck,
+# POST /messages, DELETE /group/{id}) para probar el pipeline sin LLM ni Neo4j:
+# latencia fija por request (la de la extracción con el LLM), fallas transitorias
+# 503, 429 con Retry-After si se supera --capacidad requests en vuelo, y registro
+# de lo recibido (orden de llegada, duplicados).
+#
+#   python -m scripts.graphiti_stub --port 8000 --latency-ms 500 --fallas 0.05 --capacidad 16
+#   GRAPHITI_BASE_URL=http://localhost:8000 python -m scripts.ingest_graphiti ./interacciones_clientes_2.json
+import argparse
+import asyncio
+import random
+from typing import Any, Dict, List
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+
+class StubState:
+    def __init__(self):
+        self.requests = 0
+        self.fallas = 0
+        self.rechazos = 0
+        self.en_vuelo = 0
+        self.max_en_vuelo = 0
+        # group_id -> uuid -> mensaje, y nombres (interaccion_id) en orden de llegada
+        self.episodios: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.llegadas: Dict[str, List[str]] = {}
+        self.reemplazados = 0
+
+
+def app(latency: float = 0.0, fallas: float = 0.0, capacidad: int = 0, seed: int = 0) -> FastAPI:
+    rng = random.Random(seed)
+    api = FastAPI()
+    api.state.stub = st = StubState()
+
+    @api.get("/healthcheck")
+    async def healthcheck():
+        return {"status": "healthy"}
+
+    @api.post("/messages", status_code=202)
+    async def messages(body: Dict[str, Any]):
+        st.requests += 1
+        if capacidad and st.en_vuelo >= capacidad:
+            st.rechazos += 1
+            return JSONResponse({"detail": "demasiadas requests"}, status_code=429, headers={"Retry-After": "0.05"})
+        st.en_vuelo += 1
+        st.max_en_vuelo = max(st.max_en_vuelo, st.en_vuelo)
+        try:
+            await asyncio.sleep(latency)
+            if rng.random() < fallas:
+                st.fallas += 1
+                return JSONResponse({"detail": "falla simulada"}, status_code=503)
+            group = body["group_id"]
+            grupo = st.episodios.setdefault(group, {})
+            for m in body["messages"]:
+                if not m.get("content") or m.get("role_type") not in ("user", "assistant", "system"):
+                    return JSONResponse({"detail": "mensaje inválido"}, status_code=422)
+            for m in body["messages"]:
+                st.reemplazados += m["uuid"] in grupo
+                grupo[m["uuid"]] = m
+                st.llegadas.setdefault(group, []).append(m["name"])
+            return {"message": "Messages added to processing queue", "success": True}
+        finally:
+            st.en_vuelo -= 1
+
+    @api.delete("/group/{group_id}")
+    async def clear_group(group_id: str):
+        st.episodios.pop(group_id, None)
+        st.llegadas.pop(group_id, None)
+        return {"message": "Group deleted", "success": True}
+
+    return api
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--latency-ms", type=float, default=200.0, help="latencia por POST /messages")
+    p.add_argument("--fallas", type=float, default=0.0, help="probabilidad de 503 por request")
+    p.add_argument("--capacidad", type=int, default=0, help="requests en vuelo antes de responder 429 (0 = sin límite)")
+    args = p.parse_args()
+    uvicorn.run(app(args.latency_ms / 1000, args.fallas, args.capacidad), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
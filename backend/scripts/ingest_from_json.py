@@ -1,235 +1,207 @@
 # scripts/ingest_from_json.py
-import json, sys, os
-from datetime import datetime
+import argparse
+import json
+import os
+import time
+
 from neo4j import GraphDatabase, basic_auth
 
+from ingest import (
+    BatchWriter,
+    DEFAULT_BATCH_SIZE,
+    ParallelIngest,
+    RejectsFile,
+    iter_records,
+    validate_records,
+)
+
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password123")
 NEO4J_DB = os.getenv("NEO4J_DATABASE", "neo4j")
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 1))
+
 
-driver = GraphDatabase.driver(NEO4J_URI, auth=basic_auth(NEO4J_USER, NEO4J_PASSWORD))
+def open_driver():
+    return GraphDatabase.driver(NEO4J_URI, auth=basic_auth(NEO4J_USER, NEO4J_PASSWORD))
 
 
-def iso(dt):
-    if isinstance(dt, str):
-        return dt
-    if isinstance(dt, datetime):
-        return dt.isoformat()
-    return str(dt)
+def parallel(
+    driver, workers, batch_size, deudas=None, merge_agentes=False, incremental=False, clientes_escritos=None
+):
+    return ParallelIngest(
+        lambda: driver.session(database=NEO4J_DB),
+        workers=workers,
+        batch_size=batch_size,
+        deudas=deudas,
+        merge_agentes=merge_agentes,
+        incremental=incremental,
+        clientes_escritos=clientes_escritos,
+    )
+
 
+def validated(key, items, rejects, processes):
+    return [rec for _, rec in validate_records(((key, x) for x in items), rejects, processes=processes)]
 
-def main(path):
-    data = json.load(open(path, "r", encoding="utf-8"))
+
+def main(
+    path, batch_size=INGEST_BATCH_SIZE, workers=INGEST_WORKERS, rejects=None, processes=1, incremental=False
+):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
     clientes = data.get("clientes", [])
     interacciones = data.get("interacciones", [])
 
+    # Validación con los modelos de `schemas`; los inválidos van al archivo de rechazos
+    if rejects is not None:
+        clientes = validated("clientes", clientes, rejects, processes)
+        interacciones = validated("interacciones", interacciones, rejects, processes)
+
     # Derivar agentes únicos
     agentes = sorted(
         {
             i["agente_id"]
             for i in interacciones
-            if str(i.get("tipo", "")).startswith("llamada")
+            if str(i.get("tipo", "")).startswith("llamada") and i.get("agente_id")
         }
     )
-    # Mapear deuda por cliente (simple: una por cliente con tipo_deuda del cliente)
-    deudas = [
-        {
-            "cliente_id": c["id"],
-            "tipo": c.get("tipo_deuda") or "desconocida",
-            "monto_inicial": c.get("monto_deuda_inicial", 0),
-        }
-        for c in clientes
-    ]
-
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    with driver.session(database="neo4j") as s:
-        # Constraints (idempotentes)
-        s.run(
-            "CREATE CONSTRAINT cliente_id IF NOT EXISTS FOR (c:Cliente) REQUIRE c.id IS UNIQUE;"
-        )
-        s.run(
-            "CREATE CONSTRAINT agente_id  IF NOT EXISTS FOR (a:Agente)  REQUIRE a.id IS UNIQUE;"
-        )
-        s.run(
-            "CREATE CONSTRAINT deuda_id   IF NOT EXISTS FOR (d:Deuda)   REQUIRE d.id IS UNIQUE;"
-        )
-        s.run(
-            "CREATE CONSTRAINT inter_id   IF NOT EXISTS FOR (i:Interaccion) REQUIRE i.id IS UNIQUE;"
-        )
-        # Clientes
-        for c in clientes:
-            s.run(
-                """
-                MERGE (x:Cliente {id:$id})
-                SET x.nombre=$nombre, x.telefono=$telefono, x.tipo_deuda=$tipo_deuda,
-                    x.monto_deuda_inicial=$monto, x.fecha_prestamo=$fecha
-            """,
-                id=c["id"],
-                nombre=c.get("nombre"),
-                telefono=c.get("telefono"),
-                tipo_deuda=c.get("tipo_deuda"),
-                monto=c.get("monto_deuda_inicial"),
-                fecha=c.get("fecha_prestamo"),
-            )
-        # Agentes
-        for aid in agentes:
-            s.run("MERGE (a:Agente {id:$id})", id=aid)
-        # Deudas
-        for d in deudas:
-            deuda_id = f"{d['cliente_id']}:{d['tipo']}"
-            s.run(
-                """
-                MERGE (dd:Deuda {id:$id})
-                SET dd.tipo=$tipo, dd.monto_inicial=$monto
-                WITH dd
-                MATCH (c:Cliente {id:$cid})
-                MERGE (c)-[:POSEE]->(dd)
-            """,
-                id=deuda_id,
-                tipo=d["tipo"],
-                monto=d.get("monto_inicial", 0),
-                cid=d["cliente_id"],
-            )
-
-        # Interacciones + aristas
-        for i in interacciones:
-            iid = i["id"]
-            tipo = i.get("tipo", "")
-            ts = iso(i.get("timestamp"))
-            dia = i.get("dia_semana")
-            hora = i.get("hora_del_dia")
-            s.run(
-                """
-                MERGE (ev:Interaccion {id:$id})
-                SET ev.tipo=$tipo, ev.timestamp=$ts, ev.dia_semana=$dia, ev.hora_del_dia=$hora
-            """,
-                id=iid,
-                tipo=tipo,
-                ts=ts,
-                dia=dia,
-                hora=hora,
-            )
-            # Cliente -[:TUVO]-> Interaccion
-            s.run(
-                """
-                MATCH (c:Cliente {id:$cid}), (ev:Interaccion {id:$iid})
-                MERGE (c)-[:TUVO]->(ev)
-            """,
-                cid=i["cliente_id"],
-                iid=iid,
-            )
 
-            if tipo.startswith("llamada"):
-                # Props específicas
-                s.run(
-                    """
-                    MATCH (ev:Interaccion {id:$id})
-                    SET ev.duracion_segundos=$dur, ev.resultado=$res, ev.sentimiento=$sent
-                """,
-                    id=iid,
-                    dur=i.get("duracion_segundos", 0),
-                    res=i.get("resultado"),
-                    sent=i.get("sentimiento"),
-                )
-                # LLAMADA -[:ATENDIDA_POR]-> AGENTE
-                aid = i.get("agente_id")
-                if aid:
-                    s.run(
-                        """
-                        MATCH (ev:Interaccion {id:$iid}), (a:Agente {id:$aid})
-                        MERGE (ev)-[:ATENDIDA_POR]->(a)
-                    """,
-                        iid=iid,
-                        aid=aid,
-                    )
-                # Derivados: Promesa / Plan
-                if i.get("resultado") == "promesa_pago":
-                    prom_id = f"promesa:{iid}"
-                    s.run(
-                        """
-                        MERGE (p:Promesa {id:$pid})
-                        SET p.monto_prometido=$monto, p.fecha_promesa=$fprom
-                        WITH p
-                        MATCH (ev:Interaccion {id:$iid})
-                        MERGE (ev)-[:RESULTA_EN]->(p)
-                    """,
-                        pid=prom_id,
-                        monto=i.get("monto_prometido"),
-                        fprom=iso(i.get("fecha_promesa")),
-                        iid=iid,
-                    )
-                if i.get("resultado") == "renegociacion":
-                    plan_id = f"plan:{iid}"
-                    s.run(
-                        """
-                        MERGE (pl:PlanRenegociacion {id:$plid})
-                        SET pl.cuotas=$cuotas, pl.monto_mensual=$monto
-                        WITH pl
-                        MATCH (ev:Interaccion {id:$iid})
-                        MERGE (ev)-[:RESULTA_EN]->(pl)
-                    """,
-                        plid=plan_id,
-                        cuotas=i.get("cuotas"),
-                        monto=i.get("monto_mensual"),
-                        iid=iid,
-                    )
-
-            if tipo == "pago_recibido":
-                # Props específicas
-                s.run(
-                    """
-                    MATCH (ev:Interaccion {id:$id})
-                    SET ev.monto=$monto, ev.metodo_pago=$metodo, ev.pago_completo=$full
-                """,
-                    id=iid,
-                    monto=i.get("monto"),
-                    metodo=i.get("metodo_pago"),
-                    full=i.get("pago_completo"),
-                )
-                # PAGO -[:APLICADO_A]-> DEUDA
-                # usamos tipo_deuda del cliente
-                rec = s.run(
-                    "MATCH (c:Cliente {id:$cid}) RETURN c.tipo_deuda AS tipo",
-                    cid=i["cliente_id"],
-                ).single()
-                tipo_deuda = rec["tipo"] if rec else "desconocida"
-                deuda_id = f"{i['cliente_id']}:{tipo_deuda}"
-                s.run(
-                    """
-                    MATCH (ev:Interaccion {id:$iid}), (d:Deuda {id:$did})
-                    MERGE (ev)-[:APLICADO_A]->(d)
-                """,
-                    iid=iid,
-                    did=deuda_id,
+    t0 = time.perf_counter()
+    driver = open_driver()
+    try:
+        with driver.session(database=NEO4J_DB) as s:
+            w = BatchWriter(s, batch_size=batch_size, incremental=incremental)
+            w.constraints()
+            # Clientes + Deudas (devuelve cliente_id -> deuda_id para los pagos)
+            deudas = w.clientes(clientes, {})
+            w.agentes(agentes)
+            # Interacciones + aristas (SIGUE_A incremental en la misma transacción)
+            if workers > 1:
+                par = parallel(
+                    driver,
+                    workers,
+                    batch_size,
+                    deudas,
+                    incremental=incremental,
+                    clientes_escritos=w.clientes_escritos,
                 )
+                par.run(interacciones)
+                w.stats.update(par.stats())
+            else:
+                w.interacciones(interacciones, deudas)
+            # Sin cambios (incremental) el cache del API sigue vigente
+            if w.changed:
+                w.bump_version()
+    finally:
+        driver.close()
+
+    print_report(w, "Ingesta por lotes", time.perf_counter() - t0, workers, rejects)
+
 
-        # Temporalidad (opcional simple: SIGUE_A por cliente)
-        for c in clientes:
-            res = s.run(
-                """
-                MATCH (:Cliente {id:$cid})-[:TUVO]->(i:Interaccion)
-                RETURN i.id AS id, i.timestamp AS ts
-                ORDER BY ts ASC
-            """,
-                cid=c["id"],
-            ).data()
-            for prev, nxt in zip(res, res[1:]):
-                s.run(
-                    """
-                    MATCH (a:Interaccion {id:$aid}), (b:Interaccion {id:$bid})
-                    MERGE (a)-[:SIGUE_A]->(b)
-                """,
-                    aid=prev["id"],
-                    bid=nxt["id"],
+def main_stream(
+    path, batch_size=INGEST_BATCH_SIZE, workers=INGEST_WORKERS, rejects=None, processes=1, incremental=False
+):
+    # Lectura incremental (JSON / NDJSON, opcionalmente .gz): memoria acotada al lote
+    t0 = time.perf_counter()
+    records = iter_records(path)
+    if rejects is not None:
+        records = validate_records(records, rejects, processes=processes)
+    driver = open_driver()
+    try:
+        with driver.session(database=NEO4J_DB) as s:
+            w = BatchWriter(s, batch_size=batch_size, incremental=incremental)
+            w.constraints()
+            if workers > 1:
+                par = parallel(
+                    driver,
+                    workers,
+                    batch_size,
+                    merge_agentes=True,
+                    incremental=incremental,
+                    clientes_escritos=w.clientes_escritos,
                 )
+                w.stream(records, sink=par.run)
+                w.stats.update(par.stats())
+            else:
+                w.stream(records)
+            if w.changed:
+                w.bump_version()
+    finally:
+        driver.close()
 
-    driver.close()
-    print("Ingesta directa completada.")
+    print_report(w, "Ingesta streaming", time.perf_counter() - t0, workers, rejects)
+
+
+def print_report(w, title, seconds, workers=1, rejects=None):
+    for line in w.report():
+        print(line)
+    print(
+        f"{title} completada en {seconds:.2f}s "
+        f"(batch_size={w.batch_size}, workers={workers}, {w.round_trips} sentencias)."
+    )
+    if w.incremental:
+        st = [w.stats[n] for n in ("clientes", "interacciones") if n in w.stats]
+        print(
+            f"Incremental: {sum(x.unchanged for x in st)} sin cambios, "
+            f"{sum(x.inserted for x in st)} insertados, {sum(x.updated for x in st)} actualizados."
+        )
+    if rejects is not None and rejects.count:
+        print(f"{rejects.count} registros rechazados -> {rejects.path}")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Uso: python -m scripts.ingest_direct_neo4j <ruta_json>")
-        sys.exit(1)
-    main(sys.argv[1])
+    p = argparse.ArgumentParser()
+    p.add_argument("path", help="ruta al JSON exportado")
+    p.add_argument(
+        "--batch-size",
+        type=int,
+        default=INGEST_BATCH_SIZE,
+        help=f"filas por sentencia UNWIND (default {INGEST_BATCH_SIZE})",
+    )
+    p.add_argument(
+        "--stream",
+        action="store_true",
+        help="lectura incremental con memoria acotada (JSON, NDJSON, .gz)",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=INGEST_WORKERS,
+        help="escritores en paralelo, particionados por cliente_id (default 1)",
+    )
+    p.add_argument(
+        "--incremental",
+        action="store_true",
+        help="escribir sólo registros nuevos o modificados (huella guardada en cada nodo)",
+    )
+    p.add_argument(
+        "--validate",
+        action="store_true",
+        help="validar cada registro con los modelos de schemas antes de escribir",
+    )
+    p.add_argument(
+        "--rejects",
+        default=None,
+        help="NDJSON de registros inválidos (default <ruta>.rejects.ndjson)",
+    )
+    p.add_argument(
+        "--validate-processes",
+        type=int,
+        default=1,
+        help="procesos para validar en paralelo (default 1)",
+    )
+    args = p.parse_args()
+    run = main_stream if args.stream else main
+    if args.validate:
+        with RejectsFile(args.rejects or f"{args.path}.rejects.ndjson") as rejects:
+            run(
+                args.path,
+                batch_size=args.batch_size,
+                workers=max(1, args.workers),
+                rejects=rejects,
+                processes=args.validate_processes,
+                incremental=args.incremental,
+            )
+    else:
+        run(args.path, batch_size=args.batch_size, workers=max(1, args.workers), incremental=args.incremental)
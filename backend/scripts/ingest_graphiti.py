@@ -0,0 +1,62 @@
+# scripts/ingest_graphiti.py
+# Envía las interacciones del export a Graphiti como episodios: varios clientes en
+# vuelo a la vez (cada uno en orden cronológico), pool de conexiones, rate limit,
+# reintentos con backoff y checkpoint para reanudar.
+#
+#   python -m scripts.ingest_graphiti ./interacciones_clientes_2.json --concurrency 8 --rate 20
+#   # si se corta, la misma línea retoma desde el checkpoint (<ruta>.graphiti.ndjson)
+#   python -m scripts.ingest_graphiti ./interacciones_clientes_2.json --clear   # grupo desde cero
+#
+# Sale con código 1 si quedaron episodios sin enviar (se reintentan en la próxima corrida).
+import argparse
+import asyncio
+import os
+import sys
+
+from graphiti import AsyncGraphitiClient, Checkpoint, GraphBuilder
+from graphiti.graph_builder import GRAPHITI_BATCH_SIZE, GRAPHITI_CONCURRENCY, GRAPHITI_GROUP_ID
+from graphiti.graphiti_client import GRAPHITI_BASE_URL, GRAPHITI_MAX_CONNECTIONS, GRAPHITI_RATE
+from ingest import iter_records
+
+
+async def run(args) -> int:
+    checkpoint_path = args.checkpoint or f"{args.path}.graphiti.ndjson"
+    async with AsyncGraphitiClient(
+        args.url,
+        max_connections=max(args.max_connections, args.concurrency),
+        rate=args.rate,
+    ) as client:
+        print(await client.healthcheck())
+        if args.clear:
+            await client.clear_group(args.group)
+            if os.path.exists(checkpoint_path):
+                os.remove(checkpoint_path)
+            print(f"Grupo '{args.group}' borrado.")
+        with Checkpoint(checkpoint_path) as checkpoint:
+            builder = GraphBuilder(client, args.group, args.concurrency, args.batch_size, checkpoint)
+            stats = await builder.run(iter_records(args.path))
+    print(f"{stats.clientes} clientes, {stats.episodios} episodios -> grupo '{args.group}'")
+    print(stats)
+    for e in stats.errores:
+        print(f"  error: {e}")
+    print(f"Checkpoint: {checkpoint_path}")
+    return 1 if stats.fallidos else 0
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("path", help="ruta al export (JSON, NDJSON, .gz)")
+    p.add_argument("--url", default=GRAPHITI_BASE_URL, help="servidor de Graphiti (GRAPHITI_BASE_URL)")
+    p.add_argument("--group", default=GRAPHITI_GROUP_ID)
+    p.add_argument("--concurrency", type=int, default=GRAPHITI_CONCURRENCY, help="clientes en vuelo a la vez")
+    p.add_argument("--batch-size", type=int, default=GRAPHITI_BATCH_SIZE, help="episodios por request")
+    p.add_argument("--rate", type=float, default=GRAPHITI_RATE, help="requests/s (0 = sin límite)")
+    p.add_argument("--max-connections", type=int, default=GRAPHITI_MAX_CONNECTIONS)
+    p.add_argument("--checkpoint", default=None, help="NDJSON de episodios enviados (default <ruta>.graphiti.ndjson)")
+    p.add_argument("--clear", action="store_true", help="borrar el grupo y el checkpoint antes de enviar")
+    args = p.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
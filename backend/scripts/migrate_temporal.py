@@ -0,0 +1,116 @@
+# scripts/migrate_temporal.py
+# Migración única de grafos cargados antes de guardar valores temporales nativos:
+# Interaccion.timestamp y Promesa.fecha_promesa guardados como string ISO pasan a
+# DateTime (mismo parseo que la ingesta: sin zona se asume UTC). Mientras queden
+# strings, las consultas con range seek (promesas-incumplidas, kpis, series) los
+# descartan sin error.
+#
+#   python -m scripts.migrate_temporal --dry-run   # sólo cuenta
+#   python -m scripts.migrate_temporal
+#
+# Después re-enlaza SIGUE_A de los clientes migrados (el orden de los strings no
+# es el de los instantes si mezclan zonas) y recalcula KpiHorario, KpiDiario y
+# CUMPLIDA_POR, que ignoraban esos registros. Es idempotente: una segunda corrida
+# no convierte nada. Los strings que no son ISO se dejan y se reportan.
+import argparse
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Set, Tuple
+
+from ingest import chain, chunked
+from ingest.batch import to_datetime
+from scripts.check_rollups import rebuild
+from scripts.ingest_from_json import NEO4J_DB, open_driver
+
+PROPIEDADES = (("Interaccion", "timestamp"), ("Promesa", "fecha_promesa"))
+
+# Keyset por id (seek por constraint); el cliente sólo hace falta para SIGUE_A
+Q_TEXTO = """
+MATCH (x:{label})
+WHERE x.id > $after AND x.{prop} IS :: STRING NOT NULL
+WITH x ORDER BY x.id LIMIT $limit
+OPTIONAL MATCH (c:Cliente)-[:TUVO]->(x)
+RETURN x.id AS id, x.{prop} AS valor, c.id AS cliente_id
+"""
+
+Q_CONTAR = """
+MATCH (x:{label})
+WHERE x.{prop} IS :: STRING NOT NULL
+RETURN count(x) AS n
+"""
+
+Q_ESCRIBIR = """
+UNWIND $rows AS r
+MATCH (x:{label} {{id:r.id}})
+WHERE x.{prop} IS :: STRING NOT NULL
+SET x.{prop} = r.valor
+"""
+
+# Inicio del tramo de SIGUE_A: toda la historia del cliente
+DESDE_SIEMPRE = datetime(1, 1, 1, tzinfo=timezone.utc)
+
+
+def migrar(s, label: str, prop: str, batch_size: int) -> Tuple[int, List[str], Set[str]]:
+    # Devuelve (convertidos, ids con strings no ISO, clientes afectados)
+    texto = Q_TEXTO.format(label=label, prop=prop)
+    escribir = Q_ESCRIBIR.format(label=label, prop=prop)
+    convertidos, invalidos, clientes = 0, [], set()
+    after = ""
+    while True:
+        page = s.run(texto, after=after, limit=batch_size).data()
+        if not page:
+            return convertidos, invalidos, clientes
+        after = page[-1]["id"]
+        rows: List[Dict[str, Any]] = []
+        for r in page:
+            valor = to_datetime(r["valor"])
+            if isinstance(valor, datetime):
+                rows.append({"id": r["id"], "valor": valor})
+                if r["cliente_id"] is not None:
+                    clientes.add(r["cliente_id"])
+            else:
+                invalidos.append(r["id"])
+        if rows:
+            s.execute_write(lambda tx: tx.run(escribir, rows=rows).consume())
+            convertidos += len(rows)
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--batch-size", type=int, default=5000)
+    p.add_argument("--dry-run", action="store_true", help="sólo contar los valores string")
+    p.add_argument("--mostrar", type=int, default=5, help="ids no ISO a imprimir")
+    args = p.parse_args()
+
+    driver = open_driver()
+    try:
+        with driver.session(database=NEO4J_DB) as s:
+            if args.dry_run:
+                for label, prop in PROPIEDADES:
+                    n = s.run(Q_CONTAR.format(label=label, prop=prop)).single()["n"]
+                    print(f"{label}.{prop}: {n} valores string")
+                return
+
+            clientes: Set[str] = set()
+            total = 0
+            for label, prop in PROPIEDADES:
+                n, invalidos, afectados = migrar(s, label, prop, args.batch_size)
+                clientes |= afectados
+                total += n
+                print(f"{label}.{prop}: {n} convertidos a DateTime, {len(invalidos)} no ISO (se dejan)")
+                for iid in invalidos[: args.mostrar]:
+                    print(f"  {iid}")
+            if not total:
+                print("Ningún valor convertido: nada que re-enlazar ni recalcular.")
+                return
+
+            for chunk in chunked(sorted(clientes), 500):
+                rows = [{"cliente_id": cid, "desde": DESDE_SIEMPRE} for cid in chunk]
+                s.execute_write(lambda tx: tx.run(chain.Q_SIGUE_A_INCREMENTAL, rows=rows).consume())
+            print(f"SIGUE_A re-enlazada para {len(clientes)} clientes.")
+            rebuild(s)
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# scripts/profile_queries.py
+# PROFILE de las consultas de los endpoints contra la base cargada. Imprime el
+# plan (operador, filas, db hits) y sale con código 1 si alguna consulta que
+# debería ir por índice hace un scan completo de etiqueta.
+#
+#   python -m scripts.profile_queries
+#   python -m scripts.profile_queries --hasta 2025-09-01T00:00:00Z --ventana-dias 14
+import argparse
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+from core.metrics import operators
+from ingest import cumplimiento
+from router.analytics import (
+    Q_AGENTES_EFECTIVIDAD,
+    Q_AGENTES_EFECTIVIDAD_IDS,
+    Q_KPIS,
+    Q_KPIS_MATERIALIZADA,
+    Q_MEJORES_HORARIOS,
+    Q_PROMESAS_INCUMPLIDAS,
+    Q_PROMESAS_INCUMPLIDAS_MATERIALIZADA,
+    Q_SERIES,
+    Q_TIMELINE,
+)
+from scripts.ingest_from_json import NEO4J_DB, open_driver
+
+SCANS = ("NodeByLabelScan", "AllNodesScan")
+
+
+def op_name(plan: Dict[str, Any]) -> str:
+    # "NodeIndexSeekByRange@neo4j" -> "NodeIndexSeekByRange"
+    return plan.get("operatorType", "?").split("@")[0]
+
+
+def profile(session, query: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    summary = session.run("PROFILE " + query, **params).consume()
+    return summary.profile or {}
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--hasta", default="2025-09-01T00:00:00Z")
+    p.add_argument("--ventana-dias", type=int, default=14)
+    p.add_argument("--cliente", default="cliente_001")
+    p.add_argument("--agente", default="agente_001")
+    args = p.parse_args()
+
+    primera_pagina = {"desde": None, "after_dias": None, "after_id": None}
+    hasta = datetime.fromisoformat(args.hasta.replace("Z", "+00:00"))
+    kpis = {
+        "hasta": args.hasta,
+        "desde": (hasta - timedelta(days=30)).isoformat(),
+        "desde_anterior": (hasta - timedelta(days=60)).isoformat(),
+        "ventanaDias": args.ventana_dias,
+        "modo": "acumulado",
+    }
+    # (nombre, consulta, parámetros, debe evitar scans de etiqueta)
+    consultas: List[Tuple[str, str, Dict[str, Any], bool]] = [
+        ("promesas-incumplidas", Q_PROMESAS_INCUMPLIDAS,
+         {"hasta": args.hasta, "ventanaDias": args.ventana_dias, "modo": "acumulado", **primera_pagina}, True),
+        ("promesas-incumplidas (materializada)", Q_PROMESAS_INCUMPLIDAS_MATERIALIZADA,
+         {"hasta": args.hasta, "ventanaDias": cumplimiento.VENTANA_DIAS, "modo": "acumulado", **primera_pagina}, True),
+        ("timeline", Q_TIMELINE, {"id": args.cliente, "after_ts": None, "after_id": None}, True),
+        ("efectividad", Q_AGENTES_EFECTIVIDAD_IDS,
+         {"ids": [args.agente], "orden": "total_llamadas", "top_k": 1, "min_llamadas": 1}, True),
+        # Ranking de todos los agentes: recorre los nodos Agente (pocos) una vez
+        ("efectividad (ranking)", Q_AGENTES_EFECTIVIDAD,
+         {"orden": "tasa_contacto", "top_k": 20, "min_llamadas": 1}, False),
+        # KpiHorario tiene a lo sumo 7x24 nodos: el scan es el plan esperado
+        ("mejores-horarios", Q_MEJORES_HORARIOS, {"min_llamadas": 1, "alpha": 0.5, "top_k": 20}, False),
+        # La recuperación por tipo recorre todas las Deuda (una por cliente) a propósito
+        ("kpis", Q_KPIS, kpis, False),
+        ("kpis (materializada)", Q_KPIS_MATERIALIZADA, dict(kpis, ventanaDias=cumplimiento.VENTANA_DIAS), False),
+        # Range seek sobre kpi_diario_fecha: sólo los días del rango
+        ("series", Q_SERIES,
+         {"desde": (hasta - timedelta(days=90)).date().isoformat(), "hasta": hasta.date().isoformat(),
+          "bucket": "semana"}, True),
+    ]
+
+    fallas = []
+    driver = open_driver()
+    try:
+        with driver.session(database=NEO4J_DB) as s:
+            for nombre, query, params, sin_scans in consultas:
+                plan = profile(s, query, params)
+                total_hits = sum(op.get("dbHits", 0) for _, op in operators(plan))
+                print(f"== {nombre}: {total_hits} db hits")
+                for depth, op in operators(plan):
+                    print(f"{'  ' * depth}{op_name(op):<32} rows={op.get('rows', 0):<8} hits={op.get('dbHits', 0)}")
+                scans = [op_name(op) for _, op in operators(plan) if op_name(op) in SCANS]
+                if sin_scans and scans:
+                    fallas.append(f"{nombre}: {', '.join(scans)}")
+    finally:
+        driver.close()
+
+    for f in fallas:
+        print(f"SCAN COMPLETO en {f}")
+    sys.exit(1 if fallas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# scripts/stub_session.py
+# Sesión de Neo4j simulada para los benchmarks de ingesta (bench_stream_memory,
+# bench_ingest_workers, bench_suite): acepta las sentencias del BatchWriter sin
+# servidor. Sin latencia es una sesión nula (mide sólo el lado de Python); con
+# latencia duerme por sentencia y por fila, como un servidor remoto.
+#
+# Con `derivados` la sentencia de interacciones devuelve el estado previo de una
+# carga nueva (como Neo4j), así corren también SIGUE_A, los rollups y CUMPLIDA_POR.
+# Con `rollup_lock` (un threading.Lock compartido por las sesiones) modela los
+# locks de escritura sobre los nodos de rollup compartidos (KpiHorario, KpiDiario):
+# la primera sentencia que los toca lo toma y se libera al terminar la transacción.
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Sentencias que escriben nodos de rollup compartidos por todos los workers
+ROLLUP_MARKERS = ("MERGE (k:KpiHorario", "MERGE (k:KpiDiario")
+
+
+class StubResult:
+    def __init__(self, rows: Optional[List[Dict[str, Any]]] = None):
+        self.rows = rows or []
+
+    def consume(self):
+        return None
+
+    def data(self):
+        return self.rows
+
+
+def estado_previo(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Lo que devuelve Q_INTERACCIONES para interacciones que no existían
+    return [
+        {"id": r["id"], "cliente_id": r["cliente_id"], "ts": r["props"].get("timestamp"),
+         "ts_prev": None, "kpi_prev": None, "diario_prev": None}
+        for r in rows
+    ]
+
+
+class StubSession:
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        row_us: float = 0.0,
+        derivados: bool = False,
+        rollup_lock: Optional[threading.Lock] = None,
+    ):
+        self.latency = latency_ms / 1000.0
+        self.row = row_us / 1e6
+        self.derivados = derivados
+        self.rollup_lock = rollup_lock
+        self.lock_wait = 0.0
+        self._holding = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, **params):
+        if self.rollup_lock is not None and not self._holding and any(m in query for m in ROLLUP_MARKERS):
+            t0 = time.perf_counter()
+            self.rollup_lock.acquire()
+            self.lock_wait += time.perf_counter() - t0
+            self._holding = True
+        if self.latency or self.row:
+            filas = sum(len(v) for v in params.values() if isinstance(v, list))
+            time.sleep(self.latency + self.row * filas)
+        if self.derivados and "AS kpi_prev" in query:
+            return StubResult(estado_previo(params["rows"]))
+        return StubResult()
+
+    def execute_write(self, fn, *args, **kwargs):
+        try:
+            return fn(self, *args, **kwargs)
+        finally:
+            # "commit": se sueltan los locks de la transacción
+            if self._holding:
+                self._holding = False
+                self.rollup_lock.release()
+
+    def execute_read(self, fn, *args, **kwargs):
+        return fn(self, *args, **kwargs)
@@ -1,6 +1,6 @@
 // src/api/analytics.ts
 import { http } from "@/lib/http";
-import type { PromesaIncumplida, MejorHorario } from "./types";
+import type { PromesaIncumplida, MejorHorario, KpisResponse, SerieBucket, SeriesResponse } from "./types";
 
 export function getPromesasIncumplidas(
   params: { hasta: string; ventanaDias?: number; modo?: "acumulado" | "estricto" },
@@ -16,3 +16,22 @@ export function getMejoresHorarios(
   return http.get(`/analytics/mejores-horarios`, { params, signal });
 }
 
+
+// Todas las tarjetas del dashboard en una sola request
+export function getKpis(
+  params: {
+    hasta: string; periodoDias?: number; ventanaDias?: number;
+    modo?: "acumulado" | "estricto"; agente_id?: string;
+  },
+  signal?: AbortSignal
+): Promise<KpisResponse> {
+  return http.get(`/analytics/kpis`, { params, signal });
+}
+
+// Serie del gráfico de tendencia (rollup diario); fechas YYYY-MM-DD inclusivas
+export function getSeries(
+  params: { desde: string; hasta: string; bucket?: SerieBucket },
+  signal?: AbortSignal
+): Promise<SeriesResponse> {
+  return http.get(`/analytics/series`, { params, signal });
+}
@@ -82,3 +82,53 @@ export type MejorHorario = {
   tasa_exito: number;
   score: number;
 };
+
+export type KpiDeudaPorTipo = {
+  tipo: string;
+  deudas: number;
+  deuda_inicial: number;
+  recuperado: number;
+  tasa_recuperacion: number;
+};
+
+export type KpisResponse = {
+  recuperacion: { deuda_inicial: number; recuperado: number; tasa: number };
+  promesas: {
+    vencidas: number;
+    cumplidas: number;
+    incumplidas: number;
+    tasa_cumplimiento: number;
+    monto_prometido: number;
+    monto_cumplido: number;
+  };
+  deuda_por_tipo: KpiDeudaPorTipo[];
+  actividad_pagos: {
+    pagos: number;
+    monto: number;
+    pagos_completos: number;
+    pagos_anterior: number;
+    monto_anterior: number;
+    variacion_pagos_pct: number | null;
+    variacion_monto_pct: number | null;
+  };
+  agente: { agente_id: string; resumen: AgenteEfectividadResumen } | null;
+};
+
+export type SerieBucket = "dia" | "semana" | "mes";
+
+export type SeriePunto = {
+  periodo: string; // YYYY-MM-DD, inicio del día / semana / mes (UTC)
+  llamadas: number;
+  contactos: number;
+  promesas: number;
+  pagos: number;
+  monto_pagado: number;
+  tasa_contacto: number;
+};
+
+export type SeriesResponse = {
+  desde: string;
+  hasta: string;
+  bucket: SerieBucket;
+  puntos: SeriePunto[];
+};
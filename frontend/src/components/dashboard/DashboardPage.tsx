@@ -75,9 +75,9 @@ export default function DashboardPage() {
               {/* KPIs */}
               <SectionCards kpis={data} />
 
-              {/* Gráfica (si tu componente ya trae su propio hook, no pases props) */}
+              {/* Gráfica: serie del rollup diario hasta el mismo corte que los KPIs */}
               <div className="px-4 lg:px-6">
-                <ChartAreaInteractive />
+                <ChartAreaInteractive hastaISO={hastaISO} />
               </div>
 
               <div className="px-4 lg:px-6">
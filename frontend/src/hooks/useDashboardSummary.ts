@@ -2,13 +2,21 @@
 import { useCallback, useEffect, useRef, useState } from "react";
 import type { DashboardKPIs } from "@/components/section-cards";
 import type { ApiError } from "@/lib/http";
-import { getMejoresHorarios, getPromesasIncumplidas } from "@/api/analytics";
-import { getAgenteEfectividad } from "@/api/entities";
+import { getKpis } from "@/api/analytics";
+
+type Trend = "up" | "down" | "flat";
+
+function trend(pct: number | null): Trend {
+  if (pct == null || pct === 0) return "flat";
+  return pct > 0 ? "up" : "down";
+}
+
+const pct = (x: number) => `${(x * 100).toFixed(1)}%`;
 
 export function useDashboardSummary(params: {
-  hastaISO: string; ventanaDias?: number; modo?: "acumulado" | "estricto"; agenteId?: string;
+  hastaISO: string; periodoDias?: number; ventanaDias?: number; modo?: "acumulado" | "estricto"; agenteId?: string;
 }) {
-  const { hastaISO, ventanaDias = 14, modo = "acumulado", agenteId } = params;
+  const { hastaISO, periodoDias = 30, ventanaDias = 14, modo = "acumulado", agenteId } = params;
 
   const [data, setData] = useState<DashboardKPIs | null>(null);
   const [loading, setLoading] = useState(true);
@@ -22,17 +30,19 @@ export function useDashboardSummary(params: {
     setLoading(true);
     setError(null);
     try {
-      const [mejores, incumplidas, agente] = await Promise.all([
-        getMejoresHorarios({ min_llamadas: 10, top_k: 20, alpha: 0.5 }, signal),
-        getPromesasIncumplidas({ hasta: hastaISO, ventanaDias, modo }, signal),
-        agenteId ? getAgenteEfectividad(agenteId, signal) : Promise.resolve(null),
-      ]);
+      // Una sola request: el backend calcula todas las tarjetas en una consulta
+      const r = await getKpis(
+        { hasta: hastaISO, periodoDias, ventanaDias, modo, agente_id: agenteId },
+        signal
+      );
+      const pagos = r.actividad_pagos;
+      const mayor = [...r.deuda_por_tipo].sort((a, b) => b.deudas - a.deudas)[0];
 
       const kpis: DashboardKPIs = {
-        recoveryRate: { value: 0, delta: { pct: null, trend: "flat" }, helperTitle: "Define insight", helperSubtitle: "Base del cálculo", currency: "USD" },
-        keptPromises: { value: agente?.resumen?.promesas_cumplidas ?? 0, delta: { pct: null, trend: "flat" }, helperTitle: "Compleción de promesas", helperSubtitle: "Fuente: /agentes/{id}/efectividad" },
-        ticketsByDebtType: { value: mejores.length, delta: { pct: null, trend: "flat" }, helperTitle: "Placeholder", helperSubtitle: "Sugerencia: /analytics/kpis" },
-        paymentActivity: { value: agente?.resumen?.tasa_pago_inmediato ?? 0, delta: { pct: null, trend: "flat" }, helperTitle: "Pagos inmediatos por llamadas", helperSubtitle: "Último período", asPercent: true },
+        recoveryRate: { value: r.recuperacion.recuperado, delta: { pct: null, trend: "flat" }, helperTitle: `${pct(r.recuperacion.tasa)} de la deuda inicial`, helperSubtitle: "Pagos aplicados a cada deuda", currency: "USD" },
+        keptPromises: { value: r.promesas.cumplidas, delta: { pct: null, trend: "flat" }, helperTitle: `${pct(r.promesas.tasa_cumplimiento)} de ${r.promesas.vencidas} vencidas`, helperSubtitle: `Ventana de ${ventanaDias} días (${modo})` },
+        ticketsByDebtType: { value: r.deuda_por_tipo.reduce((n, d) => n + d.deudas, 0), delta: { pct: null, trend: "flat" }, helperTitle: mayor ? `Mayor: ${mayor.tipo} (${mayor.deudas})` : "Sin deudas", helperSubtitle: `${r.deuda_por_tipo.length} tipos de deuda` },
+        paymentActivity: { value: pagos.pagos, delta: { pct: pagos.variacion_pagos_pct, trend: trend(pagos.variacion_pagos_pct) }, helperTitle: `Pagos en los últimos ${periodoDias} días`, helperSubtitle: r.agente ? `Pago inmediato ${r.agente.agente_id}: ${pct(r.agente.resumen.tasa_pago_inmediato)}` : "vs. período anterior" },
       };
 
       setData(kpis);
@@ -48,7 +58,7 @@ export function useDashboardSummary(params: {
       setLoading(false);
       inFlight.current = false;
     }
-  }, [hastaISO, ventanaDias, modo, agenteId]);
+  }, [hastaISO, periodoDias, ventanaDias, modo, agenteId]);
 
   useEffect(() => {
     const ctrl = new AbortController();
@@ -0,0 +1,41 @@
+import { useCallback, useEffect, useState } from "react";
+import { getSeries } from "@/api/analytics";
+import type { SerieBucket, SeriePunto } from "@/api/types";
+import type { ApiError } from "@/lib/http";
+
+// Últimos `dias` días hasta el corte (inclusive), en fechas UTC
+export function useTrendSeries(params: { hastaISO: string; dias: number; bucket?: SerieBucket }) {
+  const { hastaISO, dias, bucket = "dia" } = params;
+  const [data, setData] = useState<SeriePunto[] | null>(null);
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState<ApiError | null>(null);
+
+  const fetchData = useCallback(async (signal?: AbortSignal) => {
+    setLoading(true);
+    setError(null);
+    try {
+      const hasta = new Date(hastaISO);
+      const desde = new Date(hasta.getTime() - (dias - 1) * 86_400_000);
+      const res = await getSeries(
+        { desde: desde.toISOString().slice(0, 10), hasta: hasta.toISOString().slice(0, 10), bucket },
+        signal
+      );
+      setData(res.puntos);
+    } catch (err) {
+      const e = err as ApiError;
+      // El abort del cleanup (cambio de hastaISO o desmontaje) no es un error
+      if (e?.code !== "ERR_CANCELED" && e?.message !== "canceled") setError(e);
+    } finally {
+      // La request que lo reemplazó maneja su propio loading
+      if (!signal?.aborted) setLoading(false);
+    }
+  }, [hastaISO, dias, bucket]);
+
+  useEffect(() => {
+    const ctrl = new AbortController();
+    fetchData(ctrl.signal);
+    return () => ctrl.abort();
+  }, [fetchData]);
+
+  return { data, loading, error, refetch: () => fetchData() };
+}